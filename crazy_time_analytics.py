@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+التحليل الرياضي الدقيق لمحاكي Crazy Time
+========================================
+- التوزيع الدقيق لمضاعفات Coin Flip و Cash Hunt و Pachinko (مع المضاعفة) و Crazy Time
+- المتوسط والتباين والتوزيع الكامل لصافي الجولة لأي تركيبة
+- ترتيب جميع التركيبات تحليلياً واختيار قائمة مختصرة للمحاكاة الكاملة
+"""
+
+import math
+
+import numpy as np
+
+from crazy_time_combinations import ShortlistSpace
+from crazy_time_symmetry import payout_signature
+
+
+class Distribution:
+    """توزيع مختلط: قيم منفصلة + مقاطع منتظمة"""
+
+    def __init__(self, atoms=None, segments=None):
+        # atoms: {القيمة: الاحتمال} | segments: [(من, إلى, الاحتمال)]
+        self.atoms = {}
+        for value, probability in (atoms or {}).items():
+            self.add_atom(value, probability)
+        self.segments = list(segments or [])
+
+    def add_atom(self, value, probability):
+        """إضافة احتمال لقيمة منفصلة"""
+        if probability > 0:
+            self.atoms[value] = self.atoms.get(value, 0.0) + probability
+
+    def total_probability(self):
+        return sum(self.atoms.values()) + sum(probability for _, _, probability in self.segments)
+
+    def mean(self):
+        """المتوسط الدقيق"""
+        return (sum(value * probability for value, probability in self.atoms.items())
+                + sum(probability * (low + high) / 2 for low, high, probability in self.segments))
+
+    def second_moment(self):
+        """العزم الثاني الدقيق E[X²]"""
+        return (sum(value * value * probability for value, probability in self.atoms.items())
+                + sum(probability * (low * low + low * high + high * high) / 3
+                      for low, high, probability in self.segments))
+
+    def variance(self):
+        return self.second_moment() - self.mean() ** 2
+
+    def affine(self, scale, shift):
+        """توزيع scale × X + shift"""
+        return Distribution(
+            {value * scale + shift: probability for value, probability in self.atoms.items()},
+            [(low * scale + shift, high * scale + shift, probability) for low, high, probability in self.segments]
+        )
+
+    def mix(self, other, weight):
+        """إضافة توزيع آخر بوزن معين (خليط)"""
+        for value, probability in other.atoms.items():
+            self.add_atom(value, probability * weight)
+        self.segments.extend((low, high, probability * weight) for low, high, probability in other.segments)
+
+    def probability_above(self, threshold):
+        """احتمال أن تكون القيمة أكبر من حد معين"""
+        probability = sum(p for value, p in self.atoms.items() if value > threshold)
+        for low, high, p in self.segments:
+            if high <= threshold:
+                continue
+            if low >= threshold:
+                probability += p
+            else:
+                probability += p * (high - threshold) / (high - low)
+        return probability
+
+
+def bonus_multiplier_distribution(bonus_type, distributions, bonus_multipliers):
+    """التوزيع الدقيق لمضاعف لعبة إضافية كما يولده المحاكي"""
+    distribution = distributions.get(bonus_type)
+    base_avg = bonus_multipliers[bonus_type]
+
+    if bonus_type == 'Coin Flip':
+        low_probability = distribution['low_probability']
+        high_low, high_high = distribution['high_range']
+        return Distribution(segments=[
+            (*distribution['low_range'], low_probability),
+            (high_low, min(high_high, base_avg * 2), 1 - low_probability)
+        ])
+
+    weights = np.asarray(distribution['weights'], dtype=float)
+    probabilities = (weights / weights.sum()).tolist()
+    result = Distribution()
+
+    if bonus_type == 'Cash Hunt':
+        for value, probability in zip(distribution['values'], probabilities):
+            result.add_atom(value, probability)
+
+    elif bonus_type == 'Pachinko':
+        # k مضاعفات باحتمال p^k (1-p)، وعند تجاوز الحد الأقصى تتوقف الحلقة عنده
+        double_probability = distribution['double_probability']
+        cap = distribution['max_multiplier']
+        for value, probability in zip(distribution['values'], probabilities):
+            doublings = 0
+            while value * 2 ** doublings <= cap:
+                result.add_atom(value * 2 ** doublings,
+                                probability * double_probability ** doublings * (1 - double_probability))
+                doublings += 1
+            result.add_atom(cap, probability * double_probability ** doublings)
+
+    elif bonus_type == 'Crazy Time':
+        extra_probability = distribution['extra_probability']
+        extras = distribution['extra_multipliers']
+        cap = distribution['max_multiplier']
+        for value, probability in zip(distribution['values'], probabilities):
+            result.add_atom(min(value, cap), probability * (1 - extra_probability))
+            for extra in extras:
+                result.add_atom(min(value * extra, cap), probability * extra_probability / len(extras))
+
+    else:
+        result.add_atom(base_avg, 1.0)
+
+    return result
+
+
+class AnalyticModel:
+    """النموذج التحليلي لجولة واحدة"""
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        options = simulator.betting_options
+        total_positions = sum(simulator.wheel_config.values())
+
+        self.outcome_probabilities = np.array(
+            [simulator.wheel_config[option] / total_positions for option in options]
+        )
+        self.multiplier_distributions = []
+        for option in options:
+            if option in simulator.number_multipliers:
+                self.multiplier_distributions.append(
+                    Distribution({simulator.number_multipliers[option]: 1.0})
+                )
+            else:
+                self.multiplier_distributions.append(bonus_multiplier_distribution(
+                    option, simulator.bonus_distributions, simulator.bonus_multipliers
+                ))
+
+        # أوزان العزوم: E[الدفع] = bets · w1 ، E[الدفع²] = bets² · w2
+        self.first_moments = self.outcome_probabilities * np.array(
+            [distribution.mean() for distribution in self.multiplier_distributions]
+        )
+        self.second_moments = self.outcome_probabilities * np.array(
+            [distribution.second_moment() for distribution in self.multiplier_distributions]
+        )
+
+        # احتمال الفوز لا يتغير بضرب التركيبة في معامل، فيُحسب مرة لكل اتجاه أولي
+        self._win_probabilities = {}
+
+    def moments(self, combinations):
+        """متوسط وتباين صافي الجولة لمصفوفة تركيبات (صفوف × 8)"""
+        combinations = np.asarray(combinations, dtype=float)
+        expected_payout = combinations @ self.first_moments
+        mean = expected_payout - combinations.sum(axis=-1)
+        variance = (combinations ** 2) @ self.second_moments - expected_payout ** 2
+        return mean, np.maximum(variance, 0.0)
+
+    def payout_distribution(self, combination):
+        """التوزيع الدقيق لصافي الربح/الخسارة في جولة واحدة"""
+        total_bet = sum(combination)
+        result = Distribution()
+        for bet, probability, multiplier in zip(combination, self.outcome_probabilities,
+                                                self.multiplier_distributions):
+            if bet > 0:
+                result.mix(multiplier.affine(bet, -total_bet), probability)
+            else:
+                result.add_atom(-total_bet, probability)
+        return result
+
+    def win_probability(self, combination):
+        """احتمال ربح جولة واحدة (مشترك بين جميع مضاعفات نفس الاتجاه)"""
+        direction, _ = payout_signature(combination)
+        if direction not in self._win_probabilities:
+            self._win_probabilities[direction] = self.payout_distribution(direction).probability_above(0)
+        return self._win_probabilities[direction]
+
+    def summarize(self, combination):
+        """ملخص تحليلي لتركيبة واحدة"""
+        mean, variance = self.moments([combination])
+        trials = self.simulator.config['trials_per_combination']
+        return {
+            'combination': combination,
+            'mean_per_spin': float(mean[0]),
+            'variance_per_spin': float(variance[0]),
+            'std_per_spin': math.sqrt(float(variance[0])),
+            'win_probability': self.win_probability(combination),
+            # بدون احتساب التوقف المبكر عند الحد الأدنى
+            'expected_final_balance': self.simulator.config['initial_balance'] + trials * float(mean[0])
+        }
+
+    def scores(self, combinations):
+        """درجة الترتيب التحليلي حسب المعيار المحدد في الإعدادات"""
+        config = self.simulator.config
+        mean, variance = self.moments(combinations)
+        trials = config['trials_per_combination']
+
+        if config['analytic_metric'] == 'mean':
+            scores = trials * mean
+        else:
+            # حد أعلى متفائل للمبلغ النهائي: المتوسط + z انحراف معياري للجلسة
+            scores = trials * mean + config['analytic_z'] * np.sqrt(trials * variance)
+
+        # التركيبات بدون رهان لا تُحاكى
+        scores[np.asarray(combinations).sum(axis=-1) == 0] = -np.inf
+        return scores
+
+    def rank_space(self, space, count, block_size=200000):
+        """أفضل التركيبات تحليلياً (فهارسها مرتبة تنازلياً حسب الدرجة)"""
+        if count <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        best_ranks = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0)
+
+        for start in range(0, len(space), block_size):
+            block = space.to_array(start, block_size)
+            ranks = np.concatenate((best_ranks, np.arange(start, start + len(block))))
+            scores = np.concatenate((best_scores, self.scores(block)))
+
+            if len(scores) > count:
+                keep = np.argpartition(-scores, count - 1)[:count]
+                ranks, scores = ranks[keep], scores[keep]
+            best_ranks, best_scores = ranks, scores
+
+        # ترتيب ثابت: الدرجة تنازلياً ثم الفهرس تصاعدياً
+        order = np.lexsort((best_ranks, -best_scores))
+        keep = np.isfinite(best_scores[order])
+        return best_ranks[order][keep], best_scores[order][keep]
+
+    def shortlist(self, space):
+        """فضاء القائمة المختصرة للمحاكاة الكاملة"""
+        ranks, _ = self.rank_space(space, self.simulator.config['analytic_shortlist_size'])
+        return ShortlistSpace(space, ranks.tolist())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+عملية المحاكاة المنفصلة للواجهة الرسومية
+========================================
+- المحاكاة تعمل في عملية مستقلة (بدون مشاركة GIL مع حلقة أحداث Tk)
+- الأوامر من الواجهة: pause / resume / stop / export
+- الأحداث إلى الواجهة: log / progress / table / metrics / estimate / error / finished
+- جداول النتائج تُرسل كفروقات (الصفوف المضافة والمحذوفة فقط) مع رسالة التقدم
+- أنماط العملية: run (المحاكاة)، export (تصدير Excel)، estimate (معايرة الوقت المتوقع)
+"""
+
+import multiprocessing
+import queue
+import time
+from collections import deque
+
+from full_crazy_time_simulator import (FullCrazyTimeSimulator, SIMULATION_CONFIG,
+                                       RUN_COMPLETED, RUN_INTERRUPTED, RUN_FAILED)
+from crazy_time_combinations import CombinationSpace, count_combinations
+
+# الفترة الأدنى بين رسائل التقدم وبين قراءات قائمة الأوامر (بالثواني)
+PROGRESS_INTERVAL = 1.0
+COMMAND_POLL_INTERVAL = 0.05
+
+# عدد صفوف جدول أفضل النتائج، وأقصى عدد من آخر النتائج في كل رسالة
+TOP_EVENT_COUNT = 100
+RECENT_EVENT_COUNT = 200
+
+
+def result_summary(result):
+    """نتيجة كقاموس بسيط قابل للإرسال بين العمليات"""
+    summary = dict(result)
+    summary['combination'] = result.combination
+    summary['combination_str'] = result.combination_str
+    return summary
+
+
+class BackendControl:
+    """حالة الأوامر داخل عملية المحاكاة (الإيقاف المؤقت والنهائي)"""
+
+    def __init__(self, commands):
+        self.commands = commands
+        self.paused = False
+        self.stopped = False
+        self.export_requested = False
+        self.last_poll = 0.0
+
+    def poll(self):
+        """قراءة الأوامر الجديدة (بحد أقصى مرة كل COMMAND_POLL_INTERVAL)"""
+        now = time.monotonic()
+        if now - self.last_poll < COMMAND_POLL_INTERVAL:
+            return
+        self.last_poll = now
+
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            if command == 'pause':
+                self.paused = True
+            elif command == 'resume':
+                self.paused = False
+            elif command == 'stop':
+                self.stopped = True
+            elif command == 'export':
+                self.export_requested = True
+
+    def should_stop(self):
+        self.poll()
+        return self.stopped
+
+    def should_pause(self):
+        self.poll()
+        return self.paused
+
+    def wait_while_paused(self):
+        """الانتظار أثناء الإيقاف المؤقت"""
+        while self.should_pause() and not self.stopped:
+            time.sleep(0.1)
+
+
+class BackendRunner:
+    """تشغيل المحاكاة داخل العملية المنفصلة وإرسال الأحداث"""
+
+    def __init__(self, config, control, events):
+        self.simulator = FullCrazyTimeSimulator(config, verbose=False)
+        self.control = control
+        self.events = events
+        self.last_progress = 0.0
+        self.sent_top = set()
+        self.recent = deque(maxlen=RECENT_EVENT_COUNT)
+
+        # التقاط آخر النتائج المسجلة (على مستوى الكائن فقط، مثل مؤقتات المراحل)
+        record_results = self.simulator.record_results
+
+        def capture(results):
+            record_results(results)
+            self.capture_recent(results)
+
+        self.simulator.record_results = capture
+
+    def capture_recent(self, results):
+        """حفظ آخر RECENT_EVENT_COUNT نتيجة فقط (تكلفة ثابتة لكل دفعة)"""
+        if isinstance(results, dict):
+            count = len(results['total_bet'])
+            for row in range(max(0, count - RECENT_EVENT_COUNT), count):
+                self.recent.append(result_summary(self.simulator.batch_result(results, row)))
+        else:
+            for result in results[-RECENT_EVENT_COUNT:]:
+                self.recent.append(result_summary(result))
+
+    def send_table_diff(self):
+        """إرسال فروقات الجداول منذ آخر رسالة (صفوف أفضل النتائج المتغيرة وآخر النتائج الجديدة)"""
+        top = self.simulator.top_results[:TOP_EVENT_COUNT]
+        keys = {result['combination_key'] for result in top}
+        added = [result_summary(result) for result in top if result['combination_key'] not in self.sent_top]
+        removed = list(self.sent_top - keys)
+        recent = list(self.recent)
+        self.recent.clear()
+        self.sent_top = keys
+
+        if added or removed or recent:
+            self.events.put(("table", {"top_added": added, "top_removed": removed, "recent": recent}))
+
+    def send_progress(self, force=False):
+        """إرسال حالة التقدم (بحد أقصى مرة كل PROGRESS_INTERVAL)"""
+        now = time.monotonic()
+        if not force and now - self.last_progress < PROGRESS_INTERVAL:
+            return
+        self.last_progress = now
+        self.send_table_diff()
+
+        simulator = self.simulator
+        done = simulator.completed_count()
+        total = simulator.total_combinations
+        stats = simulator.stats
+        top = simulator.top_results
+        self.events.put(("progress", {
+            "progress": (done / total) * 100 if total else 0,
+            "tested": simulator.tested_combinations,
+            "total": total,
+            "elapsed": time.time() - simulator.start_time,
+            "current_index": done,
+            "paused": self.control.paused,
+            "best": result_summary(top[0]) if top else None,
+            "stats": {
+                "count": stats.count,
+                "mean": stats.mean,
+                "std": stats.std,
+                "success_rate": stats.success_rate,
+                # الإحصائيات للتركيبات الناجية فقط في نمط السباق
+                "dropped": simulator.racing_stats['dropped'] if simulator.racing_stats is not None else None,
+                "histogram_edges": stats.histogram_edges.tolist(),
+                "histogram": stats.histogram.tolist(),
+                "bet_profile": [values.tolist() for values in stats.bet_profile()]
+            } if stats.count else None
+        }))
+
+    def send_snapshot(self):
+        """إرسال المقاييس والتقدم وفروقات الجداول (عند كل حفظ)"""
+        self.events.put(("metrics", self.simulator.metrics.snapshot()))
+        self.send_progress(force=True)
+
+    def handle_export_request(self):
+        """تصدير Excel عند الطلب من الواجهة (بين الدفعات)"""
+        if not self.control.export_requested:
+            return
+        self.control.export_requested = False
+        self.simulator.save_progress()
+        self.simulator.export_to_excel()
+        self.events.put(("log", f"📊 تم تصدير النتائج إلى {self.simulator.file_config['excel_file']}"))
+
+    def on_save(self):
+        """بعد كل حفظ دوري: إرسال اللقطة وتنفيذ طلب التصدير المعلق"""
+        self.send_snapshot()
+        self.handle_export_request()
+
+    def run(self):
+        """تشغيل المحاكاة وإرجاع حالة الانتهاء"""
+        simulator = self.simulator
+
+        # توليد التركيبات
+        if simulator.total_combinations == 0:
+            self.events.put(("log", "📊 توليد جميع التركيبات..."))
+            all_combinations = simulator.generate_all_combinations()
+            simulator.total_combinations = len(all_combinations)
+            self.events.put(("log", f"📈 إجمالي التركيبات: {simulator.total_combinations:,}"))
+        else:
+            all_combinations = simulator.generate_all_combinations()
+
+        if simulator.start_time is None:
+            simulator.start_time = time.time()
+        simulator.ensure_seed_entropy()
+        simulator.metrics.reset()
+        self.send_snapshot()
+
+        if simulator.config['workers'] > 1:
+            # تنفيذ متوازي على عدة عمليات
+            from crazy_time_parallel import run_parallel_sweep
+            run_parallel_sweep(simulator, all_combinations, on_save=self.on_save,
+                               should_stop=self.control.should_stop,
+                               should_pause=self.control.should_pause)
+        else:
+            self.run_sequential_sweep(all_combinations)
+
+        # حفظ نهائي
+        simulator.save_progress()
+        self.send_snapshot()
+
+        if self.control.stopped:
+            self.events.put(("log", "⏹️ تم إيقاف المحاكاة وحفظ التقدم"))
+            return RUN_INTERRUPTED
+
+        simulator.record_traces(log=lambda message: self.events.put(("log", message)))
+        if simulator.config['export_on_finish']:
+            simulator.export_to_excel()
+        self.events.put(("log", "🎉 انتهت المحاكاة بنجاح!"))
+        if simulator.racing_stats is not None:
+            self.events.put(("log", simulator.racing_summary()))
+        for line in simulator.metrics.summary_lines():
+            self.events.put(("log", line))
+        simulator.write_metrics(force=True)
+        return RUN_COMPLETED
+
+    def run_sequential_sweep(self, all_combinations):
+        """تشغيل المحاكاة على عملية واحدة"""
+        simulator = self.simulator
+        block_size = simulator.sweep_block_size()
+        save_interval = simulator.config['save_interval']
+
+        for start, end in simulator.pending_ranges():
+            for block_start in range(start, end, block_size):
+                # فحص الإيقاف المؤقت والنهائي
+                self.control.wait_while_paused()
+                if self.control.stopped:
+                    return
+
+                # محاكاة التركيبة (أو دفعة تركيبات مع الشريط المشترك)
+                block_end = min(block_start + block_size, end)
+                simulator.simulate_block(all_combinations, block_start, block_end)
+                simulator.current_combination_index = block_end
+                self.send_progress()
+                self.handle_export_request()
+
+                # حفظ دوري
+                if block_end // save_interval > block_start // save_interval:
+                    simulator.save_progress()
+                    self.events.put(("log", f"💾 تم حفظ النتائج - التركيبة {block_end:,}"))
+                    self.on_save()
+
+            simulator.mark_range_completed(start, end)
+
+
+def estimate_run(config, events):
+    """الوقت المتوقع والعدد الإجمالي للتركيبات من جولة معايرة قصيرة"""
+    config = dict(SIMULATION_CONFIG, **config)
+    total = count_combinations(config['min_bet_amount'], config['max_bet_amount'])
+    if config.get('sweep_mode') == 'analytic_shortlist':
+        total = min(total, config['analytic_shortlist_size'])
+
+    simulator = FullCrazyTimeSimulator(config, resume=False, verbose=False)
+    if simulator.uses_tape:
+        simulator.open_tape(in_memory=True)  # المعايرة لا تنشئ ملف الشريط ولا تستبدله
+    space = CombinationSpace(config['min_bet_amount'], config['max_bet_amount'])
+    events.put(("estimate", {"total": total, "hours": simulator.estimate_hours(space, total)}))
+
+
+def backend_main(mode, config, commands, events):
+    """نقطة دخول العملية المنفصلة"""
+    status = RUN_FAILED
+    try:
+        if mode == 'run':
+            status = BackendRunner(config, BackendControl(commands), events).run()
+        elif mode == 'export':
+            simulator = FullCrazyTimeSimulator(config, verbose=False, readonly=True)
+            simulator.export_to_excel()
+            events.put(("log", f"📊 تم تصدير النتائج إلى {simulator.file_config['excel_file']}"))
+            status = RUN_COMPLETED
+        elif mode == 'estimate':
+            estimate_run(config, events)
+            status = RUN_COMPLETED
+        else:
+            raise ValueError(f"نمط غير معروف: {mode}")
+    except Exception as e:
+        events.put(("error", f"خطأ في المحاكاة: {e}"))
+    finally:
+        events.put(("finished", status))
+
+
+class SimulationBackend:
+    """واجهة التحكم بعملية المحاكاة من جهة الواجهة الرسومية"""
+
+    def __init__(self, mode, config):
+        self.mode = mode
+        self.commands = multiprocessing.Queue()
+        self.events = multiprocessing.Queue()
+        # ليست daemon: عملية المحاكاة قد تنشئ عمليات متوازية خاصة بها
+        self.process = multiprocessing.Process(target=backend_main, name=f"crazy-time-{mode}",
+                                               args=(mode, config, self.commands, self.events))
+        self.finished = False
+
+    def start(self):
+        self.process.start()
+        return self
+
+    def send(self, command):
+        """إرسال أمر (pause / resume / stop / export)"""
+        if self.process.is_alive():
+            self.commands.put(command)
+
+    def poll_events(self, limit=200):
+        """الأحداث المتاحة بدون انتظار (بحد أقصى limit حدث في كل مرة)"""
+        events = []
+        while len(events) < limit:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == 'finished':
+                self.finished = True
+            events.append(event)
+
+        # انتهت العملية بشكل غير متوقع بدون رسالة finished
+        if not events and not self.finished and not self.process.is_alive():
+            self.finished = True
+            events.append(("error", f"توقفت عملية المحاكاة بشكل غير متوقع (الرمز {self.process.exitcode})"))
+            events.append(("finished", RUN_FAILED))
+        return events
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def join(self, timeout=None):
+        self.process.join(timeout)
+
+    def terminate(self):
+        if self.process.is_alive():
+            self.process.terminate()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+قياس سرعة محاكي Crazy Time
+==========================
+- تركيبة/ث وجولة/ث لكل محرك (python كخط أساس، numpy، الشريط المشترك)
+- سرعة calculate_payout و generate_bonus_multiplier وتوليد التركيبات وتصدير Excel
+- التوسع مع max_bet_amount و trials_per_combination وعدد العمليات المتوازية
+- نتائج JSON ومقارنة مع ملف سابق: رمز خروج 1 عند تباطؤ أكبر من الحد المسموح
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from full_crazy_time_simulator import FullCrazyTimeSimulator
+from crazy_time_metrics import calibration_sample
+
+# المحركات المقارنة (الاسم: إعدادات المحاكي)
+BENCHMARK_ENGINES = {
+    'python': {'engine': 'python'},
+    'numpy': {'engine': 'numpy'},
+    'tape': {'use_shared_tape': True}
+}
+
+# شبكة القياس الافتراضية والمختصرة (--quick)
+BENCHMARK_GRID = {
+    'max_bets': [5, 10],
+    'trials': [100, 1000],
+    'workers': [1, 2, 4],
+    'calls': 20000,
+    'sweep_max_bet': 5,
+    'excel_rows': 20000
+}
+
+QUICK_GRID = {
+    'max_bets': [5],
+    'trials': [200],
+    'workers': [1, 2],
+    'calls': 5000,
+    'sweep_max_bet': 3,
+    'excel_rows': 2000
+}
+
+# أقصى تباطؤ مسموح مقارنة بملف الأساس (10%)
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+BENCHMARK_SEED = 20240101
+
+
+def make_simulator(config, resume=False):
+    """محاكي بدون طباعة (الملفات تُكتب في المجلد الحالي المؤقت)"""
+    config = dict(config, seed=BENCHMARK_SEED, metrics_interval=0, save_interval=10 ** 9)
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulator = FullCrazyTimeSimulator(config, resume=resume, verbose=False)
+        if simulator.uses_tape and simulator.tape is None:
+            simulator.open_tape(create=True)
+        return simulator
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    """تنفيذ مؤقت داخل مجلد آخر (ملفات المحاكي نسبية)"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def timed(func, repeats):
+    """أفضل زمن من عدة تكرارات (أقل تأثراً بالضوضاء)"""
+    best = None
+    value = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def result_row(name, params, seconds, operations, trials=None):
+    """صف نتيجة موحد"""
+    row = {
+        'name': name,
+        'params': params,
+        'seconds': round(seconds, 6),
+        'operations': operations,
+        'ops_per_second': round(operations / seconds, 3) if seconds > 0 else None
+    }
+    if trials is not None:
+        row['trials_per_second'] = round(trials / seconds, 1) if seconds > 0 else None
+    return row
+
+
+def bench_calculate_payout(grid, repeats):
+    """calculate_payout على تركيبة تغطي جميع الخيارات"""
+    simulator = make_simulator({})
+    combination = [1] * len(simulator.betting_options)
+    outcomes = [simulator.spin_wheel() for _ in range(grid['calls'])]
+
+    def run():
+        for outcome in outcomes:
+            simulator.calculate_payout(combination, outcome)
+
+    seconds, _ = timed(run, repeats)
+    return [result_row('calculate_payout', {}, seconds, len(outcomes))]
+
+
+def bench_bonus_multiplier(grid, repeats):
+    """generate_bonus_multiplier لكل لعبة إضافية"""
+    simulator = make_simulator({})
+    rows = []
+    for bonus_type in simulator.bonus_multipliers:
+        def run():
+            for _ in range(grid['calls']):
+                simulator.generate_bonus_multiplier(bonus_type)
+
+        seconds, _ = timed(run, repeats)
+        rows.append(result_row('generate_bonus_multiplier', {'bonus_type': bonus_type}, seconds, grid['calls']))
+    return rows
+
+
+def bench_generate_combinations(grid, repeats):
+    """توليد جميع التركيبات (الفهرس + المرور الكامل على دفعات)"""
+    rows = []
+    for max_bet in grid['max_bets']:
+        simulator = make_simulator({'max_bet_amount': max_bet})
+
+        def run():
+            space = simulator.generate_all_combinations()
+            for start in range(0, len(space), 100000):
+                space.to_array(start, 100000)
+            return len(space)
+
+        seconds, count = timed(run, repeats)
+        rows.append(result_row('generate_all_combinations', {'max_bet_amount': max_bet}, seconds, count))
+    return rows
+
+
+def bench_simulate(grid, repeats, engines):
+    """محاكاة عينة تركيبات موزعة على الفضاء لكل محرك"""
+    rows = []
+    for engine in engines:
+        for max_bet in grid['max_bets']:
+            for trials in grid['trials']:
+                config = dict(BENCHMARK_ENGINES[engine], max_bet_amount=max_bet, trials_per_combination=trials)
+                simulator = make_simulator(config)
+                sample = calibration_sample(simulator.generate_all_combinations())
+                if simulator.tape is not None:
+                    sample = np.array(sample, dtype=np.int64)
+
+                def run():
+                    simulator.metrics.reset()
+                    simulator.record_results(simulator.simulate_combinations(sample, 0))
+                    return simulator.metrics.trials
+
+                seconds, simulated = timed(run, repeats)
+                params = {'engine': engine, 'max_bet_amount': max_bet, 'trials_per_combination': trials}
+                rows.append(result_row('simulate_combination', params, seconds, len(sample), simulated))
+    return rows
+
+
+def bench_workers(grid, engines):
+    """مسح كامل لفضاء صغير بعدد مختلف من العمليات المتوازية"""
+    from crazy_time_parallel import run_parallel_sweep
+
+    rows = []
+    for engine in engines:
+        for workers in grid['workers']:
+            config = dict(BENCHMARK_ENGINES[engine], max_bet_amount=grid['sweep_max_bet'],
+                          trials_per_combination=grid['trials'][0], workers=workers, chunk_size=200)
+            with tempfile.TemporaryDirectory() as directory, working_directory(directory):
+                simulator = make_simulator(config, resume=True)
+                space = simulator.generate_all_combinations()
+                simulator.total_combinations = len(space)
+
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if workers > 1:
+                        run_parallel_sweep(simulator, space)
+                    else:
+                        for start in range(0, len(space), simulator.sweep_block_size()):
+                            simulator.simulate_block(space, start, min(start + simulator.sweep_block_size(), len(space)))
+                seconds = time.perf_counter() - started
+
+            params = {'engine': engine, 'workers': workers, 'max_bet_amount': grid['sweep_max_bet'],
+                      'trials_per_combination': grid['trials'][0]}
+            rows.append(result_row('sweep', params, seconds, len(space), simulator.metrics.trials))
+    return rows
+
+
+def bench_excel_export(grid, repeats):
+    """تصدير Excel لعدد ثابت من الصفوف"""
+    with tempfile.TemporaryDirectory() as directory, working_directory(directory):
+        simulator = make_simulator({'max_bet_amount': 40, 'use_shared_tape': True,
+                                    'trials_per_combination': 50}, resume=True)
+        space = simulator.generate_all_combinations()
+        simulator.record_results(simulator.simulate_combinations(space.to_array(0, grid['excel_rows'])))
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulator.save_results()
+            seconds, _ = timed(simulator.export_to_excel, repeats)
+        rows = len(simulator.results_store)
+    return [result_row('export_to_excel', {'rows': rows}, seconds, rows)]
+
+
+def add_speedups(rows):
+    """نسبة التسريع مقارنة بمحرك python بنفس المعايير"""
+    baseline = {}
+    for row in rows:
+        if row['params'].get('engine') == 'python':
+            key = (row['name'], json.dumps({k: v for k, v in row['params'].items() if k != 'engine'}, sort_keys=True))
+            baseline[key] = row['ops_per_second']
+
+    for row in rows:
+        if 'engine' not in row['params']:
+            continue
+        key = (row['name'], json.dumps({k: v for k, v in row['params'].items() if k != 'engine'}, sort_keys=True))
+        if baseline.get(key):
+            row['speedup_vs_python'] = round(row['ops_per_second'] / baseline[key], 2)
+
+
+def row_key(row):
+    return f"{row['name']} {json.dumps(row['params'], sort_keys=True, ensure_ascii=False)}"
+
+
+def compare_with_baseline(rows, baseline_rows, threshold):
+    """مقارنة مع نتائج سابقة وإرجاع قائمة التباطؤات الأكبر من الحد"""
+    baseline = {row_key(row): row for row in baseline_rows}
+    regressions = []
+    for row in rows:
+        previous = baseline.get(row_key(row))
+        if previous is None or not previous.get('ops_per_second') or not row.get('ops_per_second'):
+            continue
+        ratio = row['ops_per_second'] / previous['ops_per_second']
+        row['baseline_ratio'] = round(ratio, 3)
+        if ratio < 1 - threshold:
+            regressions.append((row_key(row), ratio))
+    return regressions
+
+
+def run_benchmarks(grid, engines, repeats, include_workers=True, include_excel=True):
+    """تشغيل جميع القياسات وإرجاع قائمة الصفوف"""
+    rows = []
+    with tempfile.TemporaryDirectory() as directory, working_directory(directory):
+        steps = [
+            ('calculate_payout', lambda: bench_calculate_payout(grid, repeats)),
+            ('generate_bonus_multiplier', lambda: bench_bonus_multiplier(grid, repeats)),
+            ('generate_all_combinations', lambda: bench_generate_combinations(grid, repeats)),
+            ('simulate_combination', lambda: bench_simulate(grid, repeats, engines))
+        ]
+        if include_workers:
+            steps.append(('sweep', lambda: bench_workers(grid, engines)))
+        if include_excel:
+            steps.append(('export_to_excel', lambda: bench_excel_export(grid, 1)))
+
+        for name, step in steps:
+            print(f"⏱️ قياس {name}...")
+            rows.extend(step())
+
+    add_speedups(rows)
+    return rows
+
+
+def print_rows(rows):
+    for row in rows:
+        params = ', '.join(f"{key}={value}" for key, value in row['params'].items())
+        line = f"   • {row['name']}({params}): {row['ops_per_second']:,.1f}/ث"
+        if 'trials_per_second' in row:
+            line += f" | {row['trials_per_second']:,.0f} جولة/ث"
+        if 'speedup_vs_python' in row:
+            line += f" | ×{row['speedup_vs_python']}"
+        if 'baseline_ratio' in row:
+            line += f" | مقارنة بالأساس: {row['baseline_ratio']:.2f}"
+        print(line)
+
+
+def main(argv=None):
+    """تشغيل القياسات من سطر الأوامر"""
+    parser = argparse.ArgumentParser(description="قياس سرعة محاكي Crazy Time")
+    parser.add_argument('--quick', action='store_true', help="شبكة قياس مختصرة")
+    parser.add_argument('--engines', default=','.join(BENCHMARK_ENGINES),
+                        help="المحركات المقاسة مفصولة بفواصل (python,numpy,tape)")
+    parser.add_argument('--max-bets', help="قيم max_bet_amount مفصولة بفواصل")
+    parser.add_argument('--trials', help="قيم trials_per_combination مفصولة بفواصل")
+    parser.add_argument('--workers', help="أعداد العمليات المتوازية مفصولة بفواصل")
+    parser.add_argument('--repeats', type=int, default=3, help="عدد التكرارات (يُؤخذ الأفضل)")
+    parser.add_argument('--no-workers', action='store_true', help="تخطي قياس التوسع مع العمليات")
+    parser.add_argument('--no-excel', action='store_true', help="تخطي قياس تصدير Excel")
+    parser.add_argument('--output', default='benchmark_results.json', help="ملف نتائج JSON")
+    parser.add_argument('--baseline', help="ملف نتائج سابق للمقارنة")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="أقصى تباطؤ مسموح (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    grid = dict(QUICK_GRID if args.quick else BENCHMARK_GRID)
+    for key, value in (('max_bets', args.max_bets), ('trials', args.trials), ('workers', args.workers)):
+        if value:
+            grid[key] = [int(item) for item in value.split(',')]
+
+    engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+    unknown = [engine for engine in engines if engine not in BENCHMARK_ENGINES]
+    if unknown:
+        parser.error(f"محرك غير معروف: {', '.join(unknown)}")
+
+    print("🏎️ قياس سرعة محاكي Crazy Time")
+    print("=" * 60)
+    rows = run_benchmarks(grid, engines, args.repeats, not args.no_workers, not args.no_excel)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(rows, json.load(f)['results'], args.threshold)
+
+    print("=" * 60)
+    print_rows(rows)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'grid': grid,
+        'threshold': args.threshold,
+        'results': rows,
+        'regressions': [{'benchmark': key, 'ratio': round(ratio, 3)} for key, ratio in regressions]
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 تم حفظ النتائج في {args.output}")
+
+    if regressions:
+        print(f"\n❌ تباطؤ أكبر من {args.threshold:.0%} في {len(regressions)} قياس:")
+        for key, ratio in regressions:
+            print(f"   • {key}: {ratio:.2f}×")
+        return 1
+
+    if args.baseline:
+        print("✅ لا يوجد تباطؤ مقارنة بالأساس")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
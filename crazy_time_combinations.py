@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+فهرسة تركيبات الرهان بدون توليد القائمة الكاملة
+===============================================
+- نظام أعداد تركيبي يحول الفهرس إلى تركيبة (unrank) والتركيبة إلى فهرس (rank)
+- نفس ترتيب التوليد الأصلي: حسب إجمالي الرهان ثم ترتيب معجمي
+- مولد يبدأ من أي فهرس بذاكرة ثابتة
+- ضغط التركيبة في عدد صحيح واحد (8 بت لكل خيار رهان)
+"""
+
+from itertools import islice
+from math import comb
+
+import numpy as np
+
+# عدد خيارات الرهان في كل تركيبة
+NUM_BETS = 8
+
+# ضغط التركيبة في عدد صحيح بدون إشارة (64 بت)
+PACK_BITS = 8
+MAX_PACKED_BET = (1 << PACK_BITS) - 1
+PACK_SHIFTS = np.arange(NUM_BETS - 1, -1, -1, dtype=np.uint64) * np.uint64(PACK_BITS)
+
+
+def pack_combination(combination):
+    """ضغط تركيبة واحدة في عدد صحيح"""
+    key = 0
+    for bet in combination:
+        if not 0 <= bet <= MAX_PACKED_BET:
+            raise ValueError(f"قيمة الرهان خارج النطاق المسموح للضغط: {bet}")
+        key = (key << PACK_BITS) | int(bet)
+    return key
+
+
+def unpack_combination(key):
+    """استرجاع تركيبة واحدة من عددها المضغوط"""
+    key = int(key)
+    return [(key >> (PACK_BITS * position)) & MAX_PACKED_BET for position in range(NUM_BETS - 1, -1, -1)]
+
+
+def pack_combinations(combinations):
+    """ضغط مصفوفة تركيبات (صفوف × 8) في مصفوفة أعداد uint64"""
+    combinations = np.asarray(combinations, dtype=np.int64).reshape(-1, NUM_BETS)
+    if combinations.size and (combinations.min() < 0 or combinations.max() > MAX_PACKED_BET):
+        raise ValueError("قيمة الرهان خارج النطاق المسموح للضغط")
+    return np.bitwise_or.reduce(combinations.astype(np.uint64) << PACK_SHIFTS, axis=1)
+
+
+def unpack_combinations(keys):
+    """استرجاع مصفوفة تركيبات (صفوف × 8) من أعدادها المضغوطة"""
+    keys = np.asarray(keys, dtype=np.uint64).reshape(-1, 1)
+    return ((keys >> PACK_SHIFTS) & np.uint64(MAX_PACKED_BET)).astype(np.int64)
+
+
+def count_with_sum(total, parts=NUM_BETS):
+    """عدد التركيبات التي مجموعها = total"""
+    return comb(total + parts - 1, parts - 1)
+
+
+def count_below_sum(total, parts=NUM_BETS):
+    """عدد التركيبات التي مجموعها أقل من total (صيغة مغلقة)"""
+    if total <= 0:
+        return 0
+    return comb(total + parts - 1, parts)
+
+
+def count_combinations(min_bet, max_bet, parts=NUM_BETS):
+    """إجمالي التركيبات بين أقل وأكبر رهان"""
+    if max_bet < min_bet:
+        return 0
+    return count_below_sum(max_bet + 1, parts) - count_below_sum(min_bet, parts)
+
+
+def shard_bounds(size, index, count):
+    """بداية ونهاية الجزء رقم index من count جزء متساوٍ تقريباً"""
+    if not 0 <= index < count:
+        raise ValueError(f"رقم الجزء خارج النطاق: {index} من {count}")
+    return (size * index) // count, (size * (index + 1)) // count
+
+
+class CombinationSpace:
+    """فضاء التركيبات المفهرس (بديل كسول لقائمة التركيبات الكاملة)"""
+
+    # فهرس أول تركيبة في الفضاء الكامل (مفتاح سلاسل الأرقام العشوائية)
+    index_offset = 0
+
+    def __init__(self, min_bet, max_bet, parts=NUM_BETS):
+        self.min_bet = min_bet
+        self.max_bet = max_bet
+        self.parts = parts
+        self.base_offset = count_below_sum(min_bet, parts)
+        self.size = count_combinations(min_bet, max_bet, parts)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        return self.unrank(index)
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def rank(self, combination):
+        """فهرس التركيبة في ترتيب التوليد"""
+        remaining = sum(combination)
+        index = count_below_sum(remaining, self.parts) - self.base_offset
+
+        # عدد التركيبات التي تسبقها بنفس المجموع (ترتيب معجمي)
+        for position in range(self.parts - 1):
+            slots = self.parts - position
+            value = combination[position]
+            index += comb(remaining + slots - 1, slots - 1) - comb(remaining - value + slots - 1, slots - 1)
+            remaining -= value
+
+        return index
+
+    def locate(self, combination):
+        """فهرس تركيبة في هذا الفضاء (ValueError إذا لم تكن ضمنه)"""
+        if len(combination) != self.parts or min(combination) < 0 or \
+                not self.min_bet <= sum(combination) <= self.max_bet:
+            raise ValueError(f"التركيبة ليست ضمن فضاء التركيبات: {list(combination)}")
+        return self.rank(combination)
+
+    def unrank(self, index):
+        """التركيبة المقابلة للفهرس"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"فهرس التركيبة خارج النطاق: {index}")
+
+        # تحديد إجمالي الرهان
+        total = self.min_bet
+        while count_below_sum(total + 1, self.parts) - self.base_offset <= index:
+            total += 1
+        offset = index - (count_below_sum(total, self.parts) - self.base_offset)
+
+        combination = []
+        remaining = total
+        for position in range(self.parts - 1):
+            slots = self.parts - position
+            # أصغر قيمة u للمتبقي بعد هذا الموضع بحيث C(u+slots-1, slots-1) >= الهدف
+            target = comb(remaining + slots - 1, slots - 1) - offset
+            low, high = 0, remaining
+            while low < high:
+                middle = (low + high) // 2
+                if comb(middle + slots - 1, slots - 1) >= target:
+                    high = middle
+                else:
+                    low = middle + 1
+            value = remaining - low
+            combination.append(value)
+            offset -= comb(remaining + slots - 1, slots - 1) - comb(low + slots - 1, slots - 1)
+            remaining = low
+
+        combination.append(remaining)
+        return combination
+
+    def iter_from(self, start=0):
+        """توليد التركيبات بالترتيب بدءاً من فهرس معين"""
+        if start >= self.size:
+            return
+
+        combination = self.unrank(start)
+        last_position = self.parts - 1
+
+        for _ in range(start, self.size):
+            yield list(combination)
+
+            # أقرب موضع غير صفري من اليمين (باستثناء الموضع الأول)
+            position = last_position
+            while position > 0 and combination[position] == 0:
+                position -= 1
+
+            if position == 0:
+                # الانتقال إلى إجمالي الرهان التالي
+                combination = [0] * last_position + [combination[0] + 1]
+            else:
+                moved = combination[position]
+                combination[position] = 0
+                combination[position - 1] += 1
+                combination[last_position] = moved - 1
+
+    def to_array(self, start, count):
+        """مصفوفة NumPy لكتلة تركيبات متتالية (صفوف × 8)"""
+        count = max(0, min(count, self.size - start))
+        combinations = list(islice(self.iter_from(start), count))
+        return np.array(combinations, dtype=np.int64).reshape(count, self.parts)
+
+    def shard(self, index, count):
+        """الجزء رقم index من count جزء متتالٍ"""
+        return RangeSpace(self, *shard_bounds(self.size, index, count))
+
+
+class ShortlistSpace:
+    """فضاء فرعي من تركيبات مختارة (بنفس واجهة CombinationSpace)"""
+
+    index_offset = 0
+
+    def __init__(self, space, ranks):
+        self.space = space
+        self.ranks = list(ranks)
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def __getitem__(self, index):
+        return self.space.unrank(self.ranks[index])
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def locate(self, combination):
+        """موضع تركيبة في القائمة المختصرة (ValueError إذا لم تكن ضمنها)"""
+        rank = self.space.locate(combination)
+        try:
+            return self.ranks.index(rank)
+        except ValueError:
+            raise ValueError(f"التركيبة ليست ضمن القائمة المختصرة: {list(combination)}")
+
+    def iter_from(self, start=0):
+        """توليد التركيبات المختارة بدءاً من موضع معين"""
+        for rank in self.ranks[start:]:
+            yield self.space.unrank(rank)
+
+    def to_array(self, start=0, count=None):
+        """مصفوفة NumPy (صفوف × 8) لجزء من التركيبات المختارة"""
+        ranks = self.ranks[start:] if count is None else self.ranks[start:start + count]
+        return np.array([self.space.unrank(rank) for rank in ranks], dtype=np.int64).reshape(-1, NUM_BETS)
+
+    def shard(self, index, count):
+        """الجزء رقم index من count جزء متتالٍ"""
+        return RangeSpace(self, *shard_bounds(len(self), index, count))
+
+
+class RangeSpace:
+    """نطاق متتالٍ [start, end) من فضاء آخر (جزء في التشغيل الموزع)"""
+
+    def __init__(self, space, start, end):
+        self.space = space
+        self.start = start
+        self.end = end
+        self.index_offset = space.index_offset + start
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(f"فهرس التركيبة خارج النطاق: {index}")
+        return self.space[self.start + index]
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def locate(self, combination):
+        """موضع تركيبة في النطاق (ValueError إذا كانت في جزء آخر)"""
+        index = self.space.locate(combination) - self.start
+        if not 0 <= index < len(self):
+            raise ValueError(f"التركيبة ليست ضمن هذا الجزء: {list(combination)}")
+        return index
+
+    def iter_from(self, start=0):
+        """توليد تركيبات النطاق بدءاً من موضع معين"""
+        return islice(self.space.iter_from(self.start + start), max(0, len(self) - start))
+
+    def to_array(self, start=0, count=None):
+        """مصفوفة NumPy (صفوف × 8) لجزء من النطاق"""
+        count = len(self) - start if count is None else min(count, len(self) - start)
+        return self.space.to_array(self.start + start, max(0, count))
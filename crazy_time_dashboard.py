@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+لوحة الرسوم البيانية المباشرة للواجهة الرسومية
+==============================================
+- السرعة عبر الزمن، توزيع المبلغ النهائي، أفضل نتيجة حتى الآن، ونسبة الربح مقابل إجمالي الرهان
+- تُغذّى من الإحصائيات الجارية في رسائل التقدم (بدون إعادة قراءة النتائج)
+- السلاسل الزمنية بحجم ثابت (تقليص min/max)، والرسم بطريقة blitting بمعدل إطارات محدود
+"""
+
+import time
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# أقصى عدد مرات إعادة الرسم في الثانية، وعدد فئات كل سلسلة زمنية
+DASHBOARD_FPS = 2
+SERIES_CAPACITY = 1000
+
+
+class MinMaxSeries:
+    """سلسلة بحجم محدود: كل فئة تحفظ أصغر وأكبر قيمة، وعند الامتلاء تُدمج كل فئتين متجاورتين"""
+
+    def __init__(self, capacity=SERIES_CAPACITY):
+        self.capacity = capacity
+        self.width = 1
+        # كل فئة: [x الأصغر، y الأصغر، x الأكبر، y الأكبر، عدد النقاط]
+        self.buckets = []
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def clear(self):
+        self.width = 1
+        self.buckets = []
+
+    def append(self, x, y):
+        """إضافة نقطة (تكلفة ثابتة مستهلكة)"""
+        if self.buckets and self.buckets[-1][4] < self.width:
+            bucket = self.buckets[-1]
+            if y < bucket[1]:
+                bucket[0], bucket[1] = x, y
+            if y > bucket[3]:
+                bucket[2], bucket[3] = x, y
+            bucket[4] += 1
+            return
+
+        self.buckets.append([x, y, x, y, 1])
+        if len(self.buckets) > self.capacity:
+            self.compact()
+
+    def compact(self):
+        """دمج كل فئتين متجاورتين (مضاعفة عرض الفئة)"""
+        merged = []
+        for first, second in zip(self.buckets[::2], self.buckets[1::2]):
+            low = first if first[1] <= second[1] else second
+            high = first if first[3] >= second[3] else second
+            merged.append([low[0], low[1], high[2], high[3], first[4] + second[4]])
+        if len(self.buckets) % 2:
+            merged.append(self.buckets[-1])
+        self.buckets = merged
+        self.width *= 2
+
+    def points(self):
+        """نقاط الرسم: نقطتا الأصغر والأكبر لكل فئة بترتيب x"""
+        xs = []
+        ys = []
+        for x_low, y_low, x_high, y_high, _ in self.buckets:
+            if x_low == x_high:
+                xs.append(x_low)
+                ys.append(y_low if y_low == y_high else y_high)
+            elif x_low < x_high:
+                xs += (x_low, x_high)
+                ys += (y_low, y_high)
+            else:
+                xs += (x_high, x_low)
+                ys += (y_high, y_low)
+        return xs, ys
+
+
+def expand_limits(ax, xs, ys, grow=1.5):
+    """توسيع حدود المحاور عند خروج البيانات عنها (يتطلب إعادة رسم كاملة)"""
+    if len(xs) == 0:
+        return False
+
+    changed = False
+    x_low, x_high = ax.get_xlim()
+    x_min, x_max = float(np.min(xs)), float(np.max(xs))
+    if x_min < x_low or x_max > x_high:
+        span = max(x_max - x_min, 1e-9)
+        ax.set_xlim(x_min, x_min + span * grow)
+        changed = True
+
+    y_low, y_high = ax.get_ylim()
+    y_min, y_max = float(np.min(ys)), float(np.max(ys))
+    if y_min < y_low or y_max > y_high:
+        margin = max(y_max - y_min, abs(y_max), 1.0) * 0.1
+        ax.set_ylim(y_min - margin, y_max + margin)
+        changed = True
+    return changed
+
+
+class Dashboard:
+    """الرسوم البيانية المضمنة في نافذة Tk"""
+
+    def __init__(self, parent, max_fps=DASHBOARD_FPS):
+        self.max_fps = max_fps
+        self.figure = Figure(figsize=(10, 5), dpi=80)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.widget = self.canvas.get_tk_widget()
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+        # عناوين الرسوم بالإنجليزية: matplotlib لا يدعم تشكيل الحروف العربية
+        (self.speed_ax, self.histogram_ax), (self.best_ax, self.bet_ax) = self.figure.subplots(2, 2)
+        self.speed_ax.set_title("Throughput (combinations/s)")
+        self.speed_ax.set_xlabel("elapsed (min)")
+        self.histogram_ax.set_title("Final balance distribution")
+        self.histogram_ax.set_xlabel("final balance ($)")
+        self.best_ax.set_title("Best final balance so far")
+        self.best_ax.set_xlabel("combinations tested")
+        self.bet_ax.set_title("Profit % vs total bet (min / mean / max)")
+        self.bet_ax.set_xlabel("total bet ($)")
+        self.figure.tight_layout()
+
+        self.speed_line, = self.speed_ax.plot([], [], color='#2980b9', animated=True)
+        self.best_line, = self.best_ax.plot([], [], color='#27ae60', drawstyle='steps-post', animated=True)
+        self.bet_lines = [self.bet_ax.plot([], [], color=color, linestyle=style, animated=True)[0]
+                          for color, style in (('#e74c3c', ':'), ('#2c3e50', '-'), ('#27ae60', ':'))]
+        self.bars = None
+
+        self.speed = MinMaxSeries()
+        self.best = MinMaxSeries()
+        self.last_sample = None
+        self.histogram = None
+        self.bet_profile = None
+        self.background = None
+        self.dirty = False
+        self.last_draw = 0.0
+
+    def reset(self):
+        """بدء تشغيل جديد"""
+        self.speed.clear()
+        self.best.clear()
+        self.last_sample = None
+        self.dirty = True
+
+    def update(self, data):
+        """إضافة رسالة تقدم (بدون رسم)"""
+        elapsed = data["elapsed"]
+        tested = data["tested"]
+        if self.last_sample is not None and elapsed > self.last_sample[0]:
+            rate = (tested - self.last_sample[1]) / (elapsed - self.last_sample[0])
+            self.speed.append(elapsed / 60, max(rate, 0.0))
+        self.last_sample = (elapsed, tested)
+
+        best = data.get("best")
+        if best:
+            self.best.append(tested, best['final_balance'])
+
+        stats = data.get("stats")
+        if stats:
+            self.histogram = (stats["histogram_edges"], stats["histogram"])
+            self.bet_profile = stats["bet_profile"]
+        self.dirty = True
+
+    def on_draw(self, event):
+        """بعد كل رسم كامل: حفظ الخلفية (بدون العناصر المتحركة) ثم رسمها فوقها"""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_artists()
+
+    def artists(self):
+        artists = [self.speed_line, self.best_line] + self.bet_lines
+        if self.bars is not None:
+            artists += list(self.bars)
+        return artists
+
+    def draw_artists(self):
+        for artist in self.artists():
+            self.figure.draw_artist(artist)
+
+    def build_bars(self, edges, counts):
+        """أعمدة المدرج (الفئات الداخلية + فئة القيم الأكبر من الحد الأعلى)"""
+        edges = np.asarray(edges)
+        width = edges[1] - edges[0]
+        centers = np.append((edges[:-1] + edges[1:]) / 2, edges[-1] + width / 2)
+        self.bars = self.histogram_ax.bar(centers, np.zeros(len(centers)), width=width * 0.9,
+                                          color='#8e44ad', animated=True)
+        self.histogram_ax.set_xlim(edges[0], edges[-1] + width)
+
+    def apply_data(self):
+        """نقل البيانات إلى العناصر المرسومة، وإرجاع True إذا تغيرت حدود المحاور"""
+        rescale = False
+
+        xs, ys = self.speed.points()
+        self.speed_line.set_data(xs, ys)
+        rescale |= expand_limits(self.speed_ax, xs, ys)
+
+        xs, ys = self.best.points()
+        self.best_line.set_data(xs, ys)
+        rescale |= expand_limits(self.best_ax, xs, ys)
+
+        if self.histogram is not None:
+            edges, counts = self.histogram
+            if self.bars is None:
+                self.build_bars(edges, counts)
+                rescale = True
+            counts = counts[1:]
+            for bar, count in zip(self.bars, counts):
+                bar.set_height(count)
+            top = max(counts) if counts else 0
+            if top > self.histogram_ax.get_ylim()[1]:
+                self.histogram_ax.set_ylim(0, top * 1.5)
+                rescale = True
+
+        if self.bet_profile is not None:
+            bets, _, means, minimums, maximums = self.bet_profile
+            for line, values in zip(self.bet_lines, (minimums, means, maximums)):
+                line.set_data(bets, values)
+            rescale |= expand_limits(self.bet_ax, bets + bets, minimums + maximums, grow=1.1)
+
+        return rescale
+
+    def refresh(self, visible=True):
+        """إعادة الرسم بحد أقصى max_fps مرة في الثانية (فقط عند وجود بيانات جديدة والتبويب ظاهر)"""
+        now = time.monotonic()
+        if not self.dirty or not visible or now - self.last_draw < 1 / self.max_fps:
+            return
+        self.last_draw = now
+        self.dirty = False
+
+        if self.apply_data() or self.background is None:
+            # رسم كامل (حدود جديدة): on_draw يحفظ الخلفية ويرسم العناصر المتحركة
+            self.canvas.draw_idle()
+            return
+
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.figure.bbox)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+محرك NumPy المتجه لمحاكي Crazy Time
+===================================
+- سحب جميع نتائج العجلة ومضاعفات الألعاب الإضافية دفعة واحدة
+- حساب مسار الرصيد والتوقف المبكر بعمليات المصفوفات
+- إرجاع نفس قاموس النتيجة الذي يرجعه المحرك الأصلي
+- نواة دفعات لتقييم عدة تركيبات معاً (مصفوفة تركيبات × جولات) على مراحل
+"""
+
+import numpy as np
+
+
+def longest_run(mask):
+    """طول أطول سلسلة متتالية من القيم الصحيحة"""
+    if not mask.any():
+        return 0
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return int((edges[1::2] - edges[::2]).max())
+
+
+def summarize_session(simulator, combination, total_bet, net_results):
+    """نتيجة جلسة كاملة من صافي كل جولة (مع التوقف المبكر عند الحد الأدنى)"""
+    config = simulator.config
+    trials = len(net_results)
+    stop_level = max(total_bet, config['min_balance_threshold'])
+
+    # مسار الرصيد: trajectory[t] هو الرصيد قبل الجولة t
+    trajectory = np.cumsum(np.concatenate(([config['initial_balance']], net_results)))
+    stopped = trajectory[:-1] < stop_level
+
+    if stopped.any():
+        spins = int(np.argmax(stopped))
+        # مطابق للمحرك الأصلي: الجولة التي حدث عندها التوقف تُحتسب
+        trials_completed = spins + 1
+    else:
+        spins = trials
+        trials_completed = trials
+
+    played = net_results[:spins]
+    is_win = played > 0
+    wins = int(np.count_nonzero(is_win))
+    losses = spins - wins
+    win_values = played[is_win]
+    loss_values = -played[~is_win]
+
+    return simulator.build_result(
+        combination,
+        total_bet,
+        float(trajectory[spins]),
+        trials_completed,
+        wins,
+        losses,
+        float(win_values.sum()),
+        float(loss_values.sum()),
+        float(win_values.max()) if wins else 0,
+        float(loss_values.max()) if losses else 0,
+        longest_run(is_win),
+        longest_run(~is_win)
+    )
+
+
+class NumpySimulationEngine:
+    def __init__(self, simulator, rng=None):
+        self.simulator = simulator
+        self.config = simulator.config
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.samplers = simulator.samplers
+        options = simulator.betting_options
+
+        # مضاعفات ثابتة للأرقام (صفر لمواضع الألعاب الإضافية)
+        self.base_multipliers = np.array(
+            [simulator.number_multipliers.get(option, 0) for option in options], dtype=float
+        )
+        self.bonus_slots = [
+            (index, option) for index, option in enumerate(options)
+            if option not in simulator.number_multipliers
+        ]
+
+    def draw_outcomes(self, size):
+        """سحب مؤشرات نتائج العجلة دفعة واحدة"""
+        return self.samplers.draw_outcomes(self.rng, size)
+
+    def draw_bonus_multipliers(self, bonus_type, size):
+        """سحب مضاعفات لعبة إضافية دفعة واحدة"""
+        return self.samplers.draw_multipliers(bonus_type, self.rng, size)
+
+    def draw_multipliers(self, bets, outcomes):
+        """مضاعف كل جولة (الألعاب الإضافية تُسحب فقط إذا كان عليها رهان)"""
+        multipliers = self.base_multipliers[outcomes]
+        for slot, bonus_type in self.bonus_slots:
+            if bets[slot] > 0:
+                hits = outcomes == slot
+                hit_count = int(np.count_nonzero(hits))
+                if hit_count:
+                    multipliers[hits] = self.draw_bonus_multipliers(bonus_type, hit_count)
+        return multipliers
+
+    def simulate_combination(self, combination):
+        """محاكاة تركيبة رهان واحدة بعمليات المصفوفات"""
+        total_bet = sum(combination)
+
+        if total_bet == 0:
+            return None  # تخطي التركيبات بدون رهان
+
+        bets = np.asarray(combination, dtype=float)
+        outcomes = self.draw_outcomes(self.config['trials_per_combination'])
+        multipliers = self.draw_multipliers(bets, outcomes)
+        net_results = bets[outcomes] * multipliers - total_bet
+
+        return summarize_session(self.simulator, combination, total_bet, net_results)
+
+
+def row_run_lengths(mask, carry):
+    """طول السلسلة الحالية عند كل موضع لكل صف (مع سلسلة مستمرة من الدفعة السابقة)"""
+    counts = np.cumsum(mask, axis=1, dtype=np.int32)
+    # قيمة العداد عند آخر موضع خاطئ قبل كل موضع
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=1)
+    runs = counts - resets
+    if carry.any():
+        # السلسلة الأولى في الدفعة تكمل سلسلة الدفعة السابقة
+        before_first_break = ~np.logical_or.accumulate(~mask, axis=1)
+        runs = runs + np.where(before_first_break, carry[:, None], 0)
+    return runs
+
+
+class BatchSession:
+    """حالة جلسات عدة تركيبات معاً (قابلة للتقديم على مراحل)"""
+
+    def __init__(self, simulator, combinations):
+        config = simulator.config
+        self.config = config
+        self.combinations = np.asarray(combinations, dtype=np.int64).reshape(-1, len(simulator.betting_options))
+        self.total_bet = self.combinations.sum(axis=1)
+        self.stop_level = np.maximum(self.total_bet, config['min_balance_threshold'])
+
+        size = len(self.combinations)
+        self.balance = np.full(size, float(config['initial_balance']))
+        self.spins = np.zeros(size, dtype=np.int64)
+        self.stopped = np.zeros(size, dtype=bool)
+        self.wins = np.zeros(size, dtype=np.int64)
+        self.losses = np.zeros(size, dtype=np.int64)
+        self.total_profit = np.zeros(size)
+        self.total_loss = np.zeros(size)
+        self.max_single_win = np.zeros(size)
+        self.max_single_loss = np.zeros(size)
+        self.win_streak = np.zeros(size, dtype=np.int64)
+        self.loss_streak = np.zeros(size, dtype=np.int64)
+        self.max_win_streak = np.zeros(size, dtype=np.int64)
+        self.max_loss_streak = np.zeros(size, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.combinations)
+
+    def advance(self, net_results, rows=None):
+        """تقديم الجلسات بدفعة جولات (صفوف × جولات) مع التوقف المبكر لكل صف"""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        net_results = np.asarray(net_results, dtype=float)
+        if net_results.shape[1] == 0 or len(rows) == 0:
+            return
+
+        # الرصيد قبل كل جولة
+        balance = self.balance[rows]
+        before = balance[:, None] + np.cumsum(net_results, axis=1) - net_results
+        below = before < self.stop_level[rows][:, None]
+        stops_here = below.any(axis=1) & ~self.stopped[rows]
+        first_stop = np.where(below.any(axis=1), np.argmax(below, axis=1), net_results.shape[1])
+
+        # الجولات المحتسبة: قبل أول توقف فقط، ولا شيء للجلسات المتوقفة سابقاً
+        played_count = np.where(self.stopped[rows], 0, first_stop)
+        played = np.arange(net_results.shape[1])[None, :] < played_count[:, None]
+        is_win = played & (net_results > 0)
+        is_loss = played & ~is_win
+        win_values = np.where(is_win, net_results, 0.0)
+        loss_values = np.where(is_loss, -net_results, 0.0)
+
+        profit = win_values.sum(axis=1)
+        loss = loss_values.sum(axis=1)
+        wins = np.count_nonzero(is_win, axis=1)
+
+        self.balance[rows] = balance + profit - loss
+        self.spins[rows] += played_count
+        self.stopped[rows] |= stops_here
+        self.wins[rows] += wins
+        self.losses[rows] += played_count - wins
+        self.total_profit[rows] += profit
+        self.total_loss[rows] += loss
+        self.max_single_win[rows] = np.maximum(self.max_single_win[rows], win_values.max(axis=1))
+        self.max_single_loss[rows] = np.maximum(self.max_single_loss[rows], loss_values.max(axis=1))
+
+        # السلاسل: الطول عند آخر جولة محتسبة يُنقل للدفعة التالية
+        last = np.maximum(played_count - 1, 0)[:, None]
+        for mask, streak, longest in ((is_win, self.win_streak, self.max_win_streak),
+                                      (is_loss, self.loss_streak, self.max_loss_streak)):
+            runs = row_run_lengths(mask, streak[rows])
+            longest[rows] = np.maximum(longest[rows], runs.max(axis=1))
+            streak[rows] = np.where(played_count > 0, np.take_along_axis(runs, last, axis=1)[:, 0], streak[rows])
+
+    def trials_completed(self):
+        """عدد الجولات المسجل (مطابق للمحرك الأصلي: جولة التوقف تُحتسب)"""
+        return np.where(self.stopped, self.spins + 1, self.spins)
+
+    def results(self):
+        """جميع إحصائيات النتيجة كمصفوفات (نفس مفاتيح قاموس النتيجة)"""
+        initial_balance = self.config['initial_balance']
+        trials_completed = self.trials_completed()
+        return {
+            'combination': self.combinations,
+            'total_bet': self.total_bet,
+            'final_balance': self.balance.copy(),
+            'trials_completed': trials_completed,
+            'wins': self.wins.copy(),
+            'losses': self.losses.copy(),
+            'win_rate': np.divide(self.wins, trials_completed, out=np.zeros(len(self)),
+                                  where=trials_completed > 0),
+            'total_profit': self.total_profit.copy(),
+            'total_loss': self.total_loss.copy(),
+            'max_single_win': self.max_single_win.copy(),
+            'max_single_loss': self.max_single_loss.copy(),
+            'max_win_streak': self.max_win_streak.copy(),
+            'max_loss_streak': self.max_loss_streak.copy(),
+            'profit_percentage': (self.balance - initial_balance) / initial_balance * 100,
+            'average_win': np.divide(self.total_profit, self.wins, out=np.zeros(len(self)),
+                                     where=self.wins > 0),
+            'average_loss': np.divide(self.total_loss, self.losses, out=np.zeros(len(self)),
+                                      where=self.losses > 0)
+        }
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+تصدير نتائج محاكي Crazy Time (Excel / CSV / Parquet)
+===================================================
+- قراءة مخزن النتائج على أجزاء وكتابة الصفوف بكاتب openpyxl منخفض الذاكرة (write_only)
+- تقسيم تلقائي على عدة أوراق (حد Excel 1,048,576 صف) وعدة ملفات
+- أوراق أفضل النتائج والملخص من الإحصائيات الجارية (بدون إعادة المرور على المخزن)
+- المخزن ونقطة التوقف يُقرآن فقط: السجلات المؤكدة وحدها تُصدَّر حتى أثناء تشغيل المحاكاة
+- CSV و Parquet بعدة عمليات متوازية (كل عملية تكتب نطاقاً متصلاً من المخزن)
+
+الاستخدام:
+    python crazy_time_export.py                               (Excel بإعدادات الملفات الافتراضية)
+    python crazy_time_export.py --format csv --workers 8
+    python crazy_time_export.py --format parquet --output results.parquet   (يتطلب pyarrow)
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from openpyxl import Workbook
+
+from full_crazy_time_simulator import FullCrazyTimeSimulator, EXIT_USAGE, build_run_config
+from crazy_time_combinations import shard_bounds
+from crazy_time_results import ResultStore, records_to_dataframe
+
+# صفوف البيانات في كل ورقة Excel (الحد 1,048,576 صف بما فيها صف العناوين)
+EXCEL_SHEET_ROWS = 1048575
+EXCEL_SHEETS_PER_FILE = 4
+EXPORT_CHUNK_ROWS = 100000
+RESULTS_SHEET = 'جميع النتائج'
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+
+
+def part_path(path, index, count):
+    """اسم ملف الجزء (الملف نفسه إذا كان جزءاً واحداً)"""
+    if count == 1:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.part{index + 1}{extension}"
+
+
+def plan_excel_files(rows, sheet_rows=EXCEL_SHEET_ROWS, sheets_per_file=EXCEL_SHEETS_PER_FILE):
+    """توزيع الصفوف على أوراق وملفات: قائمة ملفات، كل ملف قائمة نطاقات (بداية، نهاية)"""
+    sheets = [(start, min(start + sheet_rows, rows)) for start in range(0, rows, sheet_rows)] or [(0, 0)]
+    return [sheets[start:start + sheets_per_file] for start in range(0, len(sheets), sheets_per_file)]
+
+
+def iter_frames(records, start, end, chunk_rows=EXPORT_CHUNK_ROWS):
+    """DataFrame لكل جزء من السجلات بين start و end"""
+    for chunk_start in range(start, end, chunk_rows):
+        yield records_to_dataframe(np.array(records[chunk_start:min(chunk_start + chunk_rows, end)]))
+
+
+def append_frame(sheet, frame, header=False):
+    """إلحاق صفوف DataFrame بورقة write_only"""
+    if header:
+        sheet.append(list(frame.columns))
+    for row in frame.itertuples(index=False, name=None):
+        sheet.append(row)
+
+
+def write_excel_file(store_path, path, sheets, first_sheet=0, extra_frames=(), chunk_rows=EXPORT_CHUNK_ROWS):
+    """كتابة ملف Excel واحد: أوراق النتائج ثم الأوراق الإضافية (أفضل النتائج والملخص)"""
+    records = ResultStore(store_path, readonly=True).open_memmap()
+    workbook = Workbook(write_only=True)
+
+    for number, (start, end) in enumerate(sheets, first_sheet + 1):
+        sheet = workbook.create_sheet(RESULTS_SHEET if number == 1 else f"{RESULTS_SHEET} {number}")
+        for chunk_number, frame in enumerate(iter_frames(records, start, end, chunk_rows)):
+            append_frame(sheet, frame, header=chunk_number == 0)
+
+    for sheet_name, frame in extra_frames:
+        append_frame(workbook.create_sheet(sheet_name), frame, header=True)
+
+    workbook.save(path)
+    return path
+
+
+def export_excel(simulator, path=None, workers=1, sheet_rows=EXCEL_SHEET_ROWS,
+                 sheets_per_file=EXCEL_SHEETS_PER_FILE, chunk_rows=EXPORT_CHUNK_ROWS):
+    """تصدير المخزن إلى ملف Excel أو أكثر (الملفات تُكتب بالتوازي عند workers > 1)"""
+    path = path or simulator.file_config['excel_file']
+    files = plan_excel_files(len(simulator.results_store), sheet_rows, sheets_per_file)
+    extra_frames = simulator.report_frames()
+    jobs = []
+    first_sheet = 0
+    for index, sheets in enumerate(files):
+        jobs.append((simulator.results_store.path, part_path(path, index, len(files)), sheets, first_sheet,
+                     extra_frames if index == 0 else (), chunk_rows))
+        first_sheet += len(sheets)
+
+    return run_jobs(write_excel_file, jobs, workers)
+
+
+def write_csv_part(store_path, path, start, end, header, chunk_rows=EXPORT_CHUNK_ROWS):
+    """كتابة نطاق من المخزن إلى ملف CSV (BOM في الجزء الأول فقط ليقرأه Excel بالعربية)"""
+    records = ResultStore(store_path, readonly=True).open_memmap()
+    with open(path, 'w', encoding='utf-8-sig' if header else 'utf-8', newline='') as f:
+        for chunk_number, frame in enumerate(iter_frames(records, start, end, chunk_rows)):
+            frame.to_csv(f, index=False, header=header and chunk_number == 0)
+    return path
+
+
+def export_csv(simulator, path, workers=1, keep_parts=False, chunk_rows=EXPORT_CHUNK_ROWS):
+    """تصدير المخزن إلى CSV بعدة عمليات ثم ضم الأجزاء بالترتيب (أو إبقاؤها منفصلة)"""
+    rows = len(simulator.results_store)
+    count = max(1, min(workers, rows))
+    jobs = []
+    for index in range(count):
+        start, end = shard_bounds(rows, index, count)
+        jobs.append((simulator.results_store.path, part_path(path, index, count), start, end,
+                     index == 0 or keep_parts, chunk_rows))
+    parts = run_jobs(write_csv_part, jobs, workers)
+
+    if keep_parts or count == 1:
+        return parts
+
+    with open(path, 'wb') as target:
+        for part in parts:
+            with open(part, 'rb') as source:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            os.remove(part)
+    return [path]
+
+
+def write_parquet_part(store_path, path, start, end, chunk_rows=EXPORT_CHUNK_ROWS):
+    """كتابة نطاق من المخزن إلى ملف Parquet (مجموعة صفوف لكل جزء)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    records = ResultStore(store_path, readonly=True).open_memmap()
+    writer = None
+    try:
+        for frame in iter_frames(records, start, end, chunk_rows):
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def export_parquet(simulator, path, workers=1, chunk_rows=EXPORT_CHUNK_ROWS):
+    """تصدير المخزن إلى مجلد Parquet (ملف لكل عملية، يُقرأ كمجموعة بيانات واحدة)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ValueError("تصدير Parquet يتطلب مكتبة pyarrow: pip install pyarrow")
+
+    rows = len(simulator.results_store)
+    count = max(1, min(workers, rows))
+    os.makedirs(path, exist_ok=True)
+    jobs = []
+    for index in range(count):
+        start, end = shard_bounds(rows, index, count)
+        jobs.append((simulator.results_store.path, os.path.join(path, f"part-{index:04d}.parquet"),
+                     start, end, chunk_rows))
+    return run_jobs(write_parquet_part, jobs, workers)
+
+
+def run_jobs(func, jobs, workers):
+    """تنفيذ مهام الكتابة بالترتيب أو على عدة عمليات"""
+    if workers <= 1 or len(jobs) <= 1:
+        return [func(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = [pool.submit(func, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def export_results(simulator, fmt='xlsx', path=None, workers=1, **options):
+    """تصدير النتائج بالصيغة المطلوبة وإرجاع قائمة الملفات المكتوبة"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"صيغة تصدير غير معروفة: {fmt}")
+    if path is None:
+        root, _ = os.path.splitext(simulator.file_config['excel_file'])
+        path = simulator.file_config['excel_file'] if fmt == 'xlsx' else f"{root}.{fmt}"
+
+    if fmt == 'xlsx':
+        return export_excel(simulator, path, workers, **options)
+    if fmt == 'csv':
+        return export_csv(simulator, path, workers, **options)
+    return export_parquet(simulator, path, workers, **options)
+
+
+def main(argv=None):
+    """تصدير مخزن النتائج من سطر الأوامر"""
+    parser = argparse.ArgumentParser(description="تصدير نتائج محاكي Crazy Time")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='xlsx', help="صيغة التصدير")
+    parser.add_argument('--output', help="ملف (أو مجلد Parquet) الإخراج")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="عدد عمليات الكتابة المتوازية")
+    parser.add_argument('--config', help="ملف إعدادات JSON (لأسماء الملفات)")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE')
+    parser.add_argument('--shard', metavar='INDEX/COUNT', help="تصدير جزء واحد من مسح موزع")
+    parser.add_argument('--output-dir', help="مجلد ملفات المحاكاة")
+    parser.add_argument('--sheet-rows', type=int, default=EXCEL_SHEET_ROWS, help="صفوف البيانات في كل ورقة Excel")
+    parser.add_argument('--sheets-per-file', type=int, default=EXCEL_SHEETS_PER_FILE,
+                        help="عدد أوراق النتائج في كل ملف Excel")
+    parser.add_argument('--keep-parts', action='store_true', help="إبقاء أجزاء CSV منفصلة بدون ضمها")
+    args = parser.parse_args(argv)
+
+    try:
+        if not 1 <= args.sheet_rows <= EXCEL_SHEET_ROWS or args.sheets_per_file < 1:
+            raise ValueError(f"عدد الصفوف في الورقة يجب أن يكون بين 1 و {EXCEL_SHEET_ROWS:,}")
+        config, file_config = build_run_config(argparse.Namespace(
+            config=args.config, set=args.set, engine=None, workers=None, seed=None,
+            shard=args.shard, output_dir=args.output_dir))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return EXIT_USAGE
+
+    try:
+        # قراءة فقط: التصدير لا يقص المخزن ولا يعيد ضبطه، ويكتفي بالسجلات المؤكدة في نقطة التوقف
+        simulator = FullCrazyTimeSimulator(config, verbose=False, file_config=file_config, readonly=True)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    if len(simulator.results_store) == 0:
+        print(f"⚠️ لا توجد نتائج في {file_config['results_store']}")
+        return 1
+
+    options = {}
+    if args.format == 'xlsx':
+        options = {'sheet_rows': args.sheet_rows, 'sheets_per_file': args.sheets_per_file}
+    elif args.format == 'csv':
+        options = {'keep_parts': args.keep_parts}
+
+    try:
+        paths = export_results(simulator, args.format, args.output, args.workers, **options)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return EXIT_USAGE
+
+    print(f"📊 تم تصدير {len(simulator.results_store):,} نتيجة إلى:")
+    for path in paths:
+        print(f"   - {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
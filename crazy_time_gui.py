@@ -6,17 +6,22 @@
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import threading
-import time
+from tkinter import ttk, messagebox
 import json
 import os
 from datetime import datetime
-import queue
 import sys
+import multiprocessing
 
 # استيراد المحاكي
-from full_crazy_time_simulator import FullCrazyTimeSimulator, SIMULATION_CONFIG
+from full_crazy_time_simulator import SIMULATION_CONFIG, RUN_COMPLETED
+from crazy_time_backend import SimulationBackend, RECENT_EVENT_COUNT
+from crazy_time_table import VirtualTable, LogBuffer
+from crazy_time_dashboard import Dashboard
+from crazy_time_metrics import STAGES, STAGE_LABELS
+
+# فترة فحص خروج عملية المحاكاة بعد انتهائها (مللي ثانية)
+BACKEND_EXIT_POLL_MS = 100
 
 class CrazyTimeGUI:
     def __init__(self, root):
@@ -26,14 +31,12 @@ class CrazyTimeGUI:
         self.root.configure(bg='#2c3e50')
         
         # متغيرات التحكم
-        self.simulator = None
-        self.simulation_thread = None
+        self.backend = None
+        self.helpers = []
         self.is_running = False
         self.is_paused = False
-        self.should_stop = False
-        
-        # قائمة انتظار للرسائل بين الخيوط
-        self.message_queue = queue.Queue()
+        self.is_closing = False
+        self.pending_log = []
         
         # إنشاء الواجهة
         self.create_widgets()
@@ -108,8 +111,39 @@ class CrazyTimeGUI:
         ttk.Entry(settings_frame, textvariable=self.save_interval_var, width=10).grid(row=5, column=1, sticky=tk.W, padx=(5, 0))
         ttk.Label(settings_frame, text="تركيبة").grid(row=5, column=2, sticky=tk.W, padx=(5, 0))
         
+        # محرك المحاكاة
+        ttk.Label(settings_frame, text="محرك المحاكاة:").grid(row=6, column=0, sticky=tk.W, pady=2)
+        self.engine_var = tk.StringVar(value=SIMULATION_CONFIG['engine'])
+        ttk.Combobox(settings_frame, textvariable=self.engine_var, values=["python", "numpy"],
+                     state="readonly", width=8).grid(row=6, column=1, sticky=tk.W, padx=(5, 0))
+        
+        # عدد العمليات المتوازية
+        ttk.Label(settings_frame, text="العمليات المتوازية:").grid(row=7, column=0, sticky=tk.W, pady=2)
+        self.workers_var = tk.StringVar(value=str(SIMULATION_CONFIG['workers']))
+        ttk.Entry(settings_frame, textvariable=self.workers_var, width=10).grid(row=7, column=1, sticky=tk.W, padx=(5, 0))
+        
+        # نمط المسح (كامل أو قائمة مختصرة تحليلية)
+        ttk.Label(settings_frame, text="نمط المسح:").grid(row=8, column=0, sticky=tk.W, pady=2)
+        self.sweep_mode_var = tk.StringVar(value=SIMULATION_CONFIG['sweep_mode'])
+        ttk.Combobox(settings_frame, textvariable=self.sweep_mode_var, values=["full", "analytic_shortlist"],
+                     state="readonly", width=16).grid(row=8, column=1, columnspan=2, sticky=tk.W, padx=(5, 0))
+        
+        ttk.Label(settings_frame, text="حجم القائمة المختصرة:").grid(row=9, column=0, sticky=tk.W, pady=2)
+        self.shortlist_size_var = tk.StringVar(value=str(SIMULATION_CONFIG['analytic_shortlist_size']))
+        ttk.Entry(settings_frame, textvariable=self.shortlist_size_var, width=10).grid(row=9, column=1, sticky=tk.W, padx=(5, 0))
+        
+        # شريط النتائج المشترك
+        self.shared_tape_var = tk.BooleanVar(value=SIMULATION_CONFIG['use_shared_tape'])
+        ttk.Checkbutton(settings_frame, text="شريط نتائج مشترك لجميع التركيبات",
+                        variable=self.shared_tape_var).grid(row=10, column=0, columnspan=3, sticky=tk.W, pady=2)
+        
+        # نمط السباق
+        self.racing_var = tk.BooleanVar(value=SIMULATION_CONFIG['racing'])
+        ttk.Checkbutton(settings_frame, text="نمط السباق (استبعاد مبكر للتركيبات الضعيفة)",
+                        variable=self.racing_var).grid(row=11, column=0, columnspan=3, sticky=tk.W, pady=2)
+        
         # زر تطبيق الإعدادات
-        ttk.Button(settings_frame, text="تطبيق الإعدادات", command=self.apply_settings).grid(row=6, column=0, columnspan=3, pady=(10, 0))
+        ttk.Button(settings_frame, text="تطبيق الإعدادات", command=self.apply_settings).grid(row=12, column=0, columnspan=3, pady=(10, 0))
     
     def create_control_frame(self, parent):
         """إنشاء إطار التحكم"""
@@ -162,7 +196,11 @@ class CrazyTimeGUI:
             ("الوقت المتبقي", "remaining_time"),
             ("أفضل نتيجة", "best_result"),
             ("أفضل تركيبة", "best_combination"),
+            ("متوسط المبلغ النهائي", "mean_balance"),
+            ("معدل النجاح", "success_rate"),
             ("معدل السرعة", "speed_rate"),
+            ("معدل الجولات", "trials_rate"),
+            ("أبطأ المراحل", "stage_timings"),
             ("آخر حفظ", "last_save"),
             ("حالة المحاكاة", "status")
         ]
@@ -174,14 +212,30 @@ class CrazyTimeGUI:
                      foreground="#27ae60", font=("Arial", 9, "bold")).grid(row=i, column=1, sticky=tk.W, padx=(10, 0), pady=2)
     
     def create_log_frame(self, parent):
-        """إنشاء إطار السجل"""
-        log_frame = ttk.LabelFrame(parent, text="📝 سجل العمليات", padding="10")
-        log_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
-        
-        # منطقة النص
-        self.log_text = scrolledtext.ScrolledText(log_frame, height=15, width=80, 
-                                                 font=("Consolas", 9), bg="#34495e", fg="#ecf0f1")
-        self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        """إنشاء إطار السجل وجداول النتائج المباشرة"""
+        notebook = ttk.Notebook(parent)
+        self.notebook = notebook
+        notebook.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
+        
+        # جدول أفضل النتائج (مرتب حسب المبلغ النهائي) وجدول آخر النتائج (الأحدث أولاً)
+        self.top_table = VirtualTable(notebook, sort_key='final_balance')
+        self.recent_table = VirtualTable(notebook, max_rows=RECENT_EVENT_COUNT)
+        
+        log_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(log_frame, text="📝 سجل العمليات")
+        notebook.add(self.top_table, text="🏆 أفضل النتائج")
+        notebook.add(self.recent_table, text="🕒 آخر النتائج")
+        
+        # لوحة الرسوم البيانية (تُرسم فقط عندما يكون التبويب ظاهراً)
+        self.dashboard_frame = ttk.Frame(notebook)
+        self.dashboard = Dashboard(self.dashboard_frame)
+        self.dashboard.widget.pack(fill=tk.BOTH, expand=True)
+        notebook.add(self.dashboard_frame, text="📈 الرسوم البيانية")
+        
+        # منطقة النص (سجل محدود الأسطر)
+        self.log_buffer = LogBuffer(log_frame, height=15, width=80,
+                                    font=("Consolas", 9), bg="#34495e", fg="#ecf0f1")
+        self.log_buffer.text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # أزرار السجل
         log_buttons_frame = ttk.Frame(log_frame)
@@ -190,6 +244,7 @@ class CrazyTimeGUI:
         ttk.Button(log_buttons_frame, text="مسح السجل", command=self.clear_log).grid(row=0, column=0, padx=(0, 5))
         ttk.Button(log_buttons_frame, text="حفظ السجل", command=self.save_log).grid(row=0, column=1, padx=5)
         ttk.Button(log_buttons_frame, text="فتح مجلد النتائج", command=self.open_results_folder).grid(row=0, column=2, padx=5)
+        ttk.Button(log_buttons_frame, text="📊 تصدير Excel", command=self.export_results).grid(row=0, column=3, padx=5)
         
         # تكوين الشبكة
         log_frame.columnconfigure(0, weight=1)
@@ -210,7 +265,13 @@ class CrazyTimeGUI:
                 'min_bet_amount': int(self.min_bet_var.get()),
                 'max_bet_amount': int(self.max_bet_var.get()),
                 'save_interval': int(self.save_interval_var.get()),
-                'top_results_count': 100
+                'top_results_count': 100,
+                'engine': self.engine_var.get(),
+                'workers': int(self.workers_var.get()),
+                'sweep_mode': self.sweep_mode_var.get(),
+                'analytic_shortlist_size': int(self.shortlist_size_var.get()),
+                'use_shared_tape': self.shared_tape_var.get(),
+                'racing': self.racing_var.get()
             }
             
             # التحقق من صحة الإعدادات
@@ -220,34 +281,22 @@ class CrazyTimeGUI:
             if new_config['initial_balance'] <= new_config['min_balance_threshold']:
                 raise ValueError("الميزانية الأولية يجب أن تكون أكبر من الحد الأدنى")
             
+            if new_config['workers'] < 1:
+                raise ValueError("عدد العمليات المتوازية يجب أن يكون 1 على الأقل")
+            
             # حفظ الإعدادات
             with open('gui_settings.json', 'w', encoding='utf-8') as f:
                 json.dump(new_config, f, indent=2, ensure_ascii=False)
             
             self.log_message("✅ تم تطبيق الإعدادات بنجاح")
             
-            # حساب عدد التركيبات المتوقع
-            total_combinations = self.calculate_total_combinations(new_config)
-            estimated_time = (total_combinations * new_config['trials_per_combination'] * 0.0001) / 3600
-            
-            self.log_message(f"📊 إجمالي التركيبات المتوقعة: {total_combinations:,}")
-            self.log_message(f"⏱️ الوقت المتوقع: ~{estimated_time:.1f} ساعة")
+            # تقدير الوقت من جولة معايرة قصيرة في عملية منفصلة (النتيجة تصل كحدث estimate)
+            self.helpers.append(SimulationBackend('estimate', new_config).start())
             
         except ValueError as e:
             messagebox.showerror("خطأ في الإعدادات", str(e))
             self.log_message(f"❌ خطأ في الإعدادات: {e}")
     
-    def calculate_total_combinations(self, config):
-        """حساب إجمالي التركيبات"""
-        total = 0
-        for k in range(config['min_bet_amount'], config['max_bet_amount'] + 1):
-            # حساب C(k+7, 7) باستخدام الصيغة
-            combinations = 1
-            for i in range(7):
-                combinations = combinations * (k + 7 - i) // (i + 1)
-            total += combinations
-        return total
-    
     def start_simulation(self):
         """بدء المحاكاة"""
         if self.is_running:
@@ -264,19 +313,20 @@ class CrazyTimeGUI:
                 with open('gui_settings.json', 'r', encoding='utf-8') as f:
                     config = json.load(f)
             
-            # إنشاء المحاكي
-            self.simulator = FullCrazyTimeSimulator(config)
-            
             # تحديث حالة الأزرار
             self.start_button.config(state="disabled")
             self.pause_button.config(state="normal")
             self.stop_button.config(state="normal")
             
-            # بدء المحاكاة في خيط منفصل
+            # الجداول تُعبأ من جديد بفروقات عملية المحاكاة الجديدة
+            self.top_table.clear()
+            self.recent_table.clear()
+            self.dashboard.reset()
+            
+            # بدء المحاكاة في عملية منفصلة (حلقة أحداث الواجهة لا تشارك المحاكاة في GIL)
             self.is_running = True
-            self.should_stop = False
-            self.simulation_thread = threading.Thread(target=self.run_simulation_thread, daemon=True)
-            self.simulation_thread.start()
+            self.is_paused = False
+            self.backend = SimulationBackend('run', config).start()
             
             self.log_message("🚀 تم بدء المحاكاة...")
             
@@ -290,6 +340,7 @@ class CrazyTimeGUI:
             return
         
         self.is_paused = True
+        self.backend.send('pause')
         self.pause_button.config(state="disabled")
         self.resume_button.config(state="normal")
         self.log_message("⏸️ تم إيقاف المحاكاة مؤقتاً")
@@ -300,6 +351,7 @@ class CrazyTimeGUI:
             return
         
         self.is_paused = False
+        self.backend.send('resume')
         self.pause_button.config(state="normal")
         self.resume_button.config(state="disabled")
         self.log_message("▶️ تم استئناف المحاكاة")
@@ -312,112 +364,57 @@ class CrazyTimeGUI:
         result = messagebox.askyesno("تأكيد الإيقاف", "هل أنت متأكد من إيقاف المحاكاة؟\nسيتم حفظ التقدم الحالي.")
         
         if result:
-            self.should_stop = True
+            self.backend.send('stop')
             self.log_message("⏹️ جاري إيقاف المحاكاة وحفظ التقدم...")
     
-    def run_simulation_thread(self):
-        """تشغيل المحاكاة في خيط منفصل"""
-        try:
-            # توليد التركيبات
-            if self.simulator.total_combinations == 0:
-                self.message_queue.put(("log", "📊 توليد جميع التركيبات..."))
-                all_combinations = self.simulator.generate_all_combinations()
-                self.simulator.total_combinations = len(all_combinations)
-                self.message_queue.put(("log", f"📈 إجمالي التركيبات: {self.simulator.total_combinations:,}"))
-            else:
-                all_combinations = self.simulator.generate_all_combinations()
+    def update_gui(self):
+        """تحديث الواجهة بناءً على أحداث عمليات المحاكاة"""
+        messages = []
+        if self.backend is not None:
+            messages.extend((event, data, self.backend) for event, data in self.backend.poll_events())
+        for helper in list(self.helpers):
+            messages.extend((event, data, helper) for event, data in helper.poll_events())
+            if helper.finished:
+                self.helpers.remove(helper)
+        
+        for message_type, data, source in messages:
             
-            if self.simulator.start_time is None:
-                self.simulator.start_time = time.time()
+            if message_type == "log":
+                self.log_message(data)
             
-            last_save_time = time.time()
-            last_update_time = time.time()
+            elif message_type == "progress":
+                self.update_progress(data)
+                self.dashboard.update(data)
             
-            # بدء المحاكاة
-            for i in range(self.simulator.current_combination_index, len(all_combinations)):
-                # فحص الإيقاف
-                if self.should_stop:
-                    break
-                
-                # فحص الإيقاف المؤقت
-                while self.is_paused and not self.should_stop:
-                    time.sleep(0.1)
-                
-                if self.should_stop:
-                    break
-                
-                combination = all_combinations[i]
-                
-                # محاكاة التركيبة
-                result = self.simulator.simulate_combination(combination)
-                
-                if result:
-                    self.simulator.all_results.append(result)
-                    self.simulator.update_top_results(result)
-                    self.simulator.tested_combinations += 1
-                
-                self.simulator.current_combination_index = i + 1
-                
-                # تحديث الواجهة كل ثانية
-                current_time = time.time()
-                if current_time - last_update_time >= 1.0:
-                    progress = ((i + 1) / len(all_combinations)) * 100
-                    elapsed = current_time - self.simulator.start_time
-                    
-                    self.message_queue.put(("progress", {
-                        "progress": progress,
-                        "tested": self.simulator.tested_combinations,
-                        "total": len(all_combinations),
-                        "elapsed": elapsed,
-                        "current_index": i + 1
-                    }))
-                    
-                    last_update_time = current_time
-                
-                # حفظ دوري
-                if (i + 1) % self.simulator.config['save_interval'] == 0:
-                    self.simulator.save_to_excel()
-                    self.simulator.save_checkpoint()
-                    
-                    self.message_queue.put(("log", f"💾 تم حفظ النتائج - التركيبة {i+1:,}"))
-                    last_save_time = current_time
+            elif message_type == "metrics":
+                self.update_metrics(data)
             
-            # حفظ نهائي
-            self.simulator.save_to_excel()
-            self.simulator.save_checkpoint()
+            elif message_type == "table":
+                self.top_table.apply_diff(data["top_added"], data["top_removed"])
+                self.recent_table.apply_diff(data["recent"])
             
-            if self.should_stop:
-                self.message_queue.put(("log", "⏹️ تم إيقاف المحاكاة وحفظ التقدم"))
-            else:
-                self.message_queue.put(("log", "🎉 انتهت المحاكاة بنجاح!"))
+            elif message_type == "estimate":
+                self.log_message(f"📊 إجمالي التركيبات المتوقعة: {data['total']:,}")
+                self.log_message(f"⏱️ الوقت المتوقع: ~{data['hours']:.1f} ساعة")
             
-            self.message_queue.put(("finished", None))
+            elif message_type == "error":
+                self.log_message(f"❌ {data}")
+                messagebox.showerror("خطأ", data)
             
-        except Exception as e:
-            self.message_queue.put(("error", f"خطأ في المحاكاة: {e}"))
-            self.message_queue.put(("finished", None))
-    
-    def update_gui(self):
-        """تحديث الواجهة بناءً على رسائل الخيط"""
-        try:
-            while True:
-                message_type, data = self.message_queue.get_nowait()
-                
-                if message_type == "log":
-                    self.log_message(data)
-                
-                elif message_type == "progress":
-                    self.update_progress(data)
-                
-                elif message_type == "error":
-                    self.log_message(f"❌ {data}")
-                    messagebox.showerror("خطأ", data)
-                
-                elif message_type == "finished":
-                    self.simulation_finished()
-                
-        except queue.Empty:
-            pass
+            elif message_type == "finished" and source is self.backend:
+                self.simulation_finished(data)
+        
+        # إعادة رسم اللوحة بمعدل إطارات محدود
+        self.dashboard.refresh(self.notebook.select() == str(self.dashboard_frame))
+        
+        # أسطر السجل من هذه الدورة تُدرج دفعة واحدة
+        self.log_buffer.append(self.pending_log)
+        self.pending_log = []
+        
+        # الإغلاق بعد انتهاء عملية المحاكاة وحفظ التقدم
+        if self.is_closing and self.backend is None:
+            self.root.destroy()
+            return
         
         # جدولة التحديث التالي
         self.root.after(100, self.update_gui)
@@ -452,11 +449,20 @@ class CrazyTimeGUI:
             self.stats_labels["remaining_time"].set(f"{remaining_hours:02d}:{remaining_minutes:02d}")
         
         # أفضل نتيجة
-        if self.simulator and self.simulator.top_results:
-            best = self.simulator.top_results[0]
+        best = data.get("best")
+        if best:
             self.stats_labels["best_result"].set(f"${best['final_balance']:.2f}")
             self.stats_labels["best_combination"].set(best['combination_str'][:20] + "...")
         
+        # الإحصائيات الجارية
+        stats = data.get("stats")
+        if stats:
+            survivors = ""
+            if stats.get('dropped') is not None:
+                survivors = f" (الناجية فقط، استُبعدت {stats['dropped']:,})"
+            self.stats_labels["mean_balance"].set(f"${stats['mean']:.2f} ± {stats['std']:.2f}{survivors}")
+            self.stats_labels["success_rate"].set(f"{stats['success_rate']:.1%}{survivors}")
+        
         # معدل السرعة
         if elapsed > 0:
             speed = tested / elapsed
@@ -473,37 +479,57 @@ class CrazyTimeGUI:
         else:
             self.stats_labels["status"].set("متوقف")
     
-    def simulation_finished(self):
+    def update_metrics(self, data):
+        """تحديث الأداء ونسب وقت المراحل (لقطة المقاييس عند كل حفظ)"""
+        self.stats_labels["trials_rate"].set(f"{data['trials_per_second']:,.0f} جولة/ثانية")
+        
+        # أطول مرحلتين من الوقت المقاس
+        timings = {stage: data[f"{stage}_seconds"] for stage in STAGES if data[f"{stage}_calls"]}
+        measured = sum(timings.values())
+        if measured > 0:
+            slowest = sorted(timings, key=timings.get, reverse=True)[:2]
+            self.stats_labels["stage_timings"].set(" | ".join(
+                f"{STAGE_LABELS[stage]} {timings[stage] / measured:.0%}" for stage in slowest
+            ))
+    
+    def simulation_finished(self, status=RUN_COMPLETED):
         """إنهاء المحاكاة"""
         self.is_running = False
         self.is_paused = False
-        self.should_stop = False
+        backend = self.backend
+        self.backend = None
         
-        # تحديث الأزرار
-        self.start_button.config(state="normal", text="🔄 استئناف المحاكاة")
+        # تحديث الأزرار (البدء يُفعّل بعد خروج العملية)
+        self.start_button.config(state="disabled", text="🔄 استئناف المحاكاة")
         self.pause_button.config(state="disabled")
         self.stop_button.config(state="disabled")
         self.resume_button.config(state="disabled")
         
-        self.stats_labels["status"].set("منتهي")
+        self.stats_labels["status"].set("منتهي" if status == RUN_COMPLETED else "متوقف")
+        self.wait_for_backend_exit(backend)
+    
+    def wait_for_backend_exit(self, backend):
+        """انتظار خروج عملية المحاكاة بفحص دوري (بدون حجب خيط الواجهة)"""
+        if backend.is_alive():
+            self.root.after(BACKEND_EXIT_POLL_MS, self.wait_for_backend_exit, backend)
+            return
+        backend.join(0)
+        self.start_button.config(state="normal")
     
     def log_message(self, message):
-        """إضافة رسالة للسجل"""
+        """إضافة رسالة للسجل (تُعرض مع الدفعة التالية من update_gui)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}\n"
-        
-        self.log_text.insert(tk.END, formatted_message)
-        self.log_text.see(tk.END)
+        self.pending_log.append(f"[{timestamp}] {message}")
     
     def clear_log(self):
         """مسح السجل"""
-        self.log_text.delete(1.0, tk.END)
+        self.log_buffer.clear()
         self.log_message("🗑️ تم مسح السجل")
     
     def save_log(self):
         """حفظ السجل"""
         try:
-            log_content = self.log_text.get(1.0, tk.END)
+            log_content = self.log_buffer.get()
             filename = f"simulation_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
             
             with open(filename, 'w', encoding='utf-8') as f:
@@ -514,6 +540,21 @@ class CrazyTimeGUI:
         except Exception as e:
             messagebox.showerror("خطأ", f"فشل في حفظ السجل: {e}")
     
+    def export_results(self):
+        """تصدير النتائج المحفوظة إلى Excel في عملية منفصلة"""
+        self.log_message("📊 جاري تصدير النتائج...")
+        
+        # أثناء التشغيل: عملية المحاكاة تصدّر من حالتها الحالية عند الحفظ التالي
+        if self.is_running:
+            self.backend.send('export')
+            return
+        
+        config = {}
+        if os.path.exists('gui_settings.json'):
+            with open('gui_settings.json', 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        self.helpers.append(SimulationBackend('export', config).start())
+    
     def open_results_folder(self):
         """فتح مجلد النتائج"""
         try:
@@ -545,6 +586,12 @@ class CrazyTimeGUI:
                 self.min_bet_var.set(str(config.get('min_bet_amount', 0)))
                 self.max_bet_var.set(str(config.get('max_bet_amount', 20)))
                 self.save_interval_var.set(str(config.get('save_interval', 10)))
+                self.engine_var.set(config.get('engine', SIMULATION_CONFIG['engine']))
+                self.workers_var.set(str(config.get('workers', SIMULATION_CONFIG['workers'])))
+                self.sweep_mode_var.set(config.get('sweep_mode', SIMULATION_CONFIG['sweep_mode']))
+                self.shortlist_size_var.set(str(config.get('analytic_shortlist_size', SIMULATION_CONFIG['analytic_shortlist_size'])))
+                self.shared_tape_var.set(config.get('use_shared_tape', SIMULATION_CONFIG['use_shared_tape']))
+                self.racing_var.set(config.get('racing', SIMULATION_CONFIG['racing']))
                 
                 self.log_message("📂 تم تحميل الإعدادات المحفوظة")
         
@@ -557,10 +604,10 @@ class CrazyTimeGUI:
             result = messagebox.askyesno("تأكيد الإغلاق", 
                                        "المحاكاة قيد التشغيل. هل تريد إيقافها وإغلاق البرنامج؟\nسيتم حفظ التقدم الحالي.")
             if result:
-                self.should_stop = True
+                # الإغلاق بعد وصول حدث finished من عملية المحاكاة (بعد الحفظ)
+                self.is_closing = True
+                self.backend.send('stop')
                 self.log_message("🔄 جاري إغلاق البرنامج...")
-                # انتظار قصير لحفظ البيانات
-                self.root.after(2000, self.root.destroy)
             return
         
         self.root.destroy()
@@ -588,5 +635,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
 
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+سجل نقاط التوقف الإلحاقي لمحاكي Crazy Time
+==========================================
+- كل حفظ يُلحق سطر JSON صغيراً (تأكيد) بالسجل مع fsync بدل إعادة كتابة الملف
+- السجلات نفسها تُكتب أولاً في مخزن النتائج، والتأكيد يحدد عدد السجلات الصالحة
+- لقطة كاملة (تشمل أفضل النتائج) تُكتب بإعادة تسمية ذرية عند الضغط
+- عند البدء: اللقطة + آخر تأكيد سليم في السجل (السطر الناقص أو التالف وما بعده يُتجاهل)
+"""
+
+import json
+import os
+
+
+def write_json_atomic(path, data):
+    """كتابة ملف JSON بشكل ذري (ملف مؤقت + fsync + إعادة تسمية)"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class CheckpointJournal:
+    def __init__(self, snapshot_path, journal_path):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.sequence = 0
+        self.commits_since_snapshot = 0
+        self.valid_length = 0
+
+    def commit(self, state):
+        """إلحاق تأكيد جديد بالسجل وإرجاع رقمه التسلسلي"""
+        self.sequence += 1
+        entry = dict(state, sequence=self.sequence)
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.commits_since_snapshot += 1
+        return self.sequence
+
+    def write_snapshot(self, snapshot):
+        """كتابة لقطة كاملة ثم تفريغ السجل (الضغط)"""
+        snapshot = dict(snapshot, sequence=self.sequence)
+        write_json_atomic(self.snapshot_path, snapshot)
+
+        # التأكيدات القديمة مشمولة في اللقطة الآن
+        with open(self.journal_path, 'w', encoding='utf-8') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.commits_since_snapshot = 0
+        self.valid_length = 0
+
+    def read_snapshot(self):
+        """قراءة اللقطة (None إذا لم توجد)"""
+        if not os.path.exists(self.snapshot_path):
+            return None
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def read_commits(self, after_sequence=0):
+        """التأكيدات السليمة في السجل بعد رقم تسلسلي معين"""
+        if not os.path.exists(self.journal_path):
+            return []
+
+        commits = []
+        self.valid_length = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # سطر ناقص (انقطاع أثناء الكتابة)
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    break
+                self.valid_length += len(line)
+                if entry.get('sequence', 0) > after_sequence:
+                    commits.append(entry)
+        return commits
+
+    def discard_invalid_tail(self):
+        """حذف ما بعد آخر تأكيد سليم (حتى لا تلتصق التأكيدات الجديدة بسطر تالف)"""
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > self.valid_length:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(self.valid_length)
+                f.flush()
+                os.fsync(f.fileno())
+            return True
+        return False
+
+    def recover(self):
+        """استعادة (اللقطة، آخر حالة مؤكدة) وضبط الرقم التسلسلي"""
+        snapshot = self.read_snapshot()
+        snapshot_sequence = snapshot.get('sequence', 0) if snapshot else 0
+        commits = self.read_commits(snapshot_sequence)
+
+        state = commits[-1] if commits else snapshot
+        self.sequence = state.get('sequence', 0) if state else 0
+        self.commits_since_snapshot = len(commits)
+        return snapshot, state
+
+    def exists(self):
+        return os.path.exists(self.snapshot_path) or bool(self.read_commits())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+قياس أداء محاكي Crazy Time
+==========================
+- مؤقتات وعدادات لكل مرحلة: سحب العجلة، الألعاب الإضافية، حساب الدفع، حلقة المحاكاة،
+  التسجيل (المخزن المؤقت وأفضل النتائج والإحصائيات)، الكتابة في المخزن، نقاط التوقف وتصدير Excel
+- الوقت الحصري لكل مرحلة (وقت المراحل الداخلية لا يُحسب مرتين)
+- ملف مقاييس دوري (JSON Lines أو CSV) بعدد التركيبات والجولات في الثانية
+- تقدير وقت التشغيل من جولة معايرة قصيرة مقاسة بدل ثابت لكل جولة
+"""
+
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+# المراحل المقاسة (المراحل الثلاث الأولى تُقاس داخل الحلقة الساخنة فقط مع profiling)
+STAGES = ('spin_sampling', 'bonus_generation', 'payout_calculation', 'simulation', 'bookkeeping',
+          'store_write', 'checkpoint', 'excel_export')
+
+STAGE_LABELS = {
+    'spin_sampling': 'سحب نتائج العجلة',
+    'bonus_generation': 'مضاعفات الألعاب الإضافية',
+    'payout_calculation': 'حساب الدفع',
+    'simulation': 'حلقة محاكاة الجلسات',
+    'bookkeeping': 'تتبع الإحصائيات والتسجيل',
+    'store_write': 'الكتابة في مخزن النتائج',
+    'checkpoint': 'حفظ نقطة التوقف',
+    'excel_export': 'تصدير Excel'
+}
+
+# حجم عينة المعايرة (تركيبات موزعة بالتساوي على الفضاء)
+CALIBRATION_SAMPLE = 200
+
+
+class SimulationMetrics:
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.calls = dict.fromkeys(STAGES, 0)
+        self.combinations = 0
+        self.trials = 0
+        self.started = time.perf_counter()
+        # وقت المراحل الداخلية لكل مرحلة جارية (لحساب الوقت الحصري)
+        self._children = []
+
+    def reset(self):
+        """تصفير جميع المؤقتات والعدادات"""
+        self.__init__()
+
+    def _enter(self):
+        self._children.append(0.0)
+        return time.perf_counter()
+
+    def _exit(self, stage, started):
+        elapsed = time.perf_counter() - started
+        children = self._children.pop()
+        self.seconds[stage] += elapsed - children
+        self.calls[stage] += 1
+        if self._children:
+            self._children[-1] += elapsed
+
+    @contextmanager
+    def measure(self, stage):
+        """قياس كتلة كود ضمن مرحلة"""
+        started = self._enter()
+        try:
+            yield
+        finally:
+            self._exit(stage, started)
+
+    def timed(self, stage, func):
+        """تغليف دالة بحيث يُقاس كل استدعاء ضمن مرحلة"""
+        def wrapper(*args, **kwargs):
+            started = self._enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit(stage, started)
+        return wrapper
+
+    def count(self, combinations, trials):
+        """إضافة تركيبات وجولات مكتملة"""
+        self.combinations += combinations
+        self.trials += trials
+
+    def take_timers(self):
+        """إرجاع مؤقتات المراحل وتصفيرها (تُرسل من العمليات العاملة)"""
+        timers = {stage: (self.seconds[stage], self.calls[stage]) for stage in STAGES if self.calls[stage]}
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.calls = dict.fromkeys(STAGES, 0)
+        return timers
+
+    def merge_timers(self, timers):
+        """دمج مؤقتات من عملية عاملة"""
+        for stage, (seconds, calls) in timers.items():
+            self.seconds[stage] += seconds
+            self.calls[stage] += calls
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def snapshot(self):
+        """المقاييس الحالية كقاموس مسطح (صف واحد في ملف المقاييس)"""
+        elapsed = self.elapsed
+        row = {
+            'timestamp': datetime.now().isoformat(),
+            'elapsed_seconds': round(elapsed, 3),
+            'combinations': self.combinations,
+            'trials': self.trials,
+            'combinations_per_second': round(self.combinations / elapsed, 3) if elapsed > 0 else 0,
+            'trials_per_second': round(self.trials / elapsed, 1) if elapsed > 0 else 0
+        }
+        for stage in STAGES:
+            row[f"{stage}_seconds"] = round(self.seconds[stage], 6)
+            row[f"{stage}_calls"] = self.calls[stage]
+        return row
+
+    def summary_lines(self):
+        """أسطر ملخص الأداء للطباعة"""
+        elapsed = self.elapsed
+        lines = [f"⚡ الأداء: {self.combinations / elapsed:,.1f} تركيبة/ث | "
+                 f"{self.trials / elapsed:,.0f} جولة/ث" if elapsed > 0 else "⚡ الأداء: غير متاح"]
+
+        measured = sum(self.seconds.values())
+        for stage in STAGES:
+            if self.calls[stage] == 0:
+                continue
+            share = (self.seconds[stage] / measured) * 100 if measured else 0
+            lines.append(f"   • {STAGE_LABELS[stage]}: {self.seconds[stage]:.2f}ث ({share:.1f}%) "
+                         f"- {self.calls[stage]:,} استدعاء")
+        return lines
+
+
+class MetricsStream:
+    """كتابة المقاييس دورياً في ملف JSON Lines أو CSV (حسب امتداد الملف)"""
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self.is_csv = path.lower().endswith('.csv')
+        self.last_write = None
+
+    def maybe_write(self, metrics, force=False):
+        """كتابة صف جديد إذا مرت الفترة المحددة منذ آخر كتابة"""
+        now = time.perf_counter()
+        if not force and self.last_write is not None and now - self.last_write < self.interval:
+            return False
+
+        self.write(metrics.snapshot())
+        self.last_write = now
+        return True
+
+    def write(self, row):
+        if self.is_csv:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(row))
+                if new_file:
+                    writer.writeheader()
+                writer.writerow(row)
+        else:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def instrument(simulator, metrics):
+    """تغليف دوال الحلقة الساخنة بمؤقتات المراحل (على مستوى الكائن فقط)"""
+    simulator.spin_wheel = metrics.timed('spin_sampling', simulator.spin_wheel)
+    simulator.generate_bonus_multiplier = metrics.timed('bonus_generation', simulator.generate_bonus_multiplier)
+    simulator.calculate_payout = metrics.timed('payout_calculation', simulator.calculate_payout)
+
+    # كل محرك يُقاس مرة واحدة في مرحلة المحاكاة (الوقت الحصري بدون المراحل الداخلية)،
+    # والتسجيل (record_results) يُقاس وحده في مرحلة التتبع
+    engine = simulator.engine
+    if engine is not None:
+        engine.draw_outcomes = metrics.timed('spin_sampling', engine.draw_outcomes)
+        engine.draw_bonus_multipliers = metrics.timed('bonus_generation', engine.draw_bonus_multipliers)
+        engine.simulate_combination = metrics.timed('simulation', engine.simulate_combination)
+    elif not simulator.uses_tape:
+        # الشريط يُغلف عند فتحه (instrument_tape)
+        simulator.simulate_combination = metrics.timed('simulation', simulator.simulate_combination)
+
+    if simulator.tape is not None:
+        instrument_tape(simulator.tape, metrics)
+
+    if simulator.racing is not None:
+        simulator.racing.simulate_batch = metrics.timed('simulation', simulator.racing.simulate_batch)
+
+
+def instrument_tape(tape, metrics):
+    """تغليف دوال الشريط المشترك (الشريط يُفتح بعد إنشاء المحاكي)"""
+    tape.payouts = metrics.timed('payout_calculation', tape.payouts)
+    tape.simulate_combination = metrics.timed('simulation', tape.simulate_combination)
+    tape.simulate_batch = metrics.timed('simulation', tape.simulate_batch)
+
+
+def calibration_sample(space, size=CALIBRATION_SAMPLE):
+    """عينة تركيبات موزعة بالتساوي على الفضاء (التركيبات الكبيرة تتوقف أسرع)"""
+    if len(space) == 0:
+        return []
+    indices = np.unique(np.linspace(0, len(space) - 1, min(size, len(space))).astype(np.int64))
+    return [list(space[int(index)]) for index in indices]
+
+
+def calibrate(simulator, space, max_seconds=1.0):
+    """متوسط الثواني لكل تركيبة من جولة معايرة قصيرة (بدون تسجيل النتائج)"""
+    sample = calibration_sample(space)
+    if not sample:
+        return 0.0
+
+    # حفظ حالة مولدات الأرقام حتى لا تؤثر المعايرة على المحاكاة الفعلية
+    rng_state = simulator.rng.getstate()
+    engine_state = simulator.engine.rng.bit_generator.state if simulator.engine is not None else None
+
+    block_size = simulator.sweep_block_size()
+    measured = 0
+    started = time.perf_counter()
+    try:
+        for block_start in range(0, len(sample), block_size):
+            block = sample[block_start:block_start + block_size]
+            if simulator.tape is not None:
+                block = np.array(block, dtype=np.int64)
+            simulator.simulate_combinations(block)
+            measured += len(block)
+            if time.perf_counter() - started >= max_seconds:
+                break
+    finally:
+        simulator.rng.setstate(rng_state)
+        if engine_state is not None:
+            simulator.engine.rng.bit_generator.state = engine_state
+
+    return (time.perf_counter() - started) / measured
+
+
+def estimate_hours(simulator, space, total=None):
+    """الوقت المتوقع بالساعات لمحاكاة total تركيبة (افتراضياً حجم الفضاء)"""
+    total = len(space) if total is None else total
+    seconds_per_combination = calibrate(simulator, space)
+    return (total * seconds_per_combination) / max(1, simulator.config['workers']) / 3600
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+التنفيذ المتوازي لمحاكي Crazy Time
+==================================
+- تقسيم فضاء التركيبات إلى دفعات وتوزيعها على عدة عمليات
+- سلسلة أرقام عشوائية مستقلة لكل تركيبة حسب فهرسها (SeedSequence)
+- إرجاع النتائج للعملية الرئيسية فور اكتمال كل دفعة
+- تسجيل الدفعات المكتملة في نقطة التوقف
+"""
+
+import time
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from full_crazy_time_simulator import FullCrazyTimeSimulator
+
+# المحاكي الخاص بكل عملية عاملة
+_worker_simulator = None
+
+
+def _init_worker(config, file_config=None, seed_entropy=None):
+    """تهيئة المحاكي داخل العملية العاملة"""
+    global _worker_simulator
+    _worker_simulator = FullCrazyTimeSimulator(config, resume=False, verbose=False, file_config=file_config)
+    if _worker_simulator.uses_tape:
+        # قراءة الشريط الذي أنشأه المحاكي الرئيسي فقط (خطأ إذا لم يطابق البذرة)
+        _worker_simulator.seed_entropy = seed_entropy
+        _worker_simulator.open_tape()
+
+
+def _run_chunk(start, end, combinations, seed_entropy, index_offset=0, racing_threshold=None):
+    """محاكاة دفعة واحدة من التركيبات داخل عملية عاملة"""
+    if _worker_simulator.racing is not None:
+        # عتبة أفضل النتائج من العملية الرئيسية (العملية العاملة لا ترى جميع النتائج)
+        _worker_simulator.racing.external_threshold = racing_threshold
+
+    # كل تركيبة تُحاكى بسلسلة مفتاحها فهرسها، فالنتائج لا تعتمد على التقسيم أو عدد العمليات
+    _worker_simulator.seed_entropy = seed_entropy
+    results = _worker_simulator.simulate_combinations(combinations, index_offset + start)
+    return start, end, results, _worker_simulator.metrics.take_timers()
+
+
+def split_into_chunks(ranges, chunk_size):
+    """تقسيم النطاقات المتبقية إلى دفعات محاذية لحجم الدفعة"""
+    chunks = []
+    for range_start, range_end in ranges:
+        start = range_start
+        while start < range_end:
+            end = min((start // chunk_size + 1) * chunk_size, range_end)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def run_parallel_sweep(simulator, all_combinations, on_save=None,
+                       should_stop=None, should_pause=None):
+    """تشغيل المحاكاة على عدة عمليات وإرجاع True إذا اكتملت جميع الدفعات"""
+    workers = simulator.config['workers']
+    save_interval = simulator.config['save_interval']
+    chunks = split_into_chunks(simulator.pending_ranges(), simulator.config['chunk_size'])
+
+    simulator.ensure_seed_entropy()
+
+    pending = {}
+    next_chunk = 0
+    unsaved = 0
+    stopped = False
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(simulator.config, simulator.file_config,
+                                       simulator.seed_entropy)) as executor:
+        while next_chunk < len(chunks) or pending:
+            if should_stop is not None and should_stop():
+                stopped = True
+
+            # إبقاء عدد محدود من الدفعات قيد الانتظار لتقليل استهلاك الذاكرة
+            paused = should_pause is not None and should_pause()
+            while not stopped and not paused and next_chunk < len(chunks) and len(pending) < workers * 2:
+                start, end = chunks[next_chunk]
+                if simulator.tape is not None:
+                    combinations = all_combinations.to_array(start, end - start)
+                else:
+                    combinations = list(islice(all_combinations.iter_from(start), end - start))
+                racing_threshold = simulator.racing.threshold() if simulator.racing is not None else None
+                future = executor.submit(_run_chunk, start, end, combinations, simulator.seed_entropy,
+                                         all_combinations.index_offset, racing_threshold)
+                pending[future] = (start, end)
+                next_chunk += 1
+
+            if not pending:
+                if stopped:
+                    break
+                time.sleep(0.1)
+                continue
+
+            done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                start, end, results, timers = future.result()
+
+                simulator.metrics.merge_timers(timers)
+                simulator.record_results(results)
+                simulator.mark_range_completed(start, end)
+                unsaved += end - start
+
+            # حفظ دوري بعد اكتمال دفعات كافية
+            if unsaved >= save_interval:
+                simulator.save_progress()
+                unsaved = 0
+                if on_save is not None:
+                    on_save()
+
+    if unsaved:
+        simulator.save_progress()
+
+    return not stopped
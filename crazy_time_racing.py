@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+نمط السباق (التوقف المبكر التسلسلي) لمحاكي Crazy Time
+====================================================
+- محاكاة دفعات التركيبات على مراحل فوق شريط النتائج المشترك
+- بعد كل مرحلة: حد أعلى متفائل للمبلغ النهائي من المتوسط والتباين الدقيقين
+- استبعاد التركيبات التي لا يمكنها إحصائياً دخول أفضل K، ومتابعة المنافسة فقط
+- حساب عدد الجولات الموفرة مقارنة بالمسح بعدد جولات ثابت
+"""
+
+import numpy as np
+
+from crazy_time_analytics import AnalyticModel
+from crazy_time_engine import BatchSession
+
+# المعايير المدعومة (كلاهما دالة خطية متزايدة في المبلغ النهائي)
+RACING_METRICS = ('final_balance', 'profit_percentage')
+
+
+def empty_racing_stats():
+    """عدادات نمط السباق"""
+    return {'evaluated': 0, 'dropped': 0, 'spins_simulated': 0, 'spins_skipped': 0}
+
+
+class RacingEvaluator:
+    def __init__(self, simulator):
+        config = simulator.config
+        self.simulator = simulator
+        self.model = AnalyticModel(simulator)
+        self.trials = config['trials_per_combination']
+        self.z = config['racing_z']
+        self.metric = config['racing_metric']
+        if self.metric not in RACING_METRICS:
+            raise ValueError(f"معيار السباق غير مدعوم: {self.metric}")
+
+        # حدود المراحل (آخر مرحلة دائماً العدد الكامل للجولات)
+        stages = sorted({stage for stage in config['racing_stages'] if 0 < stage < self.trials})
+        self.stages = stages + [self.trials]
+
+        # حد خارجي (من العملية الرئيسية عند التنفيذ المتوازي)
+        self.external_threshold = None
+
+    def threshold(self):
+        """أقل مبلغ نهائي يدخل قائمة أفضل النتائج حالياً (None إذا لم تمتلئ)"""
+        thresholds = []
+        ranking = self.simulator.top_tracker.rankings.get(self.metric)
+        if ranking is not None and ranking.threshold() is not None:
+            value = ranking.threshold()
+            if self.metric == 'profit_percentage':
+                initial_balance = self.simulator.config['initial_balance']
+                value = initial_balance * (1 + value / 100)
+            thresholds.append(value)
+        if self.external_threshold is not None:
+            thresholds.append(self.external_threshold)
+        return max(thresholds) if thresholds else None
+
+    def upper_bounds(self, session, rows, mean, std):
+        """حد أعلى متفائل للمبلغ النهائي (تقريب طبيعي لمجموع الجولات المتبقية بدون التوقف)"""
+        remaining = np.where(session.stopped[rows], 0, self.trials - session.spins[rows])
+        return session.balance[rows] + remaining * mean[rows] + self.z * std[rows] * np.sqrt(remaining)
+
+    def simulate_batch(self, tape, combinations):
+        """محاكاة دفعة على مراحل وإرجاع نتائج التركيبات المكتملة فقط"""
+        combinations = np.asarray(combinations, dtype=np.int64).reshape(-1, tape.payout_matrix.shape[1])
+        combinations = combinations[combinations.sum(axis=1) > 0]  # تخطي التركيبات بدون رهان
+
+        session = BatchSession(self.simulator, combinations)
+        mean, variance = self.model.moments(combinations)
+        std = np.sqrt(variance)
+
+        stats = empty_racing_stats()
+        stats['evaluated'] = len(combinations)
+        alive = np.arange(len(combinations))
+        stage_start = 0
+
+        for stage_end in self.stages:
+            # تقديم التركيبات المتبقية غير المتوقفة فقط
+            running = alive[~session.stopped[alive]]
+            if len(running):
+                spins_before = int(session.spins[running].sum())
+                payouts = combinations[running] @ tape.payout_matrix[stage_start:stage_end].T
+                session.advance(payouts - session.total_bet[running][:, None], rows=running)
+                stats['spins_simulated'] += int(session.spins[running].sum()) - spins_before
+            stage_start = stage_end
+
+            if stage_end == self.trials:
+                break
+
+            threshold = self.threshold()
+            if threshold is None:
+                continue
+
+            # استبعاد التركيبات الجارية التي لا يصل حدها الأعلى إلى العتبة
+            # (صالح فقط إذا كانت العتبة فوق حد التوقف، لأن الجلسة المتوقفة تنتهي تحته)
+            bounds = self.upper_bounds(session, alive, mean, std)
+            drop = (bounds < threshold) & (threshold >= session.stop_level[alive]) & ~session.stopped[alive]
+            if drop.any():
+                dropped = alive[drop]
+                stats['dropped'] += len(dropped)
+                stats['spins_skipped'] += int((self.trials - session.spins[dropped]).sum())
+                alive = alive[~drop]
+
+        results = session.results()
+        batch = {key: values[alive] for key, values in results.items()}
+        batch['racing_stats'] = stats
+        return batch
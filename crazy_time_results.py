@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+مخزن النتائج الإلحاقي لمحاكي Crazy Time
+=======================================
+- ملف سجلات NumPy ثنائي يُلحق به على دفعات (بدون إعادة كتابة)
+- قراءة على أجزاء عبر memmap دون تحميل الملف كاملاً في الذاكرة
+- قص الملف إلى عدد سجلات محدد لمطابقة نقطة التوقف (المحاكي المالك فقط عند الاستئناف)
+- وضع القراءة فقط للتصدير والدمج والأدوات المساعدة: لا قص ولا تحويل ولا كتابة
+- سجل نتيجة مضغوط (__slots__) والتركيبة مخزنة كعدد صحيح واحد
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from crazy_time_combinations import (pack_combination, unpack_combination,
+                                     pack_combinations, unpack_combinations)
+
+# ترويسة ثابتة الحجم في بداية الملف
+STORE_MAGIC = b'CTRSTORE'
+STORE_VERSION = 2
+HEADER_SIZE = 1024
+
+# أعمدة سجل النتيجة
+RESULT_DTYPE = np.dtype([
+    ('combination_key', 'u8'),      # التركيبة مضغوطة (8 بت لكل خيار)
+    ('total_bet', 'i4'),
+    ('final_balance', 'f8'),
+    ('trials_completed', 'i4'),
+    ('wins', 'i4'),
+    ('losses', 'i4'),
+    ('win_rate', 'f8'),
+    ('total_profit', 'f8'),
+    ('total_loss', 'f8'),
+    ('max_single_win', 'f8'),
+    ('max_single_loss', 'f8'),
+    ('max_win_streak', 'i4'),
+    ('max_loss_streak', 'i4'),
+    ('profit_percentage', 'f8'),
+    ('average_win', 'f8'),
+    ('average_loss', 'f8'),
+    ('timestamp', 'f8')            # وقت Unix (يُحوَّل إلى نص عند التصدير فقط)
+])
+
+
+class ResultRecord:
+    """نتيجة تركيبة واحدة بحجم ثابت (النصوص والتواريخ تُشتق عند الحاجة فقط)"""
+
+    __slots__ = RESULT_DTYPE.names
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @property
+    def combination(self):
+        return unpack_combination(self.combination_key)
+
+    @property
+    def combination_str(self):
+        return f"[{','.join(map(str, self.combination))}]"
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def keys(self):
+        return self.__slots__
+
+    def __repr__(self):
+        return f"ResultRecord({self.combination_str}, final_balance={self.final_balance})"
+
+    @classmethod
+    def from_dict(cls, data):
+        """إنشاء سجل من قاموس محفوظ (يدعم صيغة القواميس القديمة)"""
+        values = dict(data)
+        if 'combination_key' not in values:
+            values['combination_key'] = pack_combination(values['combination'])
+        if isinstance(values.get('timestamp'), str):
+            values['timestamp'] = datetime.fromisoformat(values['timestamp']).timestamp()
+        return cls(*(values[name] for name in cls.__slots__))
+
+
+def results_to_records(results, dtype=RESULT_DTYPE):
+    """تحويل قائمة النتائج إلى مصفوفة سجلات"""
+    records = np.zeros(len(results), dtype=dtype)
+    for row, result in enumerate(results):
+        records[row] = tuple(result[name] for name in dtype.names)
+    return records
+
+
+def batch_to_records(batch, dtype=RESULT_DTYPE):
+    """تحويل دفعة نتائج (قاموس مصفوفات) إلى مصفوفة سجلات"""
+    records = np.zeros(len(batch['total_bet']), dtype=dtype)
+    for name in dtype.names:
+        if name == 'timestamp':
+            records[name] = datetime.now().timestamp()
+        elif name == 'combination_key':
+            records[name] = pack_combinations(batch['combination'])
+        else:
+            records[name] = batch[name]
+    return records
+
+
+def records_to_batch(records):
+    """تحويل مصفوفة سجلات إلى دفعة نتائج (قاموس مصفوفات مع التركيبات)"""
+    batch = {name: records[name] for name in records.dtype.names}
+    batch['combination'] = unpack_combinations(records['combination_key'])
+    return batch
+
+
+class ResultStore:
+    def __init__(self, path, dtype=RESULT_DTYPE, readonly=False):
+        self.path = path
+        self.dtype = dtype
+        # القراءة فقط: الملف قد يكون مفتوحاً للإلحاق في عملية أخرى (السجل الناقص في النهاية لا يُحتسب)
+        self.readonly = readonly
+        # أقصى عدد سجلات مرئية (السجلات المؤكدة في نقطة التوقف عند القراءة فقط)
+        self.row_limit = None
+
+        if os.path.exists(path):
+            self._read_header()
+        elif readonly:
+            raise FileNotFoundError(f"ملف النتائج غير موجود: {path}")
+        else:
+            self.reset()
+
+    def _read_header(self):
+        """قراءة الترويسة والتحقق من توافق الأعمدة"""
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+
+        if not header.startswith(STORE_MAGIC):
+            raise ValueError(f"ملف النتائج غير صالح: {self.path}")
+
+        meta = json.loads(header[len(STORE_MAGIC):].rstrip(b'\0').decode('utf-8'))
+        stored_dtype = np.dtype([tuple(field) for field in meta['descr']])
+        if stored_dtype != self.dtype:
+            if self.readonly:
+                raise ValueError(f"ملف النتائج بصيغة أعمدة قديمة (شغّل المحاكاة مرة لتحويله): {self.path}")
+            self._migrate(stored_dtype)
+
+    def _migrate(self, stored_dtype, chunk_rows=100000):
+        """تحويل ملف بصيغة أعمدة قديمة إلى الصيغة الحالية"""
+        old_names = set(stored_dtype.names)
+        if not set(self.dtype.names) - {'combination_key'} <= old_names:
+            raise ValueError(f"أعمدة ملف النتائج لا تطابق الإصدار الحالي: {self.path}")
+        if 'combination_key' not in old_names and 'combination' not in old_names:
+            raise ValueError(f"أعمدة ملف النتائج لا تطابق الإصدار الحالي: {self.path}")
+
+        rows = (os.path.getsize(self.path) - HEADER_SIZE) // stored_dtype.itemsize
+        temp_path = f"{self.path}.migrate"
+        with open(temp_path, 'wb') as f:
+            self._write_header(f)
+            if rows:
+                old_records = np.memmap(self.path, dtype=stored_dtype, mode='r',
+                                        offset=HEADER_SIZE, shape=(rows,))
+                for start in range(0, rows, chunk_rows):
+                    chunk = np.array(old_records[start:start + chunk_rows])
+                    records = np.zeros(len(chunk), dtype=self.dtype)
+                    for name in self.dtype.names:
+                        if name == 'combination_key' and name not in old_names:
+                            records[name] = pack_combinations(chunk['combination'])
+                        else:
+                            records[name] = chunk[name]
+                    f.write(records.tobytes())
+                del old_records
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, self.path)
+        print(f"🔄 تم تحويل ملف النتائج إلى الصيغة الجديدة: {rows:,} سجل")
+
+    def _write_header(self, f):
+        """كتابة الترويسة"""
+        meta = json.dumps({'version': STORE_VERSION, 'descr': self.dtype.descr}).encode('utf-8')
+        header = STORE_MAGIC + meta
+        if len(header) > HEADER_SIZE:
+            raise ValueError("ترويسة ملف النتائج أكبر من الحجم المسموح")
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+
+    def _check_writable(self):
+        if self.readonly:
+            raise ValueError(f"ملف النتائج مفتوح للقراءة فقط: {self.path}")
+
+    def reset(self):
+        """إنشاء ملف فارغ (حذف جميع السجلات)"""
+        self._check_writable()
+        with open(self.path, 'wb') as f:
+            self._write_header(f)
+
+    def __len__(self):
+        rows = (os.path.getsize(self.path) - HEADER_SIZE) // self.dtype.itemsize
+        return rows if self.row_limit is None else min(rows, self.row_limit)
+
+    def limit(self, rows):
+        """إخفاء السجلات بعد أول rows سجل بدل قصها (للقراءة فقط)"""
+        if not self.readonly:
+            raise ValueError(f"تقييد السجلات متاح في وضع القراءة فقط: {self.path}")
+        self.row_limit = max(0, rows)
+
+    def append(self, records):
+        """إلحاق دفعة سجلات بنهاية الملف وإرجاع العدد الإجمالي"""
+        self._check_writable()
+        if not isinstance(records, np.ndarray):
+            records = results_to_records(records, self.dtype)
+
+        if len(records):
+            with open(self.path, 'ab') as f:
+                f.write(records.astype(self.dtype, copy=False).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        return len(self)
+
+    def truncate(self, rows):
+        """قص الملف إلى عدد سجلات محدد"""
+        self._check_writable()
+        rows = max(0, min(rows, len(self)))
+        with open(self.path, 'r+b') as f:
+            f.truncate(HEADER_SIZE + rows * self.dtype.itemsize)
+
+    def open_memmap(self, rows=None):
+        """فتح أول rows سجل (أو جميع السجلات) للقراءة فقط عبر memmap"""
+        rows = len(self) if rows is None else max(0, min(rows, len(self)))
+        if rows == 0:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode='r', offset=HEADER_SIZE, shape=(rows,))
+
+    def iter_chunks(self, chunk_rows=100000):
+        """قراءة السجلات على أجزاء متتالية"""
+        records = self.open_memmap()
+        for start in range(0, len(records), chunk_rows):
+            yield np.array(records[start:start + chunk_rows])
+
+
+# أعمدة التصدير وأسماؤها بالعربية
+EXPORT_COLUMNS = [
+    ('combination_str', 'التركيبة'),
+    ('total_bet', 'إجمالي الرهان'),
+    ('final_balance', 'المبلغ النهائي'),
+    ('profit_percentage', 'نسبة الربح%'),
+    ('trials_completed', 'عدد الجولات'),
+    ('wins', 'الانتصارات'),
+    ('losses', 'الخسائر'),
+    ('win_rate', 'معدل الفوز'),
+    ('max_single_win', 'أكبر ربح'),
+    ('max_single_loss', 'أكبر خسارة'),
+    ('max_win_streak', 'أطول سلسلة فوز'),
+    ('max_loss_streak', 'أطول سلسلة خسارة'),
+    ('average_win', 'متوسط الربح'),
+    ('average_loss', 'متوسط الخسارة'),
+    ('timestamp', 'الوقت')
+]
+
+
+def records_to_dataframe(records):
+    """تحويل مصفوفة سجلات إلى DataFrame بأعمدة التصدير العربية"""
+    data = {}
+    for name, header in EXPORT_COLUMNS:
+        if name == 'combination_str':
+            combinations = unpack_combinations(records['combination_key']).tolist()
+            data[header] = [f"[{','.join(map(str, row))}]" for row in combinations]
+        elif name == 'timestamp':
+            data[header] = [datetime.fromtimestamp(value).isoformat() for value in records['timestamp'].tolist()]
+        else:
+            data[header] = records[name]
+    return pd.DataFrame(data)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+طبقة السحب العشوائي السريع لمحاكي Crazy Time
+============================================
+- جداول Alias (طريقة Walker/Vose) تُبنى مرة واحدة لكل محاكي
+- واجهة سحب مفردة (random.Random) وواجهة سحب دفعات (NumPy Generator)
+- سلسلة مضاعفة Pachinko وخطوة المضاعف الإضافي في Crazy Time
+"""
+
+import math
+
+import numpy as np
+
+
+class AliasTable:
+    """سحب قيمة مرجحة بزمن ثابت O(1)"""
+
+    def __init__(self, values, weights):
+        weights = np.asarray(weights, dtype=float)
+        size = len(weights)
+        scaled = weights * size / weights.sum()
+
+        probability = np.ones(size)
+        alias = np.arange(size)
+        small = [index for index in range(size) if scaled[index] < 1]
+        large = [index for index in range(size) if scaled[index] >= 1]
+
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            probability[low] = scaled[low]
+            alias[low] = high
+            scaled[high] -= 1 - scaled[low]
+            (small if scaled[high] < 1 else large).append(high)
+
+        self.size = size
+        self.values = list(values)
+        self.values_array = np.asarray(values)
+        self.probability = probability
+        self.alias = alias
+        self._probability_list = probability.tolist()
+        self._alias_list = alias.tolist()
+
+    def draw_index(self, random_fn):
+        """سحب فهرس واحد"""
+        position = random_fn() * self.size
+        index = int(position)
+        if position - index < self._probability_list[index]:
+            return index
+        return self._alias_list[index]
+
+    def draw(self, random_fn):
+        """سحب قيمة واحدة"""
+        return self.values[self.draw_index(random_fn)]
+
+    def draw_indices(self, rng, size):
+        """سحب دفعة فهارس"""
+        index = rng.integers(0, self.size, size)
+        accept = rng.random(size) < self.probability[index]
+        return np.where(accept, index, self.alias[index])
+
+    def draw_batch(self, rng, size):
+        """سحب دفعة قيم"""
+        return self.values_array[self.draw_indices(rng, size)]
+
+
+class BonusSampler:
+    """سحب مضاعفات لعبة إضافية واحدة"""
+
+    def __init__(self, bonus_type, distribution, base_avg):
+        self.bonus_type = bonus_type
+        self.base_avg = base_avg
+        self.distribution = distribution or {}
+
+        if bonus_type == 'Coin Flip':
+            self.low_probability = distribution['low_probability']
+            self.low_range = tuple(distribution['low_range'])
+            high_low, high_high = distribution['high_range']
+            self.high_range = (high_low, min(high_high, base_avg * 2))
+
+        elif bonus_type in ('Cash Hunt', 'Pachinko', 'Crazy Time'):
+            self.table = AliasTable(distribution['values'], distribution['weights'])
+
+        if bonus_type == 'Pachinko':
+            self.double_probability = distribution['double_probability']
+            self.log_double_probability = math.log(self.double_probability)
+            self.max_multiplier = distribution['max_multiplier']
+
+        elif bonus_type == 'Crazy Time':
+            self.extra_probability = distribution['extra_probability']
+            self.extra_multipliers = list(distribution['extra_multipliers'])
+            self.max_multiplier = distribution['max_multiplier']
+
+    def draw(self, random_fn):
+        """سحب مضاعف واحد"""
+        if self.bonus_type == 'Coin Flip':
+            low, high = self.low_range if random_fn() < self.low_probability else self.high_range
+            return low + (high - low) * random_fn()
+
+        elif self.bonus_type == 'Cash Hunt':
+            return self.table.draw(random_fn)
+
+        elif self.bonus_type == 'Pachinko':
+            # عدد المضاعفات: P(K >= k) = p^k
+            doublings = int(math.log(1.0 - random_fn()) / self.log_double_probability)
+            return min(self.table.draw(random_fn) * 2 ** min(doublings, 32), self.max_multiplier)
+
+        elif self.bonus_type == 'Crazy Time':
+            multiplier = self.table.draw(random_fn)
+            if random_fn() < self.extra_probability:
+                multiplier *= self.extra_multipliers[int(random_fn() * len(self.extra_multipliers))]
+            return min(multiplier, self.max_multiplier)
+
+        return self.base_avg
+
+    def draw_batch(self, rng, size):
+        """سحب دفعة مضاعفات"""
+        if self.bonus_type == 'Coin Flip':
+            is_low = rng.random(size) < self.low_probability
+            low = np.where(is_low, self.low_range[0], self.high_range[0])
+            high = np.where(is_low, self.low_range[1], self.high_range[1])
+            return low + (high - low) * rng.random(size)
+
+        elif self.bonus_type == 'Cash Hunt':
+            return self.table.draw_batch(rng, size).astype(float)
+
+        elif self.bonus_type == 'Pachinko':
+            base = self.table.draw_batch(rng, size).astype(float)
+            doublings = np.minimum(rng.geometric(1 - self.double_probability, size) - 1, 32)
+            return np.minimum(base * np.exp2(doublings), self.max_multiplier)
+
+        elif self.bonus_type == 'Crazy Time':
+            base = self.table.draw_batch(rng, size).astype(float)
+            has_extra = rng.random(size) < self.extra_probability
+            extra = np.asarray(self.extra_multipliers)[rng.integers(0, len(self.extra_multipliers), size)]
+            return np.minimum(np.where(has_extra, base * extra, base), self.max_multiplier)
+
+        return np.full(size, self.base_avg, dtype=float)
+
+
+class SamplerSet:
+    """جميع أدوات السحب لمحاكي واحد (تُبنى مرة واحدة)"""
+
+    def __init__(self, simulator):
+        options = simulator.betting_options
+        self.betting_options = options
+        self.wheel = AliasTable(range(len(options)), [simulator.wheel_config[option] for option in options])
+        self.bonus = {
+            option: BonusSampler(option, simulator.bonus_distributions.get(option),
+                                 simulator.bonus_multipliers[option])
+            for option in options if option not in simulator.number_multipliers
+        }
+
+    def draw_outcome(self, random_fn):
+        """فهرس نتيجة عجلة واحدة"""
+        return self.wheel.draw_index(random_fn)
+
+    def draw_outcomes(self, rng, size):
+        """دفعة فهارس نتائج العجلة"""
+        return self.wheel.draw_indices(rng, size)
+
+    def draw_multiplier(self, bonus_type, random_fn):
+        """مضاعف لعبة إضافية واحد"""
+        return self.bonus[bonus_type].draw(random_fn)
+
+    def draw_multipliers(self, bonus_type, rng, size):
+        """دفعة مضاعفات لعبة إضافية"""
+        return self.bonus[bonus_type].draw_batch(rng, size)
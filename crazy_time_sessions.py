@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+جلسات مونت كارلو المتعددة لكل تركيبة في محاكي Crazy Time
+=======================================================
+- المسح العادي يحاكي جلسة واحدة لكل تركيبة: المبلغ النهائي عينة واحدة كثيرة الضوضاء
+- هنا M جلسة مستقلة لكل تركيبة في نواة الدفعات (صف لكل جلسة) بسحب مجمع للنتائج والمضاعفات
+- الجلسات المتوقفة تخرج من السحب في المراحل التالية، وحجم كل مرحلة محدود (ذاكرة ثابتة)
+- لكل تركيبة: متوسط ووسيط ومئينات المبلغ النهائي، احتمال الإفلاس واحتمال الربح،
+  ومتوسط طول الجلسة، مع الخطأ المعياري لكل منها
+- يغطي فضاء التشغيل (القائمة المختصرة أو الجزء) أو أفضل K نتيجة من تشغيل منتهٍ
+
+الاستخدام:
+    python crazy_time_sessions.py --set sweep_mode=analytic_shortlist --sessions 1000 --workers 8
+    python crazy_time_sessions.py --top 100 --sessions 2000          (إعادة ترتيب أفضل 100 نتيجة)
+"""
+
+import argparse
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from full_crazy_time_simulator import FullCrazyTimeSimulator, EXIT_USAGE, build_run_config
+from crazy_time_combinations import pack_combination, unpack_combination, shard_bounds
+from crazy_time_engine import BatchSession, NumpySimulationEngine
+
+# المئينات المحسوبة للمبلغ النهائي
+SESSION_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# جولات كل مرحلة سحب (معظم الجلسات تتوقف مبكراً فلا تُسحب لها جولات زائدة)،
+# وأقصى عدد خلايا (جلسات × جولات) في المرحلة الواحدة
+SESSION_STAGE_SPINS = 50
+SESSION_BLOCK_CELLS = 2000000
+
+# عدد المهام لكل عملية (توزيع أفضل للتركيبات التي تتوقف جلساتها مبكراً)
+JOBS_PER_WORKER = 4
+
+
+def quantile_label(quantile):
+    return f"q{round(quantile * 100):02d}"
+
+
+# أعمدة ملف النتائج وأسماؤها بالعربية
+SESSION_COLUMNS = [
+    ('combination_str', 'التركيبة'),
+    ('total_bet', 'إجمالي الرهان'),
+    ('sessions', 'عدد الجلسات'),
+    ('mean_balance', 'متوسط المبلغ النهائي'),
+    ('mean_balance_se', 'خ.م المتوسط'),
+] + [
+    column for quantile in SESSION_QUANTILES for column in (
+        (quantile_label(quantile), f"المئين {round(quantile * 100)}"),
+        (f"{quantile_label(quantile)}_se", f"خ.م المئين {round(quantile * 100)}"))
+] + [
+    ('ruin_probability', 'احتمال الإفلاس'),
+    ('ruin_probability_se', 'خ.م الإفلاس'),
+    ('profit_probability', 'احتمال الربح'),
+    ('profit_probability_se', 'خ.م الربح'),
+    ('mean_length', 'متوسط طول الجلسة'),
+    ('mean_length_se', 'خ.م طول الجلسة'),
+]
+
+
+def session_config(config):
+    """إعدادات محاكي الجلسات: سحب مستقل لكل جلسة (بدون الشريط المشترك أو السباق أو المؤقتات)"""
+    return dict(config, use_shared_tape=False, racing=False, profiling=False, engine='python')
+
+
+def session_seed(simulator, index):
+    """سلسلة أرقام التركيبة رقم index للجلسات (مستقلة عن سلسلة جلسة المسح لنفس التركيبة)"""
+    return simulator.combination_seed(index).spawn(1)[0]
+
+
+def run_sessions(simulator, engine, combination, sessions):
+    """M جلسة مستقلة لتركيبة واحدة: صف لكل جلسة في BatchSession، والسحب على مراحل"""
+    trials = simulator.config['trials_per_combination']
+    bets = np.asarray(combination, dtype=float)
+    total_bet = bets.sum()
+    batch = BatchSession(simulator, np.repeat(np.asarray(combination)[None, :], sessions, axis=0))
+
+    chunk = max(1, min(SESSION_STAGE_SPINS, SESSION_BLOCK_CELLS // sessions))
+    active = np.arange(sessions)
+    for start in range(0, trials, chunk):
+        size = min(chunk, trials - start)
+        outcomes = engine.draw_outcomes((len(active), size))
+        multipliers = engine.draw_multipliers(bets, outcomes)
+        batch.advance(bets[outcomes] * multipliers - total_bet, active)
+
+        # الجلسات المتوقفة لا تُسحب لها جولات بعد الآن
+        active = active[~batch.stopped[active]]
+        if len(active) == 0:
+            break
+    return batch
+
+
+def mean_and_se(values):
+    """المتوسط وخطؤه المعياري"""
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return float(values.mean()), 0.0
+    return float(values.mean()), float(values.std(ddof=1) / math.sqrt(len(values)))
+
+
+def quantiles_and_se(values, quantiles=SESSION_QUANTILES, z=1.0):
+    """المئينات وخطؤها المعياري من إحصاءات الترتيب (نصف فترة ثقة ذات الحدين ÷ z، بدون افتراض توزيع)"""
+    ordered = np.sort(np.asarray(values, dtype=float))
+    count = len(ordered)
+    quantiles = np.asarray(quantiles, dtype=float)
+    estimates = np.quantile(ordered, quantiles)
+
+    spread = z * np.sqrt(count * quantiles * (1 - quantiles))
+    low = np.clip(np.floor(count * quantiles - spread).astype(np.int64), 0, count - 1)
+    high = np.clip(np.ceil(count * quantiles + spread).astype(np.int64), 0, count - 1)
+    return estimates, (ordered[high] - ordered[low]) / (2 * z)
+
+
+def summarize_sessions(simulator, combination, batch):
+    """ملخص توزيع الجلسات لتركيبة واحدة"""
+    initial_balance = simulator.config['initial_balance']
+    balances = batch.balance
+    sessions = len(balances)
+
+    row = {
+        'combination_key': pack_combination(combination),
+        'total_bet': int(sum(combination)),
+        'sessions': sessions,
+    }
+    row['mean_balance'], row['mean_balance_se'] = mean_and_se(balances)
+    estimates, errors = quantiles_and_se(balances)
+    for quantile, estimate, error in zip(SESSION_QUANTILES, estimates, errors):
+        row[quantile_label(quantile)] = float(estimate)
+        row[f"{quantile_label(quantile)}_se"] = float(error)
+
+    # احتمالات بخطأ معياري ذي حدين
+    for name, hits in (('ruin_probability', batch.stopped), ('profit_probability', balances > initial_balance)):
+        probability = float(np.count_nonzero(hits)) / sessions
+        row[name] = probability
+        row[f"{name}_se"] = math.sqrt(probability * (1 - probability) / sessions)
+
+    row['mean_length'], row['mean_length_se'] = mean_and_se(batch.trials_completed())
+    return row
+
+
+def evaluate_targets(simulator, targets, sessions):
+    """تقييم قائمة (فهرس، تركيبة) وإرجاع صف ملخص لكل تركيبة"""
+    simulator.ensure_seed_entropy()
+    engine = NumpySimulationEngine(simulator)
+    rows = []
+    for index, combination in targets:
+        engine.rng = np.random.default_rng(session_seed(simulator, index))
+        batch = run_sessions(simulator, engine, combination, sessions)
+        rows.append(summarize_sessions(simulator, combination, batch))
+    return rows
+
+
+def _evaluate_job(config, seed_entropy, targets, sessions):
+    """مهمة عملية عاملة: محاكي مستقل بنفس البذرة الرئيسية"""
+    simulator = FullCrazyTimeSimulator(config, resume=False, verbose=False)
+    simulator.seed_entropy = seed_entropy
+    return evaluate_targets(simulator, targets, sessions)
+
+
+def session_targets(simulator, top_k=0):
+    """التركيبات المقيّمة مع فهارس بذورها: أفضل K نتيجة مسجلة أو فضاء التشغيل كاملاً"""
+    space = simulator.generate_all_combinations()
+    if top_k:
+        combinations = [unpack_combination(result['combination_key']) for result in simulator.top_results[:top_k]]
+        return [(space.index_offset + space.locate(combination), combination) for combination in combinations]
+    return [(space.index_offset + index, combination) for index, combination in enumerate(space)]
+
+
+def evaluate_sessions(simulator, targets, sessions, workers=1, log=print):
+    """تقييم التركيبات على عدة عمليات (النتائج لا تعتمد على عدد العمليات) وإرجاع DataFrame"""
+    if sessions < 2:
+        raise ValueError("عدد الجلسات لكل تركيبة يجب أن يكون 2 على الأقل")
+    seed_entropy = simulator.ensure_seed_entropy()
+
+    count = max(1, min(len(targets), workers * JOBS_PER_WORKER))
+    jobs = [targets[start:end] for start, end in (shard_bounds(len(targets), index, count) for index in range(count))]
+    rows = []
+    if workers <= 1 or count == 1:
+        for job in jobs:
+            rows += evaluate_targets(simulator, job, sessions)
+            log(f"⏳ الجلسات: {len(rows):,}/{len(targets):,} تركيبة")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_evaluate_job, simulator.config, seed_entropy, job, sessions) for job in jobs]
+            for future in futures:
+                rows += future.result()
+                log(f"⏳ الجلسات: {len(rows):,}/{len(targets):,} تركيبة")
+
+    frame = pd.DataFrame(rows, columns=['combination_key'] + [key for key, _ in SESSION_COLUMNS[1:]])
+    frame.insert(0, 'combination_str', [f"[{','.join(map(str, unpack_combination(key)))}]"
+                                        for key in frame['combination_key']])
+    return frame.sort_values('mean_balance', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def save_sessions(frame, path):
+    """حفظ الملخص في CSV بأسماء أعمدة عربية (BOM ليقرأه Excel)"""
+    labels = dict(SESSION_COLUMNS)
+    frame[list(labels)].rename(columns=labels).to_csv(path, index=False, encoding='utf-8-sig')
+    return path
+
+
+def print_sessions(frame, count=10):
+    """طباعة أفضل التركيبات حسب متوسط المبلغ النهائي"""
+    print(f"🏆 أفضل {min(count, len(frame))} تركيبة حسب متوسط المبلغ النهائي:")
+    for row in frame.head(count).itertuples(index=False):
+        print(f"   • {row.combination_str}: ${row.mean_balance:,.2f} ± {row.mean_balance_se:,.2f} | "
+              f"الوسيط ${row.q50:,.2f} ± {row.q50_se:,.2f} | "
+              f"الإفلاس {row.ruin_probability:.1%} ± {row.ruin_probability_se:.1%} | "
+              f"الطول {row.mean_length:,.0f} ± {row.mean_length_se:,.1f}")
+
+
+def main(argv=None):
+    """تقييم الجلسات المتعددة من سطر الأوامر"""
+    parser = argparse.ArgumentParser(description="جلسات مونت كارلو المتعددة لكل تركيبة")
+    parser.add_argument('--sessions', type=int, help="عدد الجلسات لكل تركيبة (الافتراضي من الإعدادات)")
+    parser.add_argument('--top', type=int, default=0, help="تقييم أفضل K نتيجة من تشغيل منتهٍ فقط")
+    parser.add_argument('--workers', type=int, help="عدد العمليات المتوازية")
+    parser.add_argument('--config', help="ملف إعدادات JSON")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE')
+    parser.add_argument('--seed', type=int, help="البذرة الرئيسية")
+    parser.add_argument('--shard', metavar='INDEX/COUNT', help="تقييم جزء واحد من الفضاء")
+    parser.add_argument('--output-dir', help="مجلد ملفات المحاكاة")
+    parser.add_argument('--output', help="ملف CSV للملخص (الافتراضي من إعدادات الملفات)")
+    args = parser.parse_args(argv)
+
+    try:
+        config, file_config = build_run_config(argparse.Namespace(
+            config=args.config, set=args.set, engine=None, workers=args.workers, seed=args.seed,
+            shard=args.shard, output_dir=args.output_dir))
+        config = session_config(config)
+        # أفضل النتائج تُقرأ من نقطة التوقف عند الحاجة فقط وللقراءة فقط (بدون قص المخزن)
+        simulator = FullCrazyTimeSimulator(config, resume=bool(args.top), verbose=False, file_config=file_config,
+                                           readonly=True)
+        sessions = args.sessions or simulator.config['sessions_per_combination']
+        if sessions < 2:
+            raise ValueError("عدد الجلسات لكل تركيبة يجب أن يكون 2 على الأقل")
+        targets = session_targets(simulator, args.top)
+        if not targets:
+            raise ValueError("لا توجد تركيبات للتقييم (شغّل المحاكاة أولاً عند استخدام --top)")
+
+        print(f"🎲 {sessions:,} جلسة لكل تركيبة × {len(targets):,} تركيبة")
+        frame = evaluate_sessions(simulator, targets, sessions, simulator.config['workers'])
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return EXIT_USAGE
+
+    path = save_sessions(frame, args.output or file_config['sessions_file'])
+    print_sessions(frame)
+    print(f"📊 تم حفظ ملخص الجلسات في {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
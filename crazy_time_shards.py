@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+المسح الموزع على أجزاء لمحاكي Crazy Time (مجلد مشترك)
+====================================================
+- تقسيم فضاء التركيبات إلى N نطاق فهارس منفصل (أجزاء)
+- كل عملية (على أي جهاز) تحجز جزءاً بملف قفل ذري (O_CREAT | O_EXCL) في المجلد المشترك
+- كل جزء يكتب مخزن نتائجه ونقطة توقفه الخاصة، والقفل المتروك يُستعاد بعد مدة
+- أمر الدمج يجمع النتائج وأفضل النتائج والإحصائيات في تقرير نهائي واحد
+
+الاستخدام:
+    python crazy_time_shards.py init  DIR --shards 16 --config sweep.json
+    python crazy_time_shards.py worker DIR --workers 8      (على كل جهاز، أي عدد من المرات)
+    python crazy_time_shards.py status DIR
+    python crazy_time_shards.py merge  DIR
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from full_crazy_time_simulator import (FullCrazyTimeSimulator, FILE_CONFIG, EXIT_CODES, EXIT_USAGE,
+                                       RUN_COMPLETED, RUN_INTERRUPTED, RUN_FAILED,
+                                       build_run_config, shard_file_config)
+from crazy_time_combinations import shard_bounds
+from crazy_time_journal import CheckpointJournal, write_json_atomic
+from crazy_time_results import ResultStore
+from crazy_time_stats import RunningStats
+
+# ملف وصف المسح في المجلد المشترك (الإعدادات وعدد الأجزاء)
+SWEEP_FILE = 'sweep.json'
+
+# القفل الذي لم يُحدَّث منذ هذه المدة يُعتبر متروكاً (عملية متوقفة)
+DEFAULT_STALE_SECONDS = 600
+HEARTBEAT_SECONDS = 30
+
+
+class ShardDirectory:
+    def __init__(self, directory):
+        self.directory = directory
+        self.sweep_path = os.path.join(directory, SWEEP_FILE)
+        self.sweep = None
+
+    def create(self, config, shard_count):
+        """إنشاء وصف المسح (مرة واحدة فقط لكل مجلد)"""
+        os.makedirs(self.directory, exist_ok=True)
+        sweep = {
+            'shard_count': shard_count,
+            'config': config,
+            'created_at': datetime.now().isoformat()
+        }
+        try:
+            fd = os.open(self.sweep_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            raise ValueError(f"يوجد مسح سابق في هذا المجلد: {self.sweep_path}")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(sweep, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        self.sweep = sweep
+        return sweep
+
+    def load(self):
+        """قراءة وصف المسح"""
+        if not os.path.exists(self.sweep_path):
+            raise ValueError(f"لا يوجد مسح في هذا المجلد (شغل init أولاً): {self.directory}")
+        with open(self.sweep_path, 'r', encoding='utf-8') as f:
+            self.sweep = json.load(f)
+        return self.sweep
+
+    @property
+    def shard_count(self):
+        return self.sweep['shard_count']
+
+    def shard_name(self, index):
+        return f"shard-{index + 1}-of-{self.shard_count}"
+
+    def lock_path(self, index):
+        return os.path.join(self.directory, f"{self.shard_name(index)}.lock")
+
+    def done_path(self, index):
+        return os.path.join(self.directory, f"{self.shard_name(index)}.done")
+
+    def file_config(self, index=None):
+        """ملفات جزء معين (أو ملفات التقرير المدمج إذا كان index = None)"""
+        files = {key: os.path.join(self.directory, path) for key, path in FILE_CONFIG.items()}
+        if index is None:
+            return files
+        return shard_file_config(files, index, self.shard_count)
+
+    def shard_config(self, index, overrides=None):
+        """إعدادات محاكاة جزء معين"""
+        config = dict(self.sweep['config'], **(overrides or {}))
+        config['shard_index'] = index
+        config['shard_count'] = self.shard_count
+        return config
+
+    def is_done(self, index):
+        return os.path.exists(self.done_path(index))
+
+    def read_lock(self, index):
+        """محتوى ملف القفل وعمره بالثواني (None إذا لم يوجد)"""
+        path = self.lock_path(index)
+        try:
+            age = self.lock_age(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                owner = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        owner['age'] = age
+        return owner
+
+    def try_claim(self, index, stale_seconds=DEFAULT_STALE_SECONDS):
+        """محاولة حجز جزء (True إذا نجح الحجز)"""
+        if self.is_done(index):
+            return False
+
+        path = self.lock_path(index)
+        owner = {'host': socket.gethostname(), 'pid': os.getpid(), 'claimed_at': datetime.now().isoformat()}
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self.break_stale_lock(index, stale_seconds):
+                    return False
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(owner, f, ensure_ascii=False)
+            # قد يكون الجزء اكتمل بين الفحص والحجز
+            if self.is_done(index):
+                self.release(index)
+                return False
+            return True
+        return False
+
+    def shared_now(self):
+        """الوقت الحالي بساعة خادم المجلد المشترك (وقت تعديل ملف يُنشأ الآن)"""
+        probe = os.path.join(self.directory, f".clock.{socket.gethostname()}.{os.getpid()}")
+        with open(probe, 'w'):
+            pass
+        try:
+            return os.path.getmtime(probe)
+        finally:
+            os.remove(probe)
+
+    def lock_age(self, path):
+        """عمر ملف القفل بالثواني (بنفس الساعة التي كتبت وقت تعديله، بدون فرق بين ساعات الأجهزة)"""
+        return self.shared_now() - os.path.getmtime(path)
+
+    def break_stale_lock(self, index, stale_seconds):
+        """إزالة قفل متروك (إعادة تسمية ذرية: عملية واحدة فقط تنجح)"""
+        path = self.lock_path(index)
+        stale_path = f"{path}.stale.{socket.gethostname()}.{os.getpid()}"
+        try:
+            if self.lock_age(path) < stale_seconds:
+                return False
+            os.rename(path, stale_path)
+        except FileNotFoundError:
+            return True  # أُزيل القفل للتو، نحاول الحجز مرة أخرى
+
+        # بين الفحص وإعادة التسمية قد يُحدَّث القفل أو يُستبدل بحجز جديد: الفحص مرة أخرى على الملف المنقول
+        if self.lock_age(stale_path) < stale_seconds:
+            try:
+                os.link(stale_path, path)  # إرجاع القفل (يفشل إذا حُجز الجزء من جديد)
+            except FileExistsError:
+                print(f"⚠️ تعذر إرجاع قفل الجزء {index + 1} بعد نقله: تم حجزه من عملية أخرى")
+            os.remove(stale_path)
+            return False
+
+        os.remove(stale_path)
+        return True
+
+    def claim_next(self, stale_seconds=DEFAULT_STALE_SECONDS):
+        """حجز أول جزء متاح (None إذا لم يبقَ جزء)"""
+        for index in range(self.shard_count):
+            if self.try_claim(index, stale_seconds):
+                return index
+        return None
+
+    def heartbeat(self, index):
+        """تحديث وقت ملف القفل (علامة أن العملية ما زالت تعمل)"""
+        try:
+            os.utime(self.lock_path(index))
+        except FileNotFoundError:
+            pass
+
+    def release(self, index):
+        try:
+            os.remove(self.lock_path(index))
+        except FileNotFoundError:
+            pass
+
+    def mark_done(self, index, simulator):
+        """تسجيل اكتمال جزء"""
+        write_json_atomic(self.done_path(index), {
+            'shard_index': index,
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'tested_combinations': simulator.tested_combinations,
+            'stored_results': len(simulator.results_store),
+            'finished_at': datetime.now().isoformat()
+        })
+
+    def shard_state(self, index):
+        """آخر حالة مؤكدة في نقطة توقف جزء (None إذا لم يبدأ)"""
+        files = self.file_config(index)
+        journal = CheckpointJournal(files['checkpoint_file'], files['checkpoint_journal'])
+        if not journal.exists():
+            return None
+        return journal.recover()[1]
+
+
+class LockHeartbeat:
+    """خيط يحدّث ملف القفل دورياً أثناء محاكاة الجزء"""
+
+    def __init__(self, shards, index, interval=HEARTBEAT_SECONDS):
+        self.shards = shards
+        self.index = index
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.shards.heartbeat(self.index)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop_event.set()
+        self.thread.join()
+
+
+def init_sweep(directory, config, shard_count):
+    """إنشاء مسح جديد: البذرة الرئيسية مثبتة وشريط النتائج المشترك يُنشأ مرة واحدة"""
+    if shard_count < 1:
+        raise ValueError("عدد الأجزاء يجب أن يكون 1 على الأقل")
+    config = dict(config)
+    if config.get('seed') is None:
+        config['seed'] = np.random.SeedSequence().entropy
+
+    shards = ShardDirectory(directory)
+    sweep = shards.create(config, shard_count)
+
+    if config.get('use_shared_tape') or config.get('racing'):
+        # إنشاء الشريط هنا حتى لا تنشئه عدة عمليات في نفس الوقت
+        simulator = FullCrazyTimeSimulator(config, resume=False, verbose=False, file_config=shards.file_config())
+        simulator.open_tape(create=True)
+
+    print(f"🧩 تم إنشاء مسح من {shard_count} جزء في {directory}")
+    return sweep
+
+
+def run_worker(directory, overrides=None, max_shards=None, stale_seconds=DEFAULT_STALE_SECONDS):
+    """حجز الأجزاء المتاحة ومحاكاتها واحداً تلو الآخر وإرجاع رمز الخروج"""
+    shards = ShardDirectory(directory)
+    shards.load()
+    # تصدير Excel يتم مرة واحدة عند الدمج
+    overrides = dict(overrides or {}, export_on_finish=False)
+
+    completed = 0
+    while max_shards is None or completed < max_shards:
+        index = shards.claim_next(stale_seconds)
+        if index is None:
+            print("✅ لا توجد أجزاء متاحة")
+            return 0
+
+        print(f"🧩 حجز الجزء {index + 1} من {shards.shard_count}")
+        try:
+            with LockHeartbeat(shards, index):
+                simulator = FullCrazyTimeSimulator(shards.shard_config(index, overrides),
+                                                   verbose=False, file_config=shards.file_config(index))
+                status = simulator.run_full_simulation()
+            if status == RUN_COMPLETED:
+                shards.mark_done(index, simulator)
+        except KeyboardInterrupt:
+            shards.release(index)
+            print("\n👋 تم إنهاء العملية (يمكن لعملية أخرى استئناف الجزء)")
+            return EXIT_CODES[RUN_INTERRUPTED]
+        except ValueError as e:
+            # نقطة توقف أو شريط لا يمكن استئنافه: لا يُعاد ضبط الجزء تلقائياً
+            shards.release(index)
+            print(f"❌ تعذر استئناف الجزء {index + 1}: {e}")
+            return EXIT_CODES[RUN_FAILED]
+        shards.release(index)
+
+        if status != RUN_COMPLETED:
+            return EXIT_CODES[status]
+        completed += 1
+
+    return 0
+
+
+def sweep_status(directory):
+    """حالة كل جزء: مكتمل، قيد التشغيل، متروك، أو لم يبدأ"""
+    shards = ShardDirectory(directory)
+    shards.load()
+
+    rows = []
+    for index in range(shards.shard_count):
+        state = shards.shard_state(index)
+        owner = shards.read_lock(index)
+        if shards.is_done(index):
+            status = 'done'
+        elif owner is not None:
+            status = 'running' if owner['age'] < DEFAULT_STALE_SECONDS else 'stale'
+        else:
+            status = 'pending' if state is None else 'paused'
+        rows.append({
+            'shard': index + 1,
+            'status': status,
+            'owner': f"{owner['host']}:{owner['pid']}" if owner else None,
+            'tested_combinations': state.get('tested_combinations', 0) if state else 0,
+            'total_combinations': state.get('total_combinations', 0) if state else 0
+        })
+    return rows
+
+
+def merge_sweep(directory, allow_partial=False, export_excel=True):
+    """دمج نتائج جميع الأجزاء في مخزن ونقطة توقف وملف Excel واحد"""
+    shards = ShardDirectory(directory)
+    sweep = shards.load()
+
+    missing = [index + 1 for index in range(shards.shard_count) if not shards.is_done(index)]
+    if missing and not allow_partial:
+        raise ValueError(f"أجزاء غير مكتملة: {missing} (استخدم --partial لدمج المتاح)")
+
+    config = dict(sweep['config'], shard_index=0, shard_count=1)
+    simulator = FullCrazyTimeSimulator(config, resume=True, verbose=False, file_config=shards.file_config(),
+                                       restart=True)
+    simulator.total_combinations = len(simulator.generate_all_combinations())
+
+    stats = RunningStats(simulator.config['initial_balance'])
+    rebuild_stats = False
+    start_times = []
+    for index in range(shards.shard_count):
+        state = shards.shard_state(index)
+        if state is None:
+            continue
+
+        # النطاقات المكتملة من هذا الجزء بالفهارس العامة (مع النطاقات بعد فجوة لم تُحاكَ بعد)
+        shard_start, _ = shard_bounds(simulator.total_combinations, index, shards.shard_count)
+        completed = state.get('current_combination_index', 0)
+        if completed:
+            simulator.mark_range_completed(shard_start, shard_start + completed)
+        for range_start, range_end in state.get('completed_ranges', []):
+            simulator.mark_range_completed(shard_start + range_start, shard_start + range_end)
+
+        # السجلات المؤكدة فقط (حتى آخر حفظ في نقطة توقف الجزء)، ومخزن الجزء يُفتح للقراءة فقط
+        rows = state.get('stored_results', 0)
+        if rows:
+            store = ResultStore(shards.file_config(index)['results_store'], readonly=True)
+            if len(store) < rows:
+                raise ValueError(f"مخزن الجزء {index + 1} أقصر من نقطة توقفه ({len(store):,} < {rows:,})")
+            records = store.open_memmap(rows)
+            for start in range(0, rows, 100000):
+                simulator.results_store.append(np.array(records[start:min(start + 100000, rows)]))
+
+        if state.get('stats'):
+            stats.merge(RunningStats.from_dict(state['stats']))
+        else:
+            rebuild_stats = True
+        if simulator.racing_stats is not None and state.get('racing_stats'):
+            for key, value in state['racing_stats'].items():
+                simulator.racing_stats[key] += value
+        if state.get('start_time'):
+            start_times.append(state['start_time'])
+
+        simulator.tested_combinations += state.get('tested_combinations', 0)
+
+    # أفضل النتائج من جميع السجلات المدمجة، والإحصائيات بدمج إحصائيات الأجزاء
+    stored = len(simulator.results_store)
+    simulator.replay_results(0, stored)
+    if rebuild_stats:
+        simulator.rebuild_stats(stored)
+    else:
+        simulator.stats = stats
+
+    simulator.start_time = min(start_times) if start_times else None
+    simulator.compact_checkpoint()
+
+    print(f"🧩 تم دمج {stored:,} نتيجة من {shards.shard_count - len(missing)} جزء مكتمل")
+    if export_excel:
+        simulator.export_to_excel()
+    return simulator
+
+
+def main(argv=None):
+    """أوامر المسح الموزع"""
+    parser = argparse.ArgumentParser(description="المسح الموزع على أجزاء لمحاكي Crazy Time")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    init_parser = commands.add_parser('init', help="إنشاء مسح جديد في مجلد مشترك")
+    init_parser.add_argument('directory')
+    init_parser.add_argument('--shards', type=int, required=True, help="عدد الأجزاء")
+    init_parser.add_argument('--config', help="ملف إعدادات JSON")
+    init_parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE')
+    init_parser.add_argument('--engine', choices=['python', 'numpy', 'tape'])
+    init_parser.add_argument('--seed', type=int)
+    init_parser.set_defaults(workers=None, shard=None, output_dir=None)
+
+    worker_parser = commands.add_parser('worker', help="حجز الأجزاء المتاحة ومحاكاتها")
+    worker_parser.add_argument('directory')
+    worker_parser.add_argument('--workers', type=int, help="عدد العمليات المتوازية على هذا الجهاز")
+    worker_parser.add_argument('--max-shards', type=int, help="أقصى عدد أجزاء تحاكيه هذه العملية")
+    worker_parser.add_argument('--stale-after', type=float, default=DEFAULT_STALE_SECONDS,
+                               help="ثواني بدون تحديث قبل اعتبار القفل متروكاً")
+
+    status_parser = commands.add_parser('status', help="حالة الأجزاء")
+    status_parser.add_argument('directory')
+
+    merge_parser = commands.add_parser('merge', help="دمج نتائج الأجزاء في تقرير واحد")
+    merge_parser.add_argument('directory')
+    merge_parser.add_argument('--partial', action='store_true', help="دمج الأجزاء المتاحة حتى لو لم تكتمل جميعها")
+    merge_parser.add_argument('--no-excel', action='store_true', help="بدون تصدير Excel")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'init':
+            config, _ = build_run_config(args)
+            init_sweep(args.directory, config, args.shards)
+        elif args.command == 'worker':
+            overrides = {'workers': args.workers} if args.workers else {}
+            return run_worker(args.directory, overrides, args.max_shards, args.stale_after)
+        elif args.command == 'status':
+            for row in sweep_status(args.directory):
+                owner = f" ({row['owner']})" if row['owner'] else ""
+                print(f"   • الجزء {row['shard']}: {row['status']}{owner} - "
+                      f"{row['tested_combinations']:,}/{row['total_combinations']:,}")
+        elif args.command == 'merge':
+            merge_sweep(args.directory, args.partial, not args.no_excel)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return EXIT_USAGE
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
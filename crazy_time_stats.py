@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+الإحصائيات الجارية لمحاكي Crazy Time
+====================================
+- تحديث واحد لكل نتيجة (أو دفعة) بدون إعادة المرور على جميع النتائج
+- المتوسط والتباين بطريقة Welford، والدمج بطريقة Chan (عمليات متوازية)
+- الأصغر والأكبر ومعدل النجاح وأطول السلاسل ومدرج تكراري للمبلغ النهائي
+- ملف الربح لكل إجمالي رهان (العدد والمتوسط والأصغر والأكبر لنسبة الربح)
+- قابلة للحفظ في نقطة التوقف والاستعادة منها
+"""
+
+import math
+
+import numpy as np
+
+# عدد فئات المدرج التكراري (من 0 إلى مضاعف الميزانية الأولية) + فئة للقيم الأكبر
+HISTOGRAM_BINS = 50
+HISTOGRAM_RANGE = 5
+
+
+def finite_or_none(value):
+    """تحويل اللانهاية إلى None للحفظ في JSON"""
+    return value if math.isfinite(value) else None
+
+
+class RunningStats:
+    def __init__(self, initial_balance, bins=HISTOGRAM_BINS, range_multiple=HISTOGRAM_RANGE):
+        self.initial_balance = initial_balance
+        self.histogram_edges = np.linspace(0, initial_balance * range_multiple, bins + 1)
+
+        self.count = 0
+        self.successes = 0
+        self.mean = 0.0
+        self.m2 = 0.0                    # مجموع مربعات الانحرافات (Welford)
+        self.min_balance = math.inf
+        self.max_balance = -math.inf
+        self.min_profit = math.inf
+        self.max_profit = -math.inf
+        self.trials_sum = 0
+        self.max_single_win = 0.0
+        self.max_win_streak = 0
+        self.max_loss_streak = 0
+        # فئة إضافية في كل طرف: أقل من 0 وأكبر من الحد الأعلى
+        self.histogram = np.zeros(bins + 2, dtype=np.int64)
+        # نسبة الربح لكل إجمالي رهان (الفهرس = total_bet، تكبر المصفوفات عند الحاجة)
+        self.bet_count = np.zeros(0, dtype=np.int64)
+        self.bet_profit_sum = np.zeros(0)
+        self.bet_profit_min = np.zeros(0)
+        self.bet_profit_max = np.zeros(0)
+
+    def grow_bets(self, size):
+        """توسيع مصفوفات ملف الرهان إلى size عنصر على الأقل"""
+        extra = size - len(self.bet_count)
+        if extra <= 0:
+            return
+        self.bet_count = np.concatenate([self.bet_count, np.zeros(extra, dtype=np.int64)])
+        self.bet_profit_sum = np.concatenate([self.bet_profit_sum, np.zeros(extra)])
+        self.bet_profit_min = np.concatenate([self.bet_profit_min, np.full(extra, math.inf)])
+        self.bet_profit_max = np.concatenate([self.bet_profit_max, np.full(extra, -math.inf)])
+
+    def histogram_index(self, balances):
+        """رقم فئة المدرج لكل مبلغ نهائي"""
+        return np.searchsorted(self.histogram_edges, balances, side='right')
+
+    def update(self, result):
+        """إضافة نتيجة واحدة"""
+        balance = result['final_balance']
+        self.count += 1
+        delta = balance - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (balance - self.mean)
+
+        if balance > self.initial_balance:
+            self.successes += 1
+        self.min_balance = min(self.min_balance, balance)
+        self.max_balance = max(self.max_balance, balance)
+        self.min_profit = min(self.min_profit, result['profit_percentage'])
+        self.max_profit = max(self.max_profit, result['profit_percentage'])
+        self.trials_sum += result['trials_completed']
+        self.max_single_win = max(self.max_single_win, result['max_single_win'])
+        self.max_win_streak = max(self.max_win_streak, result['max_win_streak'])
+        self.max_loss_streak = max(self.max_loss_streak, result['max_loss_streak'])
+        self.histogram[self.histogram_index(balance)] += 1
+
+        bet = int(result['total_bet'])
+        profit = result['profit_percentage']
+        self.grow_bets(bet + 1)
+        self.bet_count[bet] += 1
+        self.bet_profit_sum[bet] += profit
+        self.bet_profit_min[bet] = min(self.bet_profit_min[bet], profit)
+        self.bet_profit_max[bet] = max(self.bet_profit_max[bet], profit)
+
+    def update_batch(self, batch):
+        """إضافة دفعة نتائج (قاموس مصفوفات أو مصفوفة سجلات)"""
+        balances = np.asarray(batch['final_balance'], dtype=float)
+        if len(balances) == 0:
+            return
+
+        other = RunningStats(self.initial_balance, len(self.histogram_edges) - 1)
+        other.histogram_edges = self.histogram_edges
+        other.count = len(balances)
+        other.successes = int(np.count_nonzero(balances > self.initial_balance))
+        other.mean = float(balances.mean())
+        other.m2 = float(((balances - other.mean) ** 2).sum())
+        other.min_balance = float(balances.min())
+        other.max_balance = float(balances.max())
+        other.min_profit = float(np.min(batch['profit_percentage']))
+        other.max_profit = float(np.max(batch['profit_percentage']))
+        other.trials_sum = int(np.sum(batch['trials_completed']))
+        other.max_single_win = float(np.max(batch['max_single_win']))
+        other.max_win_streak = int(np.max(batch['max_win_streak']))
+        other.max_loss_streak = int(np.max(batch['max_loss_streak']))
+        other.histogram = np.bincount(self.histogram_index(balances), minlength=len(self.histogram))
+
+        bets = np.asarray(batch['total_bet'], dtype=np.int64)
+        profits = np.asarray(batch['profit_percentage'], dtype=float)
+        other.grow_bets(int(bets.max()) + 1)
+        other.bet_count += np.bincount(bets, minlength=len(other.bet_count))
+        other.bet_profit_sum += np.bincount(bets, weights=profits, minlength=len(other.bet_count))
+        np.minimum.at(other.bet_profit_min, bets, profits)
+        np.maximum.at(other.bet_profit_max, bets, profits)
+        self.merge(other)
+
+    def merge(self, other):
+        """دمج إحصائيات أخرى (طريقة Chan للمتوسط والتباين)"""
+        if other.count == 0:
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+        self.successes += other.successes
+        self.min_balance = min(self.min_balance, other.min_balance)
+        self.max_balance = max(self.max_balance, other.max_balance)
+        self.min_profit = min(self.min_profit, other.min_profit)
+        self.max_profit = max(self.max_profit, other.max_profit)
+        self.trials_sum += other.trials_sum
+        self.max_single_win = max(self.max_single_win, other.max_single_win)
+        self.max_win_streak = max(self.max_win_streak, other.max_win_streak)
+        self.max_loss_streak = max(self.max_loss_streak, other.max_loss_streak)
+        self.histogram += other.histogram
+
+        size = len(other.bet_count)
+        self.grow_bets(size)
+        self.bet_count[:size] += other.bet_count
+        self.bet_profit_sum[:size] += other.bet_profit_sum
+        np.minimum(self.bet_profit_min[:size], other.bet_profit_min, out=self.bet_profit_min[:size])
+        np.maximum(self.bet_profit_max[:size], other.bet_profit_max, out=self.bet_profit_max[:size])
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def success_rate(self):
+        return self.successes / self.count if self.count else 0.0
+
+    @property
+    def average_trials(self):
+        return self.trials_sum / self.count if self.count else 0.0
+
+    def histogram_rows(self):
+        """فئات المدرج التكراري: (من، إلى، العدد)"""
+        edges = [-math.inf] + self.histogram_edges.tolist() + [math.inf]
+        return [(edges[i], edges[i + 1], int(count)) for i, count in enumerate(self.histogram.tolist())]
+
+    def bet_profile(self):
+        """ملف الربح لكل إجمالي رهان مسجل: (الرهان، العدد، المتوسط، الأصغر، الأكبر)"""
+        bets = np.flatnonzero(self.bet_count)
+        counts = self.bet_count[bets]
+        return (bets, counts, self.bet_profit_sum[bets] / counts,
+                self.bet_profit_min[bets], self.bet_profit_max[bets])
+
+    def to_dict(self):
+        """تحويل إلى قاموس قابل للحفظ"""
+        return {
+            'initial_balance': self.initial_balance,
+            'histogram_edges': self.histogram_edges.tolist(),
+            'count': self.count,
+            'successes': self.successes,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min_balance': finite_or_none(self.min_balance),
+            'max_balance': finite_or_none(self.max_balance),
+            'min_profit': finite_or_none(self.min_profit),
+            'max_profit': finite_or_none(self.max_profit),
+            'trials_sum': self.trials_sum,
+            'max_single_win': self.max_single_win,
+            'max_win_streak': self.max_win_streak,
+            'max_loss_streak': self.max_loss_streak,
+            'histogram': self.histogram.tolist(),
+            'bet_count': self.bet_count.tolist(),
+            'bet_profit_sum': self.bet_profit_sum.tolist(),
+            'bet_profit_min': [finite_or_none(value) for value in self.bet_profit_min.tolist()],
+            'bet_profit_max': [finite_or_none(value) for value in self.bet_profit_max.tolist()]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """إنشاء إحصائيات من قاموس محفوظ"""
+        stats = cls(data['initial_balance'], len(data['histogram_edges']) - 1)
+        stats.histogram_edges = np.asarray(data['histogram_edges'], dtype=float)
+        for key in ('count', 'successes', 'mean', 'm2', 'trials_sum', 'max_single_win',
+                    'max_win_streak', 'max_loss_streak'):
+            setattr(stats, key, data[key])
+        for key, empty in (('min_balance', math.inf), ('max_balance', -math.inf),
+                           ('min_profit', math.inf), ('max_profit', -math.inf)):
+            setattr(stats, key, data[key] if data[key] is not None else empty)
+        stats.histogram = np.asarray(data['histogram'], dtype=np.int64)
+
+        # نقاط التوقف الأقدم لا تحتوي على ملف الرهان
+        stats.grow_bets(len(data.get('bet_count', [])))
+        if len(stats.bet_count):
+            stats.bet_count[:] = data['bet_count']
+            stats.bet_profit_sum[:] = data['bet_profit_sum']
+            stats.bet_profit_min[:] = [math.inf if value is None else value for value in data['bet_profit_min']]
+            stats.bet_profit_max[:] = [-math.inf if value is None else value for value in data['bet_profit_max']]
+        return stats
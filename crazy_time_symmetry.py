@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+تماثل التركيبات في محاكي Crazy Time
+===================================
+- كل تركيبة = اتجاه أولي × معامل (القاسم المشترك الأكبر للرهانات)
+- صافي الجولة لتركيبة k×p يساوي k × صافي الجولة لـ p على نفس النتائج
+- المتوسط والتباين يتحولان بدقة: k × المتوسط و k² × التباين
+- التوقف عند الحد الأدنى لا يتناسب مع k، لذلك الجلسة نفسها تُحاكى لكل تركيبة
+- يُستخدم لحساب احتمال الفوز مرة واحدة لكل اتجاه أولي في التحليل الرياضي
+"""
+
+import numpy as np
+
+
+def primitive_directions(combinations):
+    """الاتجاه الأولي والمعامل لكل تركيبة (صفوف × 8)"""
+    combinations = np.asarray(combinations, dtype=np.int64)
+    scales = np.gcd.reduce(combinations, axis=-1)
+    safe_scales = np.where(scales > 0, scales, 1)
+    return combinations // safe_scales[..., None], scales
+
+
+def payout_signature(combination):
+    """توقيع فئة الدفع لتركيبة واحدة: (الاتجاه الأولي، المعامل)"""
+    directions, scale = primitive_directions([combination])
+    return tuple(directions[0].tolist()), int(scale[0])
+
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+جداول النتائج المباشرة للواجهة الرسومية
+=======================================
+- VirtualTable: Treeview افتراضي يرسم الصفوف الظاهرة فقط (النموذج قائمة بايثون)
+- تحديث الجدول بفروقات (إضافة/حذف) وإعادة رسم الخانات المتغيرة فقط
+- LogBuffer: سجل نصي محدود الأسطر (حلقة دائرية) لا يكبر مع طول التشغيل
+"""
+
+import bisect
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+# الحد الأقصى لأسطر السجل المعروضة
+LOG_MAX_LINES = 2000
+
+# أعمدة جداول النتائج: (المفتاح، العنوان، العرض، التنسيق)
+RESULT_COLUMNS = [
+    ('combination_str', "التركيبة", 180, str),
+    ('final_balance', "المبلغ النهائي", 110, lambda value: f"${value:,.2f}"),
+    ('profit_percentage', "الربح %", 80, lambda value: f"{value:+.1f}%"),
+    ('win_rate', "نسبة الفوز", 80, lambda value: f"{value:.1%}"),
+    ('trials_completed', "المحاولات", 80, lambda value: f"{value:,}"),
+    ('total_bet', "الرهان", 60, lambda value: f"${value}"),
+    ('max_single_win', "أكبر ربح", 90, lambda value: f"${value:,.2f}"),
+]
+
+
+class VirtualTable(ttk.Frame):
+    """جدول افتراضي: عدد ثابت من عناصر Treeview تُعاد تعبئتها حسب موضع التمرير"""
+
+    def __init__(self, parent, columns=RESULT_COLUMNS, height=15, key='combination_key',
+                 sort_key=None, max_rows=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.height = height
+        self.key = key
+        # sort_key=None: الصفوف الجديدة في الأعلى (الأحدث أولاً) مع حد أقصى max_rows
+        self.sort_key = sort_key
+        self.max_rows = max_rows
+
+        self.rows = []
+        self.order = []
+        self.keys = set()
+        self.offset = 0
+        self.rendered = [None] * height
+
+        self.tree = ttk.Treeview(self, columns=[column[0] for column in columns], show='headings',
+                                 height=height, selectmode='browse')
+        for name, heading, width, _ in columns:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, anchor=tk.CENTER)
+        self.slots = [self.tree.insert('', tk.END, values=()) for _ in range(height)]
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.columnconfigure(0, weight=1)
+
+        # التمرير بعجلة الفأرة (Windows/macOS ثم Linux)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll_by(-1 if event.delta > 0 else 1) or "break")
+        self.tree.bind('<Button-4>', lambda event: self.scroll_by(-1) or "break")
+        self.tree.bind('<Button-5>', lambda event: self.scroll_by(1) or "break")
+        self.render()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def clear(self):
+        self.rows = []
+        self.order = []
+        self.keys = set()
+        self.offset = 0
+        self.render()
+
+    def apply_diff(self, added=(), removed=()):
+        """تطبيق فروقات الصفوف ثم إعادة رسم الخانات المتغيرة فقط"""
+        if removed:
+            removed = set(removed) & self.keys
+            if removed:
+                kept = [index for index, row in enumerate(self.rows) if row[self.key] not in removed]
+                self.rows = [self.rows[index] for index in kept]
+                if self.sort_key is not None:
+                    self.order = [self.order[index] for index in kept]
+                self.keys -= removed
+
+        added = [row for row in added if row[self.key] not in self.keys]
+        if self.sort_key is not None:
+            # ترتيب تنازلي: الإدراج بالبحث الثنائي على القيم السالبة
+            for row in added:
+                value = -row[self.sort_key]
+                position = bisect.bisect_right(self.order, value)
+                self.order.insert(position, value)
+                self.rows.insert(position, row)
+                self.keys.add(row[self.key])
+        elif added:
+            self.rows[:0] = reversed(added)
+            self.keys.update(row[self.key] for row in added)
+            if self.max_rows is not None and len(self.rows) > self.max_rows:
+                self.keys.difference_update(row[self.key] for row in self.rows[self.max_rows:])
+                del self.rows[self.max_rows:]
+
+        self.render()
+
+    def format_row(self, row):
+        return tuple(fmt(row[name]) for name, _, _, fmt in self.columns)
+
+    def render(self):
+        """تعبئة الخانات الظاهرة من النموذج (الخانات بدون تغيير لا تُلمس)"""
+        self.offset = max(0, min(self.offset, len(self.rows) - self.height))
+        for slot in range(self.height):
+            index = self.offset + slot
+            values = self.format_row(self.rows[index]) if index < len(self.rows) else ()
+            if values != self.rendered[slot]:
+                self.tree.item(self.slots[slot], values=values)
+                self.rendered[slot] = values
+
+        if self.rows:
+            self.scrollbar.set(self.offset / len(self.rows), min(1.0, (self.offset + self.height) / len(self.rows)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_by(self, rows):
+        self.offset += rows
+        self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        """أوامر شريط التمرير: moveto (نسبة) أو scroll (أسطر/صفحات)"""
+        if action == 'moveto':
+            self.offset = int(float(amount) * len(self.rows))
+        elif unit == 'pages':
+            self.offset += int(amount) * self.height
+        else:
+            self.offset += int(amount)
+        self.render()
+
+
+class LogBuffer:
+    """سجل نصي بحد أقصى للأسطر: الأسطر الأقدم تُحذف عند تجاوز الحد"""
+
+    def __init__(self, parent, max_lines=LOG_MAX_LINES, **options):
+        self.max_lines = max_lines
+        self.lines = 0
+        self.text = scrolledtext.ScrolledText(parent, **options)
+
+    def append(self, lines):
+        """إضافة مجموعة أسطر بعملية إدراج واحدة"""
+        if not lines:
+            return
+        self.text.insert(tk.END, "".join(line + "\n" for line in lines))
+        self.lines += len(lines)
+
+        excess = self.lines - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.lines -= excess
+        self.text.see(tk.END)
+
+    def clear(self):
+        self.text.delete("1.0", tk.END)
+        self.lines = 0
+
+    def get(self):
+        return self.text.get("1.0", tk.END)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+شريط النتائج المشترك لمحاكي Crazy Time (أرقام عشوائية مشتركة)
+=============================================================
+- توليد نتائج العجلة ومضاعفات الألعاب الإضافية مرة واحدة لكل جولة
+- حفظ الشريط في ملف .npy وقراءته عبر memmap (مشترك بين العمليات)
+- الشريط مرتبط بالبذرة الرئيسية وعدد الجولات (ملف وصف .json بجانبه)
+- الإنشاء للمحاكي المالك فقط، وباقي العمليات تقرأه وترفض أي شريط لا يطابق
+- تقييم أي تركيبة على نفس الشريط: الدفع = مصفوفة الجولات × الرهانات
+- تقييم دفعة تركيبات كاملة بعملية مصفوفات واحدة
+"""
+
+import json
+import os
+
+import numpy as np
+
+from crazy_time_engine import BatchSession
+from crazy_time_journal import write_json_atomic
+
+# أعمدة الشريط: نتيجة العجلة ومضاعفها في كل جولة
+TAPE_DTYPE = np.dtype([
+    ('outcome', 'u1'),
+    ('multiplier', 'f8')
+])
+
+
+def tape_key_path(path):
+    """ملف وصف الشريط (البذرة الرئيسية وعدد الجولات)"""
+    return f"{path}.json"
+
+
+def tape_mismatch(path, trials, seed_entropy):
+    """سبب عدم مطابقة الشريط المحفوظ (None إذا كان مطابقاً)"""
+    if not os.path.exists(path):
+        return "الشريط غير موجود"
+    try:
+        with open(tape_key_path(path), 'r', encoding='utf-8') as f:
+            key = json.load(f)
+    except (OSError, ValueError):
+        return "ملف وصف الشريط غير موجود أو تالف"
+    if key.get('seed_entropy') != seed_entropy:
+        return "البذرة الرئيسية مختلفة"
+    if key.get('trials') != trials:
+        return f"عدد الجولات مختلف ({key.get('trials')} بدل {trials})"
+
+    records = np.load(path, mmap_mode='r')
+    if records.dtype != TAPE_DTYPE or len(records) != trials:
+        return "صيغة أو طول الشريط غير صحيح"
+    return None
+
+
+class OutcomeTape:
+    def __init__(self, records, num_options):
+        self.records = records
+        self.trials = len(records)
+
+        # مصفوفة الدفع (جولات × 8): المضاعف في عمود النتيجة وصفر في الباقي
+        self.payout_matrix = np.zeros((self.trials, num_options))
+        self.payout_matrix[np.arange(self.trials), records['outcome']] = records['multiplier']
+
+    @staticmethod
+    def generate(simulator, trials, rng=None):
+        """توليد شريط جديد (المضاعفات تُسحب لكل جولة بغض النظر عن الرهان)"""
+        rng = rng if rng is not None else np.random.default_rng()
+        samplers = simulator.samplers
+
+        records = np.zeros(trials, dtype=TAPE_DTYPE)
+        records['outcome'] = samplers.draw_outcomes(rng, trials)
+        for slot, option in enumerate(simulator.betting_options):
+            hits = records['outcome'] == slot
+            hit_count = int(np.count_nonzero(hits))
+            if not hit_count:
+                continue
+            if option in simulator.number_multipliers:
+                records['multiplier'][hits] = simulator.number_multipliers[option]
+            else:
+                records['multiplier'][hits] = samplers.draw_multipliers(option, rng, hit_count)
+        return records
+
+    @classmethod
+    def create(cls, simulator, trials, seed_entropy):
+        """توليد الشريط في الذاكرة من البذرة الرئيسية (بدون كتابة ملف)"""
+        rng = np.random.default_rng(np.random.SeedSequence(seed_entropy))
+        return cls(cls.generate(simulator, trials, rng), len(simulator.betting_options))
+
+    @classmethod
+    def open(cls, path, simulator, trials, seed_entropy, create=False):
+        """فتح الشريط المطابق للبذرة وعدد الجولات (create للمحاكي المالك فقط)"""
+        problem = tape_mismatch(path, trials, seed_entropy)
+        if problem is not None:
+            if not create:
+                raise ValueError(f"شريط النتائج لا يطابق هذه المحاكاة: {problem} ({path})")
+
+            # حذف الوصف أولاً: انقطاع أثناء الكتابة يترك شريطاً بدون وصف (غير مطابق)
+            if os.path.exists(tape_key_path(path)):
+                os.remove(tape_key_path(path))
+            temp_path = f"{path}.tmp.npy"
+            np.save(temp_path, cls.create(simulator, trials, seed_entropy).records)
+            os.replace(temp_path, path)
+            write_json_atomic(tape_key_path(path), {'seed_entropy': seed_entropy, 'trials': trials})
+            print(f"🎞️ تم إنشاء شريط نتائج مشترك: {trials:,} جولة ({path})")
+
+        return cls(np.load(path, mmap_mode='r'), len(simulator.betting_options))
+
+    def payouts(self, combinations):
+        """الدفع في كل جولة لتركيبة (8,) أو مصفوفة تركيبات (صفوف × 8)"""
+        return np.asarray(combinations, dtype=float) @ self.payout_matrix.T
+
+    def simulate_combination(self, simulator, combination):
+        """محاكاة تركيبة واحدة على الشريط المشترك (نفس نواة الدفعات: نفس النتيجة بت ببت)"""
+        if sum(combination) == 0:
+            return None  # تخطي التركيبات بدون رهان
+
+        return simulator.batch_result(self.simulate_batch(simulator, [combination]), 0)
+
+    def simulate_batch(self, simulator, combinations):
+        """محاكاة دفعة تركيبات (صفوف × 8) وإرجاع الإحصائيات كمصفوفات"""
+        combinations = np.asarray(combinations, dtype=np.int64).reshape(-1, self.payout_matrix.shape[1])
+        combinations = combinations[combinations.sum(axis=1) > 0]  # تخطي التركيبات بدون رهان
+
+        session = BatchSession(simulator, combinations)
+        session.advance(self.payouts(combinations) - session.total_bet[:, None])
+        return session.results()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+تتبع أفضل النتائج بكومة محدودة الحجم
+=====================================
+- كومة صغرى بحجم K لكل ترتيب (إدخال O(log K))
+- عدة ترتيبات في نفس الوقت، لكل منها K خاص
+- قابلة للدمج لتجميع نتائج العمليات أو الجلسات المستأنفة
+- التعادل يُحسم بأصغر مفتاح تركيبة: النتيجة لا تعتمد على ترتيب الإدخال (متتالٍ أو متوازٍ)
+"""
+
+import heapq
+import itertools
+
+import numpy as np
+
+from crazy_time_combinations import pack_combinations
+
+# حقل حسم التعادل في كل عنصر
+TIE_KEY = 'combination_key'
+
+# الترتيبات المتاحة وأسماء أوراقها في Excel
+RANKING_LABELS = {
+    'final_balance': 'أفضل النتائج',
+    'profit_percentage': 'أعلى نسبة ربح',
+    'trials_completed': 'أطول بقاء',
+    'max_single_win': 'أكبر ربح منفرد'
+}
+
+
+class BoundedTopK:
+    """أفضل K عناصر حسب مفتاح واحد"""
+
+    def __init__(self, key, capacity):
+        self.key = key
+        self.capacity = capacity
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def threshold(self):
+        """أصغر قيمة مقبولة حالياً (None إذا لم تمتلئ الكومة)"""
+        if len(self._heap) < self.capacity:
+            return None
+        return self._heap[0][0]
+
+    def worst(self):
+        """أسوأ عنصر محفوظ كـ (القيمة، مفتاح التركيبة) (None إذا لم تمتلئ الكومة)"""
+        if len(self._heap) < self.capacity:
+            return None
+        value, tie, _, _ = self._heap[0]
+        return value, -tie
+
+    def push(self, item):
+        """إدخال عنصر وإرجاع True إذا دخل القائمة"""
+        if self.capacity <= 0:
+            return False
+
+        # القيمة الأكبر أفضل، وعند التعادل المفتاح الأصغر أفضل
+        entry = (item[self.key], -int(item[TIE_KEY]), next(self._counter), item)
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, entry)
+            return True
+
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+
+        return False
+
+    def items(self):
+        """العناصر مرتبة تنازلياً"""
+        return [entry[3] for entry in sorted(self._heap, key=lambda entry: (-entry[0], -entry[1]))]
+
+    def merge(self, other):
+        """دمج قائمة أخرى بنفس المفتاح"""
+        for item in other.items():
+            self.push(item)
+
+
+class TopResultsTracker:
+    """تتبع عدة ترتيبات لأفضل النتائج في نفس الوقت"""
+
+    def __init__(self, rankings):
+        self.rankings = {key: BoundedTopK(key, capacity) for key, capacity in rankings.items()}
+
+    def push(self, result):
+        """إدخال نتيجة في جميع الترتيبات"""
+        for ranking in self.rankings.values():
+            ranking.push(result)
+
+    def top(self, key='final_balance'):
+        """أفضل النتائج لترتيب معين (مرتبة تنازلياً)"""
+        ranking = self.rankings.get(key)
+        return ranking.items() if ranking is not None else []
+
+    def push_batch(self, batch, make_item):
+        """إدخال دفعة نتائج (قاموس مصفوفات) مع بناء عناصر المرشحين فقط"""
+        candidates = set()
+        ties = pack_combinations(batch['combination'])
+        for key, ranking in self.rankings.items():
+            if ranking.capacity <= 0:
+                continue
+            values = np.asarray(batch[key])
+            worst = ranking.worst()
+            if worst is None:
+                rows = np.arange(len(values))
+            else:
+                value, tie = worst
+                rows = np.flatnonzero((values > value) | ((values == value) & (ties < np.uint64(tie))))
+            if len(rows) > ranking.capacity:
+                rows = rows[np.lexsort((ties[rows], -values[rows]))[:ranking.capacity]]
+            candidates.update(rows.tolist())
+
+        # بترتيب الدفعة (التعادل يُحسم بمفتاح التركيبة داخل كل ترتيب)
+        for row in sorted(candidates):
+            self.push(make_item(row))
+
+    def merge(self, other):
+        """دمج متتبع آخر (من عملية عاملة أو جلسة سابقة)"""
+        for key, ranking in other.rankings.items():
+            if key not in self.rankings:
+                self.rankings[key] = BoundedTopK(key, ranking.capacity)
+            self.rankings[key].merge(ranking)
+
+    def to_dict(self):
+        """تحويل إلى قاموس قابل للحفظ"""
+        return {
+            key: {'capacity': ranking.capacity, 'items': [dict(item) for item in ranking.items()]}
+            for key, ranking in self.rankings.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data, make_item=None):
+        """إنشاء متتبع من قاموس محفوظ (make_item يحول كل قاموس إلى عنصر)"""
+        tracker = cls({key: value['capacity'] for key, value in data.items()})
+        for key, value in data.items():
+            for item in value['items']:
+                tracker.rankings[key].push(make_item(item) if make_item is not None else item)
+        return tracker
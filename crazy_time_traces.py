@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+مسارات الرصيد لتركيبات مختارة في محاكي Crazy Time
+=================================================
+- تسجيل اختياري لكل جولة (نتيجة العجلة والمضاعف والرصيد) لأفضل K تركيبة أو لقائمة محددة
+- إعادة محاكاة التركيبة بنفس بذرتها (أو على الشريط المشترك) بعد انتهاء المسح: بدون تكلفة أثناء المسح
+- الرصيد مخزن كفروقات (صافي كل جولة)، وكل عمود مضغوط (zlib بعد ترتيب البايتات)
+- ملف واحد: ترويسة ثم فهرس ثابت الحجم ثم الكتل المضغوطة، يُقرأ عبر memmap بدون تحميله كاملاً
+- أدوات عرض وتحليل ورسم المسار من الملف بدون إعادة المحاكاة
+
+الاستخدام:
+    python crazy_time_traces.py record --top 10                 (بعد انتهاء المحاكاة)
+    python crazy_time_traces.py record --combination 1,0,0,0,0,0,0,2
+    python crazy_time_traces.py list
+    python crazy_time_traces.py show 1,0,0,0,0,0,0,2 --spins 30
+    python crazy_time_traces.py plot 1,0,0,0,0,0,0,2 --output trace.png
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from full_crazy_time_simulator import FullCrazyTimeSimulator, BETTING_OPTIONS, EXIT_USAGE, build_run_config
+from crazy_time_combinations import NUM_BETS, pack_combination, unpack_combination
+
+# ترويسة ثابتة الحجم في بداية الملف
+TRACE_MAGIC = b'CTTRACES'
+TRACE_VERSION = 1
+HEADER_SIZE = 1024
+TRACE_COMPRESSION_LEVEL = 6
+
+# فهرس المسارات: سجل ثابت الحجم لكل تركيبة ومواضع كتلها المضغوطة في الملف
+TRACE_INDEX_DTYPE = np.dtype([
+    ('combination_key', 'u8'),
+    ('total_bet', 'i4'),
+    ('spins', 'i4'),
+    ('initial_balance', 'f8'),
+    ('final_balance', 'f8'),
+    ('offset', 'u8'),               # موضع أول كتلة من بداية الملف
+    ('outcome_size', 'u4'),
+    ('multiplier_size', 'u4'),
+    ('delta_size', 'u4'),
+    ('timestamp', 'f8')
+])
+
+# أعمدة كل مسار: (الاسم، النوع) بنفس ترتيب الكتل في الملف
+TRACE_COLUMNS = (('outcome', 'u1'), ('multiplier', 'f8'), ('delta', 'f8'))
+
+
+def encode_array(values, dtype):
+    """ضغط عمود: ترتيب البايتات حسب موضعها (بايتات الأس متجاورة) ثم zlib"""
+    data = np.ascontiguousarray(values, dtype=dtype)
+    shuffled = data.view(np.uint8).reshape(-1, data.itemsize).T
+    return zlib.compress(shuffled.tobytes(), TRACE_COMPRESSION_LEVEL)
+
+
+def decode_array(blob, dtype, count):
+    """فك ضغط عمود مضغوط بـ encode_array"""
+    dtype = np.dtype(dtype)
+    raw = np.frombuffer(zlib.decompress(blob), dtype=np.uint8)
+    return raw.reshape(dtype.itemsize, count).T.copy().view(dtype).reshape(count)
+
+
+def normalize_combination(values):
+    """تركيبة من 8 رهانات صحيحة غير سالبة (من قائمة أو نص مثل 1,0,0,0,0,0,0,2)"""
+    if isinstance(values, str):
+        values = [part for part in values.strip().strip('[]').split(',') if part.strip()]
+    try:
+        combination = [int(value) for value in values]
+    except (TypeError, ValueError):
+        raise ValueError(f"تركيبة غير صالحة: {values}")
+    if len(combination) != NUM_BETS or min(combination) < 0 or sum(combination) == 0:
+        raise ValueError(f"التركيبة يجب أن تحتوي على {NUM_BETS} رهانات غير سالبة مجموعها أكبر من صفر: {values}")
+    pack_combination(combination)
+    return combination
+
+
+def played_spins(config, total_bet, deltas):
+    """عدد الجولات الملعوبة فعلاً (نفس منطق التوقف في summarize_session)"""
+    stop_level = max(total_bet, config['min_balance_threshold'])
+    trajectory = np.cumsum(np.concatenate(([config['initial_balance']], deltas)))
+    stopped = trajectory[:-1] < stop_level
+    return int(np.argmax(stopped)) if stopped.any() else len(deltas)
+
+
+class Trace:
+    """مسار رصيد تركيبة واحدة: نتيجة العجلة ومضاعفها وصافي كل جولة"""
+
+    def __init__(self, combination, initial_balance, outcomes, multipliers, deltas, timestamp=None):
+        self.combination = list(combination)
+        self.initial_balance = initial_balance
+        self.outcomes = np.asarray(outcomes, dtype=np.uint8)
+        self.multipliers = np.asarray(multipliers, dtype=float)
+        self.deltas = np.asarray(deltas, dtype=float)
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    @property
+    def combination_key(self):
+        return pack_combination(self.combination)
+
+    @property
+    def combination_str(self):
+        return f"[{','.join(map(str, self.combination))}]"
+
+    @property
+    def total_bet(self):
+        return sum(self.combination)
+
+    @property
+    def spins(self):
+        return len(self.deltas)
+
+    @property
+    def balances(self):
+        """الرصيد قبل كل جولة وبعد آخرها (spins + 1 قيمة، نفس تراكم المحاكي)"""
+        return np.cumsum(np.concatenate(([self.initial_balance], self.deltas)))
+
+    @property
+    def final_balance(self):
+        return float(self.balances[-1])
+
+    def index_record(self):
+        """سجل الفهرس (بدون مواضع الكتل)"""
+        record = np.zeros(1, dtype=TRACE_INDEX_DTYPE)[0]
+        record['combination_key'] = self.combination_key
+        record['total_bet'] = self.total_bet
+        record['spins'] = self.spins
+        record['initial_balance'] = self.initial_balance
+        record['final_balance'] = self.final_balance
+        record['timestamp'] = self.timestamp
+        return record
+
+    def encode(self):
+        """الكتل المضغوطة بترتيب TRACE_COLUMNS"""
+        return [encode_array(values, dtype) for values, (_, dtype)
+                in zip((self.outcomes, self.multipliers, self.deltas), TRACE_COLUMNS)]
+
+
+def trace_summary(trace, betting_options):
+    """تحليل مسار من الملف: القمة والقاع وأكبر تراجع وأطول سلسلة خسائر وتكرار النتائج"""
+    balances = trace.balances
+    peaks = np.maximum.accumulate(balances)
+    drawdowns = peaks - balances
+    losses = trace.deltas <= 0
+    longest_losses = 0
+    if losses.any():
+        padded = np.concatenate(([False], losses, [False]))
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        longest_losses = int((edges[1::2] - edges[::2]).max())
+
+    counts = np.bincount(trace.outcomes, minlength=len(betting_options))
+    return {
+        'combination': trace.combination_str,
+        'spins': trace.spins,
+        'initial_balance': trace.initial_balance,
+        'final_balance': trace.final_balance,
+        'peak_balance': float(balances.max()),
+        'lowest_balance': float(balances.min()),
+        'max_drawdown': float(drawdowns.max()),
+        'max_drawdown_spin': int(np.argmax(drawdowns)),
+        'best_spin': int(np.argmax(trace.deltas)) if trace.spins else None,
+        'best_spin_profit': float(trace.deltas.max()) if trace.spins else 0.0,
+        'longest_loss_streak': longest_losses,
+        'outcome_counts': {option: int(count) for option, count in zip(betting_options, counts)}
+    }
+
+
+class TraceStore:
+    """ملف المسارات: ترويسة JSON ثم فهرس TRACE_INDEX_DTYPE ثم الكتل المضغوطة"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _read_header(self):
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+
+        if not header.startswith(TRACE_MAGIC):
+            raise ValueError(f"ملف المسارات غير صالح: {self.path}")
+
+        meta = json.loads(header[len(TRACE_MAGIC):].rstrip(b'\0').decode('utf-8'))
+        if np.dtype([tuple(field) for field in meta['descr']]) != TRACE_INDEX_DTYPE:
+            raise ValueError(f"فهرس ملف المسارات لا يطابق الإصدار الحالي: {self.path}")
+        return meta
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return 0
+        return self._read_header()['count']
+
+    def index(self):
+        """فهرس المسارات للقراءة فقط عبر memmap"""
+        count = len(self)
+        if count == 0:
+            return np.zeros(0, dtype=TRACE_INDEX_DTYPE)
+        return np.memmap(self.path, dtype=TRACE_INDEX_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+
+    def find(self, combination):
+        """رقم صف التركيبة في الفهرس (None إذا لم تُسجل)"""
+        rows = np.flatnonzero(self.index()['combination_key'] == np.uint64(pack_combination(combination)))
+        return int(rows[0]) if len(rows) else None
+
+    def read_blocks(self, record):
+        """الكتل المضغوطة لسجل فهرس واحد (قراءة الجزء المطلوب فقط)"""
+        data = np.memmap(self.path, dtype=np.uint8, mode='r')
+        blocks = []
+        offset = int(record['offset'])
+        for name, _ in TRACE_COLUMNS:
+            size = int(record[f'{name}_size'])
+            blocks.append(data[offset:offset + size].tobytes())
+            offset += size
+        return blocks
+
+    def load_row(self, row):
+        """قراءة مسار من رقم صفه في الفهرس"""
+        record = self.index()[row]
+        spins = int(record['spins'])
+        columns = [decode_array(block, dtype, spins)
+                   for block, (_, dtype) in zip(self.read_blocks(record), TRACE_COLUMNS)]
+        return Trace(unpack_combination(record['combination_key']), float(record['initial_balance']),
+                     *columns, timestamp=float(record['timestamp']))
+
+    def load(self, combination):
+        """قراءة مسار تركيبة (KeyError إذا لم تُسجل)"""
+        row = self.find(combination)
+        if row is None:
+            raise KeyError(f"لا يوجد مسار مسجل للتركيبة [{','.join(map(str, combination))}]")
+        return self.load_row(row)
+
+    def save(self, traces):
+        """إضافة مسارات (أو استبدال مسارات نفس التركيبات) وإعادة كتابة الملف بشكل ذري"""
+        entries = {}
+        index = self.index()
+        for row in range(len(index)):
+            record = np.array(index[row])
+            entries[int(record['combination_key'])] = (record, self.read_blocks(record))
+        del index
+        for trace in traces:
+            entries[trace.combination_key] = (trace.index_record(), trace.encode())
+
+        meta = json.dumps({'version': TRACE_VERSION, 'count': len(entries),
+                           'descr': TRACE_INDEX_DTYPE.descr}).encode('utf-8')
+        header = TRACE_MAGIC + meta
+        if len(header) > HEADER_SIZE:
+            raise ValueError("ترويسة ملف المسارات أكبر من الحجم المسموح")
+
+        records = np.zeros(len(entries), dtype=TRACE_INDEX_DTYPE)
+        offset = HEADER_SIZE + records.nbytes
+        for row, (record, blocks) in enumerate(entries.values()):
+            records[row] = record
+            records[row]['offset'] = offset
+            for (name, _), block in zip(TRACE_COLUMNS, blocks):
+                records[row][f'{name}_size'] = len(block)
+                offset += len(block)
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.write(records.tobytes())
+            for _, blocks in entries.values():
+                for block in blocks:
+                    f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        return len(entries)
+
+
+class TraceRecorder:
+    """إعادة محاكاة تركيبات مختارة بنفس بذورها مع التقاط كل جولة"""
+
+    def __init__(self, simulator):
+        # محاكي مستقل بنفس الإعدادات والبذرة الرئيسية (التغليف لا يمس المحاكي الأصلي)
+        config = dict(simulator.config, profiling=False)
+        self.tracer = FullCrazyTimeSimulator(config, resume=False, verbose=False,
+                                             file_config=simulator.file_config)
+        self.tracer.seed_entropy = simulator.ensure_seed_entropy()
+        if self.tracer.uses_tape:
+            self.tracer.open_tape()  # نفس شريط المحاكي الأصلي (قراءة فقط)
+        self.space = None
+        self.spins = None
+
+        if self.tracer.tape is None and self.tracer.engine is None:
+            self.hook_python_engine()
+        elif self.tracer.tape is None:
+            self.hook_numpy_engine()
+
+    def hook_python_engine(self):
+        """تغليف دوال الحلقة الأصلية: النتيجة ثم المضاعف ثم الصافي لكل جولة"""
+        tracer = self.tracer
+        spin_wheel = tracer.spin_wheel
+        generate_bonus_multiplier = tracer.generate_bonus_multiplier
+        calculate_payout = tracer.calculate_payout
+
+        def capture_spin():
+            outcome = spin_wheel()
+            self.spins['outcome'].append(tracer.betting_options.index(outcome))
+            # لعبة إضافية بدون رهان لا يُسحب لها مضاعف (صفر)
+            self.spins['multiplier'].append(tracer.number_multipliers.get(outcome, 0))
+            return outcome
+
+        def capture_bonus(bonus_type):
+            multiplier = generate_bonus_multiplier(bonus_type)
+            self.spins['multiplier'][-1] = multiplier
+            return multiplier
+
+        def capture_payout(bets, outcome):
+            net_result = calculate_payout(bets, outcome)
+            self.spins['delta'].append(net_result)
+            return net_result
+
+        tracer.spin_wheel = capture_spin
+        tracer.generate_bonus_multiplier = capture_bonus
+        tracer.calculate_payout = capture_payout
+
+    def hook_numpy_engine(self):
+        """تغليف سحب النتائج والمضاعفات في المحرك المتجه"""
+        engine = self.tracer.engine
+        draw_outcomes = engine.draw_outcomes
+        draw_multipliers = engine.draw_multipliers
+
+        def capture_outcomes(size):
+            self.spins['outcome'] = draw_outcomes(size)
+            return self.spins['outcome']
+
+        def capture_multipliers(bets, outcomes):
+            self.spins['multiplier'] = draw_multipliers(bets, outcomes)
+            return self.spins['multiplier']
+
+        engine.draw_outcomes = capture_outcomes
+        engine.draw_multipliers = capture_multipliers
+
+    def record(self, combination):
+        """مسار تركيبة واحدة ونتيجتها (ValueError إذا لم تكن ضمن فضاء هذا التشغيل)"""
+        combination = normalize_combination(combination)
+        tracer = self.tracer
+        total_bet = sum(combination)
+        self.spins = {'outcome': [], 'multiplier': [], 'delta': []}
+
+        if tracer.tape is not None:
+            # الشريط المشترك: نفس الجولات لجميع التركيبات
+            result = tracer.simulate_combination(combination)
+            outcomes = tracer.tape.records['outcome']
+            multipliers = tracer.tape.records['multiplier']
+            deltas = tracer.tape.payouts(combination) - total_bet
+        else:
+            if self.space is None:
+                self.space = tracer.generate_all_combinations()
+            result = tracer.recompute_combination(self.space, self.space.locate(combination))
+            outcomes = np.asarray(self.spins['outcome'], dtype=np.uint8)
+            multipliers = np.asarray(self.spins['multiplier'], dtype=float)
+            if tracer.engine is not None:
+                # نفس حساب المحرك المتجه
+                deltas = np.asarray(combination, dtype=float)[outcomes] * multipliers - total_bet
+            else:
+                deltas = np.asarray(self.spins['delta'], dtype=float)
+
+        spins = played_spins(tracer.config, total_bet, deltas)
+        trace = Trace(combination, tracer.config['initial_balance'],
+                      outcomes[:spins], multipliers[:spins], deltas[:spins])
+        return trace, result
+
+
+def trace_targets(simulator, top_k=None, combinations=None):
+    """التركيبات المطلوب تسجيلها: أفضل K نتيجة ثم القائمة المحددة (بدون تكرار)"""
+    top_k = simulator.config['trace_top_k'] if top_k is None else top_k
+    combinations = simulator.config['trace_combinations'] if combinations is None else combinations
+
+    targets = {}
+    for result in simulator.top_results[:top_k]:
+        targets[int(result['combination_key'])] = (unpack_combination(result['combination_key']), result)
+    for combination in combinations:
+        combination = normalize_combination(combination)
+        targets.setdefault(pack_combination(combination), (combination, None))
+    return list(targets.values())
+
+
+def record_traces(simulator, targets=None, path=None, log=print):
+    """تسجيل مسارات التركيبات المطلوبة في ملف المسارات وإرجاعها"""
+    targets = trace_targets(simulator) if targets is None else targets
+    path = path or simulator.file_config['traces_file']
+    if not targets:
+        return []
+
+    recorder = TraceRecorder(simulator)
+    traces = []
+    for combination, expected in targets:
+        try:
+            trace, result = recorder.record(combination)
+        except ValueError as e:
+            log(f"⚠️ تخطي تسجيل المسار: {e}")
+            continue
+        expected = expected if expected is not None else result
+        if expected is not None and not math.isclose(trace.final_balance, expected['final_balance'], abs_tol=1e-6):
+            log(f"⚠️ مسار {trace.combination_str} لا يطابق النتيجة المسجلة "
+                f"(${trace.final_balance:,.2f} بدلاً من ${expected['final_balance']:,.2f}) - هل تغيرت الإعدادات؟")
+        traces.append(trace)
+
+    TraceStore(path).save(traces)
+    log(f"🧭 تم تسجيل {len(traces)} مسار رصيد في {path}")
+    return traces
+
+
+def plot_traces(traces, output=None):
+    """رسم مسارات الرصيد والتراجع عن القمة (حفظ في ملف أو عرض نافذة)"""
+    import matplotlib
+    if output:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # عناوين الرسوم بالإنجليزية: matplotlib لا يدعم تشكيل الحروف العربية
+    figure, (balance_ax, drawdown_ax) = plt.subplots(2, 1, sharex=True, figsize=(10, 6),
+                                                      gridspec_kw={'height_ratios': [3, 1]})
+    for trace in traces:
+        balances = trace.balances
+        line, = balance_ax.plot(balances, linewidth=1, label=f"{trace.combination_str} ${trace.final_balance:,.0f}")
+        drawdown_ax.plot(np.maximum.accumulate(balances) - balances, linewidth=1, color=line.get_color())
+    if traces:
+        balance_ax.axhline(traces[0].initial_balance, color='#7f8c8d', linestyle='--', linewidth=1)
+    balance_ax.set_title("Bankroll trajectory")
+    balance_ax.set_ylabel("balance ($)")
+    balance_ax.legend(fontsize='small')
+    drawdown_ax.set_title("Drawdown from peak")
+    drawdown_ax.set_xlabel("spin")
+    drawdown_ax.set_ylabel("$")
+    figure.tight_layout()
+
+    if output:
+        figure.savefig(output, dpi=100)
+        plt.close(figure)
+    else:
+        plt.show()
+
+
+def print_trace(trace, betting_options, spins=20):
+    """طباعة تحليل المسار وأول الجولات"""
+    summary = trace_summary(trace, betting_options)
+    print(f"🧭 المسار {summary['combination']}: {summary['spins']:,} جولة")
+    print(f"   • الرصيد: ${summary['initial_balance']:,.2f} ← ${summary['final_balance']:,.2f} "
+          f"(القمة ${summary['peak_balance']:,.2f} | القاع ${summary['lowest_balance']:,.2f})")
+    print(f"   • أكبر تراجع: ${summary['max_drawdown']:,.2f} عند الجولة {summary['max_drawdown_spin']:,}")
+    if summary['best_spin'] is not None:
+        print(f"   • أكبر ربح: ${summary['best_spin_profit']:,.2f} في الجولة {summary['best_spin'] + 1:,}")
+    print(f"   • أطول سلسلة خسائر: {summary['longest_loss_streak']}")
+    print("   • النتائج: " + " | ".join(f"{option}: {count}" for option, count in summary['outcome_counts'].items()))
+
+    balances = trace.balances
+    for spin in range(min(spins, trace.spins)):
+        print(f"   {spin + 1:>5} {betting_options[trace.outcomes[spin]]:<11} x{trace.multipliers[spin]:<8g} "
+              f"{trace.deltas[spin]:+10.2f} → ${balances[spin + 1]:,.2f}")
+
+
+def main(argv=None):
+    """تسجيل وعرض ورسم مسارات الرصيد من سطر الأوامر"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', help="ملف إعدادات JSON")
+    common.add_argument('--set', action='append', default=[], metavar='KEY=VALUE')
+    common.add_argument('--shard', metavar='INDEX/COUNT', help="ملفات جزء واحد من مسح موزع")
+    common.add_argument('--output-dir', help="مجلد ملفات المحاكاة")
+    common.add_argument('--traces', help="ملف المسارات (الافتراضي من إعدادات الملفات)")
+
+    parser = argparse.ArgumentParser(description="مسارات الرصيد لتركيبات محاكي Crazy Time")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', parents=[common], help="تسجيل مسارات من نتائج تشغيل منتهٍ")
+    record.add_argument('--top', type=int, default=0, help="عدد أفضل النتائج المسجلة")
+    record.add_argument('--combination', action='append', default=[], help="تركيبة محددة مثل 1,0,0,0,0,0,0,2")
+    commands.add_parser('list', parents=[common], help="عرض المسارات المسجلة")
+    show = commands.add_parser('show', parents=[common], help="تحليل مسار وعرض أول الجولات")
+    show.add_argument('combination')
+    show.add_argument('--spins', type=int, default=20, help="عدد الجولات المعروضة")
+    plot = commands.add_parser('plot', parents=[common], help="رسم مسار أو أكثر")
+    plot.add_argument('combinations', nargs='*', help="التركيبات (الافتراضي: جميع المسارات المسجلة)")
+    plot.add_argument('--output', help="حفظ الرسم في ملف صورة بدلاً من عرضه")
+    args = parser.parse_args(argv)
+
+    try:
+        config, file_config = build_run_config(argparse.Namespace(
+            config=args.config, set=args.set, engine=None, workers=None, seed=None,
+            shard=args.shard, output_dir=args.output_dir))
+        path = args.traces or file_config['traces_file']
+
+        if args.command == 'record':
+            # قراءة فقط: التسجيل لا يقص مخزن النتائج ولا يعيد ضبط نقطة التوقف (قد تكون المحاكاة جارية)
+            simulator = FullCrazyTimeSimulator(config, verbose=False, file_config=file_config, readonly=True)
+            targets = trace_targets(simulator, args.top, args.combination)
+            if not targets:
+                raise ValueError("لا توجد تركيبات للتسجيل (حدد --top أو --combination بعد انتهاء المحاكاة)")
+            return 0 if record_traces(simulator, targets, path) else 1
+
+        store = TraceStore(path)
+        if len(store) == 0:
+            print(f"⚠️ لا توجد مسارات مسجلة في {path}")
+            return 1
+
+        if args.command == 'list':
+            index = store.index()
+            print(f"🧭 {len(index):,} مسار في {path}:")
+            for record in np.sort(index, order='final_balance')[::-1]:
+                combination = unpack_combination(record['combination_key'])
+                print(f"   • [{','.join(map(str, combination))}] الرهان ${record['total_bet']} | "
+                      f"{record['spins']:,} جولة | ${record['initial_balance']:,.2f} ← ${record['final_balance']:,.2f}")
+        elif args.command == 'show':
+            print_trace(store.load(normalize_combination(args.combination)), BETTING_OPTIONS, args.spins)
+        else:
+            if args.combinations:
+                traces = [store.load(normalize_combination(text)) for text in args.combinations]
+            else:
+                traces = [store.load_row(row) for row in range(len(store))]
+            plot_traces(traces, args.output)
+            if args.output:
+                print(f"📈 تم حفظ الرسم في {args.output}")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ {e.args[0] if isinstance(e, KeyError) else e}")
+        return EXIT_USAGE
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,13 +9,26 @@
 """
 
 import random
+import argparse
+import sys
+import numpy as np
 import pandas as pd
 import json
 import time
 import os
 from datetime import datetime
+from itertools import islice
 from openpyxl import load_workbook, Workbook
 
+from crazy_time_combinations import CombinationSpace, pack_combination
+from crazy_time_results import (ResultStore, ResultRecord, records_to_dataframe, results_to_records,
+                                batch_to_records, records_to_batch)
+from crazy_time_topk import TopResultsTracker, RANKING_LABELS
+from crazy_time_samplers import SamplerSet
+from crazy_time_journal import CheckpointJournal
+from crazy_time_stats import RunningStats
+from crazy_time_metrics import SimulationMetrics, MetricsStream, instrument, instrument_tape, estimate_hours
+
 # ==========================================
 # 🎯 المتغيرات القابلة للتخصيص
 # ==========================================
@@ -28,7 +41,35 @@ SIMULATION_CONFIG = {
     'min_bet_amount': 0,             # أقل مبلغ رهان (0 = بدون رهان)
     'max_bet_amount': 20,            # أكبر مبلغ رهان
     'save_interval': 10,             # حفظ كل كم تركيبة
-    'top_results_count': 100         # عدد أفضل النتائج المحفوظة
+    'top_results_count': 100,        # عدد أفضل النتائج المحفوظة (حسب المبلغ النهائي)
+    'top_rankings': {                # ترتيبات إضافية لأفضل النتائج وعدد كل منها
+        'profit_percentage': 100,
+        'trials_completed': 100,
+        'max_single_win': 100
+    },
+    'engine': 'python',              # محرك المحاكاة: 'python' أو 'numpy'
+    'workers': 1,                    # عدد العمليات المتوازية (1 = بدون توازي)
+    'chunk_size': 500,               # عدد التركيبات في كل دفعة للعمليات المتوازية
+    'sweep_mode': 'full',            # 'full' أو 'analytic_shortlist' (محاكاة القائمة المختصرة فقط)
+    'analytic_shortlist_size': 1000, # عدد التركيبات المرسلة للمحاكاة الكاملة
+    'analytic_metric': 'upper_bound',# معيار الترتيب: 'mean' أو 'upper_bound'
+    'analytic_z': 2.0,               # عدد الانحرافات المعيارية في معيار upper_bound
+    'use_shared_tape': False,        # تقييم جميع التركيبات على نفس شريط النتائج (أرقام عشوائية مشتركة)
+    'batch_size': 500,               # عدد التركيبات المقيّمة معاً في نواة الدفعات (مع الشريط المشترك)
+    'racing': False,                 # نمط السباق: استبعاد التركيبات التي لا يمكنها دخول أفضل K مبكراً
+    'racing_stages': [50, 200],      # نقاط الفحص (عدد الجولات) قبل اكتمال المحاكاة
+    'racing_z': 3.0,                 # عدد الانحرافات المعيارية في الحد الأعلى للمبلغ النهائي
+    'racing_metric': 'final_balance',# الترتيب المستخدم للعتبة: 'final_balance' أو 'profit_percentage'
+    'checkpoint_compact_interval': 50,# كتابة لقطة كاملة وضغط سجل نقاط التوقف كل كم حفظ
+    'profiling': False,              # قياس مراحل الحلقة الساخنة (سحب العجلة، الألعاب الإضافية، الدفع)
+    'metrics_interval': 30,          # كتابة ملف المقاييس كل كم ثانية (0 = بدون ملف)
+    'seed': None,                    # البذرة الرئيسية (None = بذرة عشوائية تُحفظ في نقطة التوقف)
+    'shard_index': 0,                # رقم الجزء المحاكى من فضاء التركيبات (للتشغيل الموزع)
+    'shard_count': 1,                # عدد الأجزاء (1 = الفضاء كاملاً)
+    'trace_top_k': 0,                # تسجيل مسار الرصيد لكل جولة لأفضل K تركيبة بعد انتهاء المسح (0 = بدون)
+    'trace_combinations': [],        # تركيبات إضافية لتسجيل مسارها، مثل [[1,0,0,0,0,0,0,2]]
+    'sessions_per_combination': 1000,# عدد الجلسات المستقلة لكل تركيبة في نمط الجلسات المتعددة (crazy_time_sessions.py)
+    'export_on_finish': True         # تصدير Excel عند انتهاء المحاكاة
 }
 
 # تكوين عجلة اللعبة (عدد المواضع لكل نتيجة)
@@ -51,6 +92,32 @@ BONUS_MULTIPLIERS = {
     'Crazy Time': 36.43
 }
 
+# توزيعات مضاعفات الألعاب الإضافية (تستخدمها جميع المحركات)
+BONUS_DISTRIBUTIONS = {
+    'Coin Flip': {
+        'low_probability': 0.5,          # احتمال الجانب المنخفض
+        'low_range': (2, 5),
+        'high_range': (7, 25)            # الحد الأعلى = min(25, المتوسط × 2)
+    },
+    'Cash Hunt': {
+        'values': [5, 7, 10, 15, 20, 25, 50, 75, 100, 200, 500],
+        'weights': [20, 18, 25, 15, 12, 6, 3, 2, 1, 0.5, 0.2]
+    },
+    'Pachinko': {
+        'values': [7, 10, 15, 20, 25, 50, 100],
+        'weights': [30, 25, 20, 15, 8, 2, 1],
+        'double_probability': 0.0547,    # احتمال المضاعفة (حسب البيانات الرسمية)
+        'max_multiplier': 10000
+    },
+    'Crazy Time': {
+        'values': [10, 15, 20, 25, 50, 100, 200, 500],
+        'weights': [25, 20, 18, 15, 12, 8, 2, 1],
+        'extra_probability': 0.1,        # فرصة المضاعفة الإضافية
+        'extra_multipliers': [2, 3, 5],
+        'max_multiplier': 20000
+    }
+}
+
 # مضاعفات الأرقام
 NUMBER_MULTIPLIERS = {
     '$1': 1,
@@ -66,41 +133,104 @@ BETTING_OPTIONS = ['$1', '$2', '$5', '$10', 'Coin Flip', 'Pachinko', 'Cash Hunt'
 FILE_CONFIG = {
     'excel_file': 'crazy_time_full_results.xlsx',
     'checkpoint_file': 'full_simulation_checkpoint.json',
+    'checkpoint_journal': 'full_simulation_checkpoint.journal',
+    'results_store': 'crazy_time_results.bin',
+    'tape_file': 'crazy_time_tape.npy',
+    'traces_file': 'crazy_time_traces.bin',
+    'sessions_file': 'crazy_time_sessions.csv',
+    'metrics_file': 'simulation_metrics.jsonl',   # .csv للكتابة بصيغة CSV
     'progress_log': 'simulation_progress.log'
 }
 
+# حالات انتهاء المحاكاة ورموز الخروج لسطر الأوامر
+RUN_COMPLETED = 'completed'
+RUN_INTERRUPTED = 'interrupted'
+RUN_FAILED = 'failed'
+
+EXIT_CODES = {
+    RUN_COMPLETED: 0,
+    RUN_FAILED: 1,
+    RUN_INTERRUPTED: 130
+}
+EXIT_USAGE = 2       # خطأ في الخيارات أو ملف الإعدادات
+EXIT_CANCELLED = 3   # ألغى المستخدم التشغيل
+
 # ==========================================
 # 🎰 فئة المحاكي الرئيسية
 # ==========================================
 
 class FullCrazyTimeSimulator:
-    def __init__(self, config=None):
+    def __init__(self, config=None, resume=True, verbose=True, file_config=None, restart=False, readonly=False):
         # تحميل الإعدادات
-        self.config = config or SIMULATION_CONFIG
+        self.config = dict(SIMULATION_CONFIG, **(config or {}))
         self.wheel_config = WHEEL_CONFIG
         self.bonus_multipliers = BONUS_MULTIPLIERS
+        self.bonus_distributions = BONUS_DISTRIBUTIONS
         self.number_multipliers = NUMBER_MULTIPLIERS
         self.betting_options = BETTING_OPTIONS
-        self.file_config = FILE_CONFIG
+        self.file_config = dict(FILE_CONFIG, **(file_config or {}))
         
-        # إنشاء العجلة المرجحة
-        self.wheel = []
-        for outcome, count in self.wheel_config.items():
-            self.wheel.extend([outcome] * count)
+        # مولد الأرقام العشوائية الخاص بهذا المحاكي
+        self.rng = random.Random()
+        
+        # أدوات السحب (جداول Alias للعجلة والألعاب الإضافية)
+        self.samplers = SamplerSet(self)
+        
+        # محرك المحاكاة المتجه (اختياري)
+        self.engine = None
+        if self.config['engine'] == 'numpy':
+            from crazy_time_engine import NumpySimulationEngine
+            self.engine = NumpySimulationEngine(self)
+        
+        # شريط النتائج المشترك (اختياري، ومطلوب لنمط السباق) يُفتح بعد معرفة البذرة الرئيسية
+        self.tape = None
+        self.uses_tape = self.config['use_shared_tape'] or self.config['racing']
+        
+        # نمط السباق (اختياري)
+        self.racing = None
+        self.racing_stats = None
+        if self.config['racing']:
+            from crazy_time_racing import RacingEvaluator, empty_racing_stats
+            self.racing = RacingEvaluator(self)
+            self.racing_stats = empty_racing_stats()
+        
+        # قياس الأداء (مؤقتات المراحل وعدادات السرعة)
+        self.metrics = SimulationMetrics()
+        if self.config['profiling']:
+            instrument(self, self.metrics)
+        self.metrics_stream = None
+        if resume and not readonly and self.config['metrics_interval'] > 0:
+            self.metrics_stream = MetricsStream(self.file_config['metrics_file'], self.config['metrics_interval'])
         
         # متغيرات التتبع
-        self.all_results = []
-        self.top_results = []
+        self.pending_results = []
+        self.pending_records = []
+        self.results_store = None
+        self.top_tracker = TopResultsTracker(self.top_rankings())
+        self.stats = RunningStats(self.config['initial_balance'])
         self.current_combination_index = 0
+        self.completed_ranges = []
         self.total_combinations = 0
         self.tested_combinations = 0
         self.start_time = None
+        self.seed_entropy = self.config['seed']
+        self.journal = None
+        # القراءة فقط (التصدير والأدوات): لا قص ولا إعادة ضبط ولا شريط ولا كتابة نقاط توقف
+        self.readonly = readonly
         
-        # تحميل التقدم السابق
-        self.load_checkpoint()
+        if resume:
+            # مخزن النتائج وسجل نقاط التوقف وتحميل التقدم السابق
+            self.results_store = ResultStore(self.file_config['results_store'], readonly=readonly)
+            self.journal = CheckpointJournal(self.file_config['checkpoint_file'],
+                                             self.file_config['checkpoint_journal'])
+            if restart:
+                self.reset_progress()
+            else:
+                self.load_checkpoint()
         
-        # طباعة الإعدادات
-        self.print_configuration()
+        if verbose:
+            # طباعة الإعدادات
+            self.print_configuration()
     
     def print_configuration(self):
         """طباعة إعدادات المحاكاة"""
@@ -113,6 +243,16 @@ class FullCrazyTimeSimulator:
         print(f"   • نطاق الرهان: ${self.config['min_bet_amount']} - ${self.config['max_bet_amount']}")
         print(f"   • حفظ كل: {self.config['save_interval']} تركيبات")
         print(f"   • حفظ أفضل: {self.config['top_results_count']} نتيجة")
+        print(f"   • محرك المحاكاة: {self.config['engine']}")
+        print(f"   • العمليات المتوازية: {self.config['workers']}")
+        if self.tape is not None:
+            print(f"   • شريط النتائج المشترك: {self.file_config['tape_file']}")
+        if self.racing is not None:
+            print(f"   • نمط السباق: مراحل {self.racing.stages} | z = {self.config['racing_z']}")
+        if self.config['sweep_mode'] == 'analytic_shortlist':
+            print(f"   • القائمة المختصرة التحليلية: {self.config['analytic_shortlist_size']:,} تركيبة")
+        if self.config['shard_count'] > 1:
+            print(f"   • الجزء: {self.config['shard_index'] + 1} من {self.config['shard_count']}")
         
         print(f"\n🎲 تكوين العجلة:")
         total_positions = sum(self.wheel_config.values())
@@ -126,59 +266,48 @@ class FullCrazyTimeSimulator:
         
         print(f"\n📁 ملفات الإخراج:")
         print(f"   • Excel: {self.file_config['excel_file']}")
+        print(f"   • مخزن النتائج: {self.file_config['results_store']}")
         print(f"   • نقطة التوقف: {self.file_config['checkpoint_file']}")
         print("=" * 60)
     
     def generate_bonus_multiplier(self, bonus_type):
         """توليد مضاعف عشوائي حول المتوسط الرسمي"""
-        base_avg = self.bonus_multipliers[bonus_type]
-        
-        if bonus_type == 'Coin Flip':
-            # Coin Flip: جانب منخفض (2-5) أو عالي (7-25)
-            if random.random() < 0.5:
-                return random.uniform(2, 5)
-            else:
-                return random.uniform(7, min(25, base_avg * 2))
-                
-        elif bonus_type == 'Cash Hunt':
-            # Cash Hunt: توزيع واقعي من 5x إلى 500x
-            return random.choices(
-                [5, 7, 10, 15, 20, 25, 50, 75, 100, 200, 500],
-                weights=[20, 18, 25, 15, 12, 6, 3, 2, 1, 0.5, 0.2]
-            )[0]
-            
-        elif bonus_type == 'Pachinko':
-            # Pachinko مع إمكانية المضاعفة
-            base_multiplier = random.choices(
-                [7, 10, 15, 20, 25, 50, 100],
-                weights=[30, 25, 20, 15, 8, 2, 1]
-            )[0]
-            
-            # إمكانية المضاعفة (5.47% حسب البيانات الرسمية)
-            while random.random() < 0.0547:
-                base_multiplier *= 2
-                if base_multiplier > 10000:  # حد أقصى معقول
-                    break
-            return min(base_multiplier, 10000)
-            
-        elif bonus_type == 'Crazy Time':
-            # Crazy Time: نظام عجلات معقد
-            base_multiplier = random.choices(
-                [10, 15, 20, 25, 50, 100, 200, 500],
-                weights=[25, 20, 18, 15, 12, 8, 2, 1]
-            )[0]
-            
-            # تطبيق مضاعفات إضافية
-            if random.random() < 0.1:  # 10% فرصة للمضاعفة
-                base_multiplier *= random.choice([2, 3, 5])
-            
-            return min(base_multiplier, 20000)
-            
-        return base_avg
+        if bonus_type in self.samplers.bonus:
+            return self.samplers.draw_multiplier(bonus_type, self.rng.random)
+        return self.bonus_multipliers[bonus_type]
     
     def spin_wheel(self):
         """محاكاة دوران العجلة"""
-        return random.choice(self.wheel)
+        return self.betting_options[self.samplers.draw_outcome(self.rng.random)]
+    
+    def ensure_seed_entropy(self):
+        """البذرة الرئيسية للتشغيل (تُنشأ مرة واحدة وتُحفظ في نقطة التوقف)"""
+        if self.seed_entropy is None:
+            self.seed_entropy = np.random.SeedSequence().entropy
+        return self.seed_entropy
+    
+    def combination_seed(self, index):
+        """سلسلة أرقام مستقلة للتركيبة رقم index (مطابقة لـ SeedSequence(entropy).spawn()[index])"""
+        return np.random.SeedSequence(self.ensure_seed_entropy(), spawn_key=(index,))
+    
+    def open_tape(self, create=False, in_memory=False):
+        """فتح شريط النتائج المرتبط بالبذرة الرئيسية (الإنشاء للمحاكي المالك فقط)"""
+        from crazy_time_tape import OutcomeTape
+        trials = self.config['trials_per_combination']
+        if in_memory:
+            self.tape = OutcomeTape.create(self, trials, self.ensure_seed_entropy())
+        else:
+            self.tape = OutcomeTape.open(self.file_config['tape_file'], self, trials,
+                                         self.ensure_seed_entropy(), create=create)
+        if self.config['profiling']:
+            instrument_tape(self.tape, self.metrics)
+        return self.tape
+    
+    def reseed(self, seed_sequence):
+        """إعادة تهيئة مولدات الأرقام العشوائية من SeedSequence"""
+        self.rng.seed(int(seed_sequence.generate_state(1, np.uint64)[0]))
+        if self.engine is not None:
+            self.engine.rng = np.random.default_rng(seed_sequence)
     
     def calculate_payout(self, bets, outcome):
         """حساب المكسب/الخسارة لرهان معين ونتيجة"""
@@ -202,6 +331,12 @@ class FullCrazyTimeSimulator:
     
     def simulate_combination(self, combination):
         """محاكاة تركيبة رهان واحدة"""
+        if self.tape is not None:
+            return self.tape.simulate_combination(self, combination)
+        
+        if self.engine is not None:
+            return self.engine.simulate_combination(combination)
+        
         balance = self.config['initial_balance']
         wins = 0
         losses = 0
@@ -249,96 +384,169 @@ class FullCrazyTimeSimulator:
         
         trials_completed = trial + 1
         
-        return {
-            'combination': combination,
-            'combination_str': f"[{','.join(map(str, combination))}]",
-            'total_bet': total_bet,
-            'final_balance': balance,
-            'trials_completed': trials_completed,
-            'wins': wins,
-            'losses': losses,
-            'win_rate': wins / trials_completed if trials_completed > 0 else 0,
-            'total_profit': total_profit,
-            'total_loss': total_loss,
-            'max_single_win': max_single_win,
-            'max_single_loss': max_single_loss,
-            'max_win_streak': max_win_streak,
-            'max_loss_streak': max_loss_streak,
-            'profit_percentage': ((balance - self.config['initial_balance']) / self.config['initial_balance']) * 100,
-            'average_win': total_profit / wins if wins > 0 else 0,
-            'average_loss': total_loss / losses if losses > 0 else 0,
-            'timestamp': datetime.now().isoformat()
-        }
+        return self.build_result(
+            combination, total_bet, balance, trials_completed, wins, losses,
+            total_profit, total_loss, max_single_win, max_single_loss,
+            max_win_streak, max_loss_streak
+        )
     
-    def generate_all_combinations(self):
-        """توليد جميع التركيبات الممكنة"""
-        combinations = []
-        min_bet = self.config['min_bet_amount']
-        max_bet = self.config['max_bet_amount']
+    def simulate_combinations(self, combinations, start=None):
+        """محاكاة مجموعة تركيبات: دفعة مصفوفات مع الشريط المشترك، أو قائمة نتائج"""
+        if self.racing is not None:
+            return self.racing.simulate_batch(self.tape, combinations)
         
-        for total_bet in range(min_bet, max_bet + 1):
-            for combo in self._generate_combinations_with_sum(8, total_bet):
-                combinations.append(combo)
+        if self.tape is not None:
+            return self.tape.simulate_batch(self, combinations)
         
-        return combinations
+        results = []
+        for offset, combination in enumerate(combinations):
+            if start is not None:
+                # start هو فهرس أول تركيبة: كل تركيبة تُحاكى بسلسلة أرقام خاصة بفهرسها
+                self.reseed(self.combination_seed(start + offset))
+            result = self.simulate_combination(combination)
+            if result:
+                results.append(result)
+        return results
     
-    def _generate_combinations_with_sum(self, num_variables, target_sum):
-        """توليد التركيبات التي مجموعها = target_sum"""
-        if num_variables == 1:
-            yield [target_sum]
+    def sweep_block_size(self):
+        """عدد التركيبات في كل خطوة من حلقة المسح"""
+        return self.config['batch_size'] if self.tape is not None else 1
+    
+    def simulate_block(self, all_combinations, start, end):
+        """محاكاة وتسجيل التركيبات من start إلى end"""
+        if self.tape is not None:
+            self.record_results(self.simulate_combinations(all_combinations.to_array(start, end - start)))
         else:
-            for i in range(target_sum + 1):
-                for combo in self._generate_combinations_with_sum(num_variables - 1, target_sum - i):
-                    yield [i] + combo
+            self.record_results(self.simulate_combinations(islice(all_combinations.iter_from(start), end - start),
+                                                           all_combinations.index_offset + start))
+    
+    def recompute_combination(self, all_combinations, index):
+        """إعادة حساب نتيجة تركيبة واحدة بمعزل عن باقي التشغيل (نفس البذرة = نفس النتيجة)"""
+        combination = list(all_combinations[index])
+        if self.tape is None:
+            self.reseed(self.combination_seed(all_combinations.index_offset + index))
+        return self.simulate_combination(combination)
+    
+    def batch_result(self, batch, row):
+        """سجل النتيجة لصف واحد من دفعة مصفوفات"""
+        return self.build_result(
+            batch['combination'][row].tolist(),
+            int(batch['total_bet'][row]),
+            float(batch['final_balance'][row]),
+            int(batch['trials_completed'][row]),
+            int(batch['wins'][row]),
+            int(batch['losses'][row]),
+            float(batch['total_profit'][row]),
+            float(batch['total_loss'][row]),
+            float(batch['max_single_win'][row]),
+            float(batch['max_single_loss'][row]),
+            int(batch['max_win_streak'][row]),
+            int(batch['max_loss_streak'][row])
+        )
+    
+    def build_result(self, combination, total_bet, balance, trials_completed, wins, losses,
+                     total_profit, total_loss, max_single_win, max_single_loss,
+                     max_win_streak, max_loss_streak):
+        """بناء سجل النتيجة الموحد لجميع المحركات"""
+        return ResultRecord(
+            pack_combination(combination),
+            total_bet,
+            balance,
+            trials_completed,
+            wins,
+            losses,
+            wins / trials_completed if trials_completed > 0 else 0,
+            total_profit,
+            total_loss,
+            max_single_win,
+            max_single_loss,
+            max_win_streak,
+            max_loss_streak,
+            ((balance - self.config['initial_balance']) / self.config['initial_balance']) * 100,
+            total_profit / wins if wins > 0 else 0,
+            total_loss / losses if losses > 0 else 0,
+            time.time()
+        )
+    
+    def generate_all_combinations(self):
+        """فضاء جميع التركيبات الممكنة (مفهرس بدون توليد القائمة)"""
+        space = CombinationSpace(self.config['min_bet_amount'], self.config['max_bet_amount'])
+        
+        if self.config['sweep_mode'] == 'analytic_shortlist':
+            # ترتيب تحليلي ثم محاكاة القائمة المختصرة فقط
+            from crazy_time_analytics import AnalyticModel
+            space = AnalyticModel(self).shortlist(space)
+        
+        if self.config['shard_count'] > 1:
+            # جزء متتالٍ فقط من الفضاء (الفهارس العامة تبقى مفتاح البذور)
+            space = space.shard(self.config['shard_index'], self.config['shard_count'])
+        
+        return space
     
-    def save_to_excel(self):
-        """حفظ النتائج في ملف Excel"""
-        if not self.all_results:
+    def save_results(self):
+        """إلحاق النتائج الجديدة بمخزن النتائج"""
+        if self.pending_results:
+            self.pending_records.append(results_to_records(self.pending_results))
+            self.pending_results = []
+        
+        if not self.pending_records:
             return
-            
-        # إنشاء DataFrame
-        df = pd.DataFrame(self.all_results)
-        
-        # ترتيب الأعمدة
-        column_order = [
-            'combination_str', 'total_bet', 'final_balance', 'profit_percentage',
-            'trials_completed', 'wins', 'losses', 'win_rate',
-            'max_single_win', 'max_single_loss', 'max_win_streak', 'max_loss_streak',
-            'average_win', 'average_loss', 'timestamp'
-        ]
-        df = df[column_order]
-        
-        # أسماء الأعمدة بالعربية
-        df.columns = [
-            'التركيبة', 'إجمالي الرهان', 'المبلغ النهائي', 'نسبة الربح%',
-            'عدد الجولات', 'الانتصارات', 'الخسائر', 'معدل الفوز',
-            'أكبر ربح', 'أكبر خسارة', 'أطول سلسلة فوز', 'أطول سلسلة خسارة',
-            'متوسط الربح', 'متوسط الخسارة', 'الوقت'
-        ]
-        
-        # حفظ في Excel
-        with pd.ExcelWriter(self.file_config['excel_file'], engine='openpyxl') as writer:
-            # ورقة جميع النتائج
-            df.to_excel(writer, sheet_name='جميع النتائج', index=False)
-            
-            # ورقة أفضل النتائج
-            if self.top_results:
-                top_df = pd.DataFrame(self.top_results)
-                top_df = top_df[column_order]
-                top_df.columns = df.columns
-                top_df.to_excel(writer, sheet_name='أفضل النتائج', index=False)
-            
-            # ورقة الملخص الإحصائي
-            self._create_summary_sheet(writer)
         
-        print(f"💾 تم حفظ {len(self.all_results)} نتيجة في {self.file_config['excel_file']}")
+        records = np.concatenate(self.pending_records)
+        stored = self.results_store.append(records)
+        print(f"💾 تم حفظ {len(records)} نتيجة (الإجمالي: {stored:,}) في {self.file_config['results_store']}")
+        self.pending_records = []
+    
+    def save_progress(self):
+        """حفظ النتائج الجديدة ونقطة التوقف"""
+        with self.metrics.measure('store_write'):
+            self.save_results()
+        with self.metrics.measure('checkpoint'):
+            self.save_checkpoint()
+        self.write_metrics()
+    
+    def write_metrics(self, force=False):
+        """كتابة صف في ملف المقاييس (كل metrics_interval ثانية)"""
+        if self.metrics_stream is not None:
+            self.metrics_stream.maybe_write(self.metrics, force)
     
-    def _create_summary_sheet(self, writer):
-        """إنشاء ورقة الملخص الإحصائي"""
-        if not self.all_results:
+    def estimate_hours(self, all_combinations, total=None):
+        """الوقت المتوقع بالساعات من جولة معايرة قصيرة على عينة من التركيبات"""
+        return estimate_hours(self, all_combinations, total)
+    
+    def export_to_excel(self, chunk_rows=100000, workers=1):
+        """تصدير النتائج من المخزن إلى ملف Excel (عند الطلب، على أجزاء وبذاكرة ثابتة)"""
+        if len(self.results_store) == 0:
             return
-            
-        results = self.all_results
+        
+        from crazy_time_export import export_excel
+        with self.metrics.measure('excel_export'):
+            paths = export_excel(self, workers=workers, chunk_rows=chunk_rows)
+        
+        print(f"📊 تم تصدير {len(self.results_store):,} نتيجة إلى {', '.join(paths)}")
+    
+    def record_traces(self, log=print):
+        """تسجيل مسارات الرصيد لأفضل التركيبات والتركيبات المحددة (إذا كان مفعلاً)"""
+        if not self.config['trace_top_k'] and not self.config['trace_combinations']:
+            return []
+        from crazy_time_traces import record_traces
+        return record_traces(self, log=log)
+    
+    def report_frames(self):
+        """أوراق أفضل النتائج والملخص (من قوائم أفضل النتائج والإحصائيات الجارية)"""
+        frames = []
+        for key, count in self.top_rankings().items():
+            top = self.top_tracker.top(key)
+            if count > 0 and top:
+                frames.append((RANKING_LABELS[key], records_to_dataframe(results_to_records(top))))
+        frames.extend(self._summary_frames())
+        return frames
+    
+    def _summary_frames(self):
+        """ورقة الملخص الإحصائي والمدرج التكراري (من الإحصائيات الجارية)"""
+        stats = self.stats
+        if stats.count == 0:
+            return []
         
         summary_data = {
             'المعلومة': [
@@ -346,78 +554,259 @@ class FullCrazyTimeSimulator:
                 'أفضل نتيجة',
                 'أسوأ نتيجة',
                 'متوسط المبلغ النهائي',
+                'الانحراف المعياري للمبلغ النهائي',
                 'معدل النجاح الإجمالي',
                 'أعلى نسبة ربح',
                 'أقل نسبة خسارة',
                 'متوسط عدد الجولات',
                 'أكبر ربح في جولة واحدة',
                 'أطول سلسلة فوز',
+                'أطول سلسلة خسارة',
                 'الوقت الإجمالي للمحاكاة',
                 'آخر تحديث'
             ],
             'القيمة': [
-                len(results),
-                f"${max(r['final_balance'] for r in results):.2f}",
-                f"${min(r['final_balance'] for r in results):.2f}",
-                f"${sum(r['final_balance'] for r in results) / len(results):.2f}",
-                f"{sum(1 for r in results if r['final_balance'] > self.config['initial_balance']) / len(results):.1%}",
-                f"{max(r['profit_percentage'] for r in results):.1f}%",
-                f"{min(r['profit_percentage'] for r in results):.1f}%",
-                f"{sum(r['trials_completed'] for r in results) / len(results):.0f}",
-                f"${max(r['max_single_win'] for r in results):.2f}",
-                max(r['max_win_streak'] for r in results),
+                stats.count,
+                f"${stats.max_balance:.2f}",
+                f"${stats.min_balance:.2f}",
+                f"${stats.mean:.2f}",
+                f"${stats.std:.2f}",
+                f"{stats.success_rate:.1%}",
+                f"{stats.max_profit:.1f}%",
+                f"{stats.min_profit:.1f}%",
+                f"{stats.average_trials:.0f}",
+                f"${stats.max_single_win:.2f}",
+                stats.max_win_streak,
+                stats.max_loss_streak,
                 f"{(time.time() - self.start_time) / 3600:.1f} ساعة" if self.start_time else "غير محدد",
                 datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             ]
         }
         
+        if self.racing_stats is not None:
+            # التركيبات المستبعدة في نمط السباق لا تدخل الإحصائيات الجارية (الناجية فقط)
+            labels = summary_data['المعلومة']
+            labels[0] = 'التركيبات الناجية المحفوظة'
+            labels[1:12] = [f"{label} (الناجية فقط)" for label in labels[1:12]]
+            labels.insert(1, 'التركيبات المستبعدة في نمط السباق')
+            summary_data['القيمة'].insert(1, self.racing_stats['dropped'])
+        
         summary_df = pd.DataFrame(summary_data)
-        summary_df.to_excel(writer, sheet_name='ملخص إحصائي', index=False)
+        
+        # المدرج التكراري للمبلغ النهائي
+        histogram_df = pd.DataFrame(stats.histogram_rows(), columns=['من', 'إلى', 'عدد التركيبات'])
+        return [('ملخص إحصائي', summary_df), ('توزيع المبلغ النهائي', histogram_df)]
     
-    def save_checkpoint(self):
-        """حفظ نقطة التوقف"""
-        checkpoint_data = {
+    def checkpoint_state(self):
+        """حالة التقدم الحالية (تُلحق بسجل نقاط التوقف عند كل حفظ)"""
+        return {
             'current_combination_index': self.current_combination_index,
+            'completed_ranges': self.completed_ranges,
+            'seed_entropy': self.seed_entropy,
+            'racing_stats': self.racing_stats,
+            'stats': self.stats.to_dict(),
+            'stored_results': len(self.results_store),
             'total_combinations': self.total_combinations,
             'tested_combinations': self.tested_combinations,
-            'config': self.config,
             'start_time': self.start_time,
             'timestamp': datetime.now().isoformat()
         }
+    
+    def save_checkpoint(self):
+        """حفظ نقطة التوقف (تأكيد صغير في السجل، ولقطة كاملة كل فترة)"""
+        self.journal.commit(self.checkpoint_state())
         
-        with open(self.file_config['checkpoint_file'], 'w', encoding='utf-8') as f:
-            json.dump(checkpoint_data, f, indent=2, ensure_ascii=False)
+        if self.journal.commits_since_snapshot >= self.config['checkpoint_compact_interval']:
+            self.compact_checkpoint()
+    
+    def compact_checkpoint(self):
+        """كتابة لقطة كاملة (مع أفضل النتائج) وتفريغ السجل"""
+        snapshot = self.checkpoint_state()
+        snapshot['top_tracker'] = self.top_tracker.to_dict()
+        snapshot['config'] = self.config
+        self.journal.write_snapshot(snapshot)
     
     def load_checkpoint(self):
-        """تحميل نقطة التوقف"""
-        if os.path.exists(self.file_config['checkpoint_file']):
-            try:
-                with open(self.file_config['checkpoint_file'], 'r', encoding='utf-8') as f:
-                    checkpoint_data = json.load(f)
-                
-                self.current_combination_index = checkpoint_data.get('current_combination_index', 0)
-                self.total_combinations = checkpoint_data.get('total_combinations', 0)
-                self.tested_combinations = checkpoint_data.get('tested_combinations', 0)
-                self.start_time = checkpoint_data.get('start_time', None)
-                
-                print(f"📂 تم تحميل نقطة التوقف: التركيبة {self.current_combination_index:,}")
-                
-            except Exception as e:
-                print(f"⚠️ خطأ في تحميل نقطة التوقف: {e}")
-                self.current_combination_index = 0
-        else:
+        """تحميل نقطة التوقف (اللقطة + إعادة تشغيل السجل)"""
+        try:
+            snapshot, checkpoint_data = self.journal.recover()
+        except (OSError, ValueError) as e:
+            # لا إعادة ضبط عند فشل الاستعادة: المخزن قد يحتوي نتائج صالحة
+            raise ValueError(f"تعذر قراءة نقطة التوقف {self.file_config['checkpoint_file']}: {e} "
+                             f"(استخدم --restart للبدء من جديد)") from e
+        
+        if checkpoint_data is None:
+            if self.readonly:
+                self.results_store.limit(0)  # لا سجلات مؤكدة بدون نقطة توقف
+                return
+            self.reset_progress()
             print("🆕 بدء محاكاة جديدة")
+            return
+        
+        if not self.readonly and self.journal.discard_invalid_tail():
+            print("⚠️ تم تجاهل سطر تالف في نهاية سجل نقاط التوقف (الاستئناف من آخر تأكيد سليم)")
+        
+        self.current_combination_index = checkpoint_data.get('current_combination_index', 0)
+        self.completed_ranges = checkpoint_data.get('completed_ranges', [])
+        if checkpoint_data.get('seed_entropy') is not None:
+            self.seed_entropy = checkpoint_data['seed_entropy']
+        if self.racing_stats is not None and checkpoint_data.get('racing_stats'):
+            self.racing_stats.update(checkpoint_data['racing_stats'])
+        
+        # حذف النتائج المكتوبة بعد آخر تأكيد لتجنب التكرار
+        stored_results = checkpoint_data.get('stored_results', len(self.results_store))
+        if self.readonly:
+            self.results_store.limit(stored_results)
+        else:
+            self.results_store.truncate(stored_results)
+        self.total_combinations = checkpoint_data.get('total_combinations', 0)
+        self.tested_combinations = checkpoint_data.get('tested_combinations', 0)
+        self.start_time = checkpoint_data.get('start_time', None)
+        
+        # الإحصائيات الجارية محفوظة مع كل تأكيد (وتُعاد بناؤها للصيغ القديمة)
+        if checkpoint_data.get('stats'):
+            self.stats = RunningStats.from_dict(checkpoint_data['stats'])
+        else:
+            self.rebuild_stats(stored_results)
+        
+        # أفضل النتائج: من اللقطة ثم السجلات المضافة بعدها من مخزن النتائج
+        replay_from = 0
+        if snapshot is not None and 'top_tracker' in snapshot:
+            self.top_tracker.merge(TopResultsTracker.from_dict(snapshot['top_tracker'], ResultRecord.from_dict))
+            replay_from = min(snapshot.get('stored_results', 0), stored_results)
+        self.replay_results(replay_from, stored_results)
+        
+        # الاستئناف يتطلب نفس الشريط (ينشأ فقط إذا لم تكتمل أي تركيبة بعد)
+        if self.uses_tape and not self.readonly:
+            self.open_tape(create=self.completed_count() == 0)
+        
+        print(f"📂 تم تحميل نقطة التوقف: التركيبة {self.current_combination_index:,}")
+    
+    def rebuild_stats(self, end, chunk_rows=100000):
+        """إعادة بناء الإحصائيات الجارية من أول end سجل في المخزن"""
+        self.stats = RunningStats(self.config['initial_balance'])
+        records = self.results_store.open_memmap()
+        for chunk_start in range(0, end, chunk_rows):
+            self.stats.update_batch(np.array(records[chunk_start:min(chunk_start + chunk_rows, end)]))
+    
+    def replay_results(self, start, end, chunk_rows=100000):
+        """إعادة إدخال سجلات المخزن من start إلى end في قوائم أفضل النتائج"""
+        records = self.results_store.open_memmap()
+        for chunk_start in range(start, end, chunk_rows):
+            chunk = records_to_batch(np.array(records[chunk_start:min(chunk_start + chunk_rows, end)]))
+            self.top_tracker.push_batch(chunk, lambda row: self.batch_result(chunk, row))
+    
+    def record_result(self, result):
+        """تسجيل نتيجة تركيبة مكتملة"""
+        if result is None:
+            return
+        
+        self.pending_results.append(result)
+        self.update_top_results(result)
+        self.stats.update(result)
+        self.metrics.count(1, result['trials_completed'])
+        self.tested_combinations += 1
+    
+    def record_batch(self, batch):
+        """تسجيل دفعة نتائج مصفوفات (من نواة الدفعات)"""
+        racing_stats = batch.get('racing_stats')
+        if racing_stats is not None:
+            # التركيبات المستبعدة في نمط السباق تُحتسب كمختبرة ولا تُحفظ
+            for key, value in racing_stats.items():
+                self.racing_stats[key] += value
+            self.tested_combinations += racing_stats['dropped']
+        
+        count = len(batch['total_bet'])
+        if racing_stats is not None:
+            self.metrics.count(count + racing_stats['dropped'], racing_stats['spins_simulated'])
+        else:
+            self.metrics.count(count, int(np.sum(batch['trials_completed'])))
+        if count == 0:
+            return
+        
+        self.pending_records.append(batch_to_records(batch))
+        self.top_tracker.push_batch(batch, lambda row: self.batch_result(batch, row))
+        self.stats.update_batch(batch)
+        self.tested_combinations += count
+    
+    def record_results(self, results):
+        """تسجيل ناتج simulate_combinations (دفعة مصفوفات أو قائمة نتائج)"""
+        with self.metrics.measure('bookkeeping'):
+            if isinstance(results, dict):
+                self.record_batch(results)
+            else:
+                for result in results:
+                    self.record_result(result)
+    
+    def mark_range_completed(self, start, end):
+        """تسجيل نطاق تركيبات مكتمل وتقديم مؤشر الاستئناف"""
+        ranges = sorted(self.completed_ranges + [[start, end]])
+        
+        merged = []
+        for range_start, range_end in ranges:
+            if merged and range_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], range_end)
+            else:
+                merged.append([range_start, range_end])
+        
+        # النطاقات المتصلة بالمؤشر الحالي تُدمج فيه
+        while merged and merged[0][0] <= self.current_combination_index:
+            self.current_combination_index = max(self.current_combination_index, merged.pop(0)[1])
+        
+        self.completed_ranges = merged
+    
+    def pending_ranges(self):
+        """النطاقات التي لم تُحاكَ بعد (مع تخطي النطاقات المكتملة)"""
+        ranges = []
+        start = self.current_combination_index
+        
+        for range_start, range_end in self.completed_ranges:
+            if range_start > start:
+                ranges.append((start, min(range_start, self.total_combinations)))
+            start = max(start, range_end)
+        
+        if start < self.total_combinations:
+            ranges.append((start, self.total_combinations))
+        
+        return [(range_start, range_end) for range_start, range_end in ranges if range_start < range_end]
+    
+    def reset_progress(self):
+        """بدء محاكاة جديدة من الصفر"""
+        self.current_combination_index = 0
+        self.completed_ranges = []
+        self.total_combinations = 0
+        self.tested_combinations = 0
+        self.pending_results = []
+        self.pending_records = []
+        self.top_tracker = TopResultsTracker(self.top_rankings())
+        self.stats = RunningStats(self.config['initial_balance'])
+        if self.racing_stats is not None:
+            self.racing_stats = dict.fromkeys(self.racing_stats, 0)
+        self.start_time = None
+        self.seed_entropy = self.config['seed']
+        self.ensure_seed_entropy()  # تُحفظ مع اللقطة فيبقى الشريط مطابقاً عند الاستئناف
+        self.results_store.reset()
+        self.compact_checkpoint()
+        if self.uses_tape:
+            self.open_tape(create=True)
+    
+    def top_rankings(self):
+        """الترتيبات المتتبعة وعدد النتائج المحفوظة لكل منها"""
+        rankings = {'final_balance': self.config['top_results_count']}
+        rankings.update(self.config['top_rankings'])
+        return rankings
+    
+    @property
+    def top_results(self):
+        """أفضل النتائج حسب المبلغ النهائي (مرتبة تنازلياً)"""
+        return self.top_tracker.top('final_balance')
     
     def update_top_results(self, result):
-        """تحديث قائمة أفضل النتائج"""
+        """تحديث قوائم أفضل النتائج"""
         if result is None:
             return
-            
-        self.top_results.append(result)
-        self.top_results.sort(key=lambda x: x['final_balance'], reverse=True)
         
-        if len(self.top_results) > self.config['top_results_count']:
-            self.top_results = self.top_results[:self.config['top_results_count']]
+        self.top_tracker.push(result)
     
     def log_progress(self, message):
         """تسجيل التقدم في ملف"""
@@ -426,7 +815,7 @@ class FullCrazyTimeSimulator:
             f.write(f"[{timestamp}] {message}\n")
     
     def run_full_simulation(self):
-        """تشغيل المحاكاة الكاملة"""
+        """تشغيل المحاكاة الكاملة وإرجاع حالة الانتهاء (RUN_COMPLETED / RUN_INTERRUPTED / RUN_FAILED)"""
         print("🚀 بدء المحاكاة الكاملة لجميع التركيبات...")
         print("=" * 60)
         
@@ -437,8 +826,8 @@ class FullCrazyTimeSimulator:
             self.total_combinations = len(all_combinations)
             print(f"📈 إجمالي التركيبات: {self.total_combinations:,}")
             
-            # تقدير الوقت
-            estimated_hours = (self.total_combinations * self.config['trials_per_combination'] * 0.0001) / 3600
+            # تقدير الوقت (من جولة معايرة قصيرة)
+            estimated_hours = self.estimate_hours(all_combinations)
             print(f"⏱️ الوقت المتوقع: ~{estimated_hours:.1f} ساعة")
         else:
             all_combinations = self.generate_all_combinations()
@@ -448,79 +837,115 @@ class FullCrazyTimeSimulator:
         
         if self.start_time is None:
             self.start_time = time.time()
+        self.ensure_seed_entropy()
         
-        last_save_time = time.time()
+        # مقاييس هذا التشغيل فقط (بدون المعايرة ووقت الانتظار قبل البدء)
+        self.metrics.reset()
         
         try:
-            # بدء المحاكاة من النقطة المحفوظة
-            for i in range(self.current_combination_index, len(all_combinations)):
-                combination = all_combinations[i]
-                
-                # محاكاة هذه التركيبة
-                result = self.simulate_combination(combination)
-                
-                if result:
-                    self.all_results.append(result)
-                    self.update_top_results(result)
-                    self.tested_combinations += 1
-                
-                self.current_combination_index = i + 1
-                
-                # حفظ دوري
-                if (i + 1) % self.config['save_interval'] == 0:
-                    self.save_to_excel()
-                    self.save_checkpoint()
-                    
-                    # تحديث التقدم
-                    elapsed = time.time() - self.start_time
-                    save_elapsed = time.time() - last_save_time
-                    progress = ((i + 1) / len(all_combinations)) * 100
-                    remaining_combinations = len(all_combinations) - (i + 1)
-                    estimated_remaining_time = (remaining_combinations * elapsed / (i + 1)) / 3600
-                    
-                    progress_msg = f"⏳ التقدم: {progress:.3f}% ({i+1:,}/{len(all_combinations):,})"
-                    time_msg = f"⏱️ الوقت: {elapsed/3600:.1f}h | المتبقي: ~{estimated_remaining_time:.1f}h"
-                    
-                    print(progress_msg)
-                    print(time_msg)
-                    
-                    if self.top_results:
-                        best = self.top_results[0]
-                        best_msg = f"🏆 أفضل نتيجة: ${best['final_balance']:.2f} - {best['combination_str']}"
-                        print(best_msg)
-                    
-                    # تسجيل في ملف
-                    self.log_progress(f"{progress_msg} | {time_msg}")
+            if self.config['workers'] > 1:
+                # تنفيذ متوازي على عدة عمليات
+                from crazy_time_parallel import run_parallel_sweep
+                run_parallel_sweep(self, all_combinations, on_save=self.report_progress)
+            else:
+                # بدء المحاكاة من النقطة المحفوظة
+                block_size = self.sweep_block_size()
+                save_interval = self.config['save_interval']
+                for start, end in self.pending_ranges():
+                    for block_start in range(start, end, block_size):
+                        # محاكاة هذه التركيبة (أو دفعة تركيبات مع الشريط المشترك)
+                        block_end = min(block_start + block_size, end)
+                        self.simulate_block(all_combinations, block_start, block_end)
+                        
+                        self.current_combination_index = block_end
+                        
+                        # حفظ دوري
+                        if block_end // save_interval > block_start // save_interval:
+                            self.save_progress()
+                            self.report_progress()
                     
-                    print("-" * 60)
-                    last_save_time = time.time()
+                    self.mark_range_completed(start, end)
         
         except KeyboardInterrupt:
             print("\n⏸️ تم إيقاف المحاكاة بواسطة المستخدم")
-            self.save_to_excel()
-            self.save_checkpoint()
+            self.save_progress()
             print("💾 تم حفظ التقدم الحالي")
-            return
+            return RUN_INTERRUPTED
         
         except Exception as e:
             print(f"\n❌ خطأ في المحاكاة: {e}")
-            self.save_to_excel()
-            self.save_checkpoint()
+            self.save_progress()
             print("💾 تم حفظ التقدم قبل الخطأ")
-            return
+            return RUN_FAILED
         
-        # حفظ نهائي
-        self.save_to_excel()
-        self.save_checkpoint()
+        # حفظ نهائي وتسجيل المسارات المطلوبة وتصدير Excel
+        self.save_progress()
+        self.record_traces()
+        if self.config['export_on_finish']:
+            self.export_to_excel()
         
         total_time = time.time() - self.start_time
         print(f"\n🎉 انتهت المحاكاة الكاملة بنجاح!")
         print(f"⏱️ الوقت الإجمالي: {total_time/3600:.1f} ساعة")
         print(f"📊 إجمالي التركيبات المختبرة: {self.tested_combinations:,}")
         
+        if self.racing_stats is not None:
+            print(self.racing_summary())
+        
+        for line in self.metrics.summary_lines():
+            print(line)
+        self.write_metrics(force=True)
+        
         if self.top_results:
             print(f"🏆 أفضل نتيجة: ${self.top_results[0]['final_balance']:.2f}")
             print(f"🥇 أفضل تركيبة: {self.top_results[0]['combination_str']}")
+        
+        return RUN_COMPLETED
+    
+    def racing_summary(self):
+        """ملخص الجولات الموفرة في نمط السباق (None إذا لم يكن مفعلاً)"""
+        if self.racing_stats is None:
+            return None
+        
+        stats = self.racing_stats
+        budget = stats['spins_simulated'] + stats['spins_skipped']
+        saved = (stats['spins_skipped'] / budget) * 100 if budget else 0
+        return (f"🏁 نمط السباق: استُبعدت {stats['dropped']:,} من {stats['evaluated']:,} تركيبة | "
+                f"جولات محاكاة {stats['spins_simulated']:,} | موفرة {stats['spins_skipped']:,} ({saved:.1f}%)")
+    
+    def completed_count(self):
+        """عدد التركيبات المكتملة (بما فيها النطاقات المكتملة بعد المؤشر)"""
+        return self.current_combination_index + sum(end - start for start, end in self.completed_ranges)
+    
+    def report_progress(self):
+        """طباعة وتسجيل التقدم الحالي"""
+        done = self.completed_count()
+        total = self.total_combinations
+        elapsed = time.time() - self.start_time
+        progress = (done / total) * 100 if total else 0
+        estimated_remaining_time = ((total - done) * elapsed / done) / 3600 if done else 0
+        
+        progress_msg = f"⏳ التقدم: {progress:.3f}% ({done:,}/{total:,})"
+        time_msg = f"⏱️ الوقت: {elapsed/3600:.1f}h | المتبقي: ~{estimated_remaining_time:.1f}h"
+        
+        print(progress_msg)
+        print(time_msg)
+        print(self.metrics.summary_lines()[0])
+        
+        if self.stats.count:
+            survivors = " (الناجية فقط)" if self.racing_stats is not None else ""
+            print(f"📈 متوسط المبلغ النهائي{survivors}: ${self.stats.mean:.2f} ± {self.stats.std:.2f} | "
+                  f"معدل النجاح: {self.stats.success_rate:.1%}")
+        
+        if self.top_results:
+            best = self.top_results[0]
+            best_msg = f"🏆 أفضل نتيجة: ${best['final_balance']:.2f} - {best['combination_str']}"
+            print(best_msg)
+        
+        # تسجيل في ملف
+        self.log_progress(f"{progress_msg} | {time_msg}")
+        
+        print("-" * 60)
     
     def print_current_status(self):
         """طباعة حالة المحاكاة الحالية"""
@@ -536,40 +961,155 @@ class FullCrazyTimeSimulator:
         if self.top_results:
             print(f"   • أفضل نتيجة حالياً: ${self.top_results[0]['final_balance']:.2f}")
 
-def main():
-    """الدالة الرئيسية"""
+def parse_value(text):
+    """قيمة خيار --set: JSON إذا أمكن (أرقام، true/false، قوائم) وإلا نص"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+def load_config_file(path):
+    """قراءة ملف إعدادات JSON: {"simulation": {...}, "files": {...}} أو مفاتيح المحاكاة مباشرة"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    if not isinstance(data, dict):
+        raise ValueError(f"ملف الإعدادات يجب أن يحتوي على كائن JSON: {path}")
+    
+    if 'simulation' in data or 'files' in data:
+        return dict(data.get('simulation', {})), dict(data.get('files', {}))
+    return data, {}
+
+def shard_file_config(file_config, shard_index, shard_count):
+    """أسماء ملفات مستقلة لكل جزء (الشريط المشترك يبقى واحداً لجميع الأجزاء)"""
+    suffix = f".shard-{shard_index + 1}-of-{shard_count}"
+    sharded = {}
+    for key, path in file_config.items():
+        if key == 'tape_file':
+            sharded[key] = path
+            continue
+        root, extension = os.path.splitext(path)
+        sharded[key] = f"{root}{suffix}{extension}"
+    return sharded
+
+def build_run_config(args):
+    """إعدادات المحاكاة والملفات من ملف الإعدادات ثم الخيارات"""
+    config = {}
+    file_config = dict(FILE_CONFIG)
+    
+    if args.config:
+        file_simulation, file_files = load_config_file(args.config)
+        config.update(file_simulation)
+        file_config.update(file_files)
+    
+    for assignment in args.set:
+        key, separator, value = assignment.partition('=')
+        if not separator:
+            raise ValueError(f"صيغة --set غير صحيحة (المطلوب KEY=VALUE): {assignment}")
+        config[key.strip()] = parse_value(value.strip())
+    
+    if args.engine == 'tape':
+        config['use_shared_tape'] = True
+    elif args.engine:
+        config['engine'] = args.engine
+    if args.workers is not None:
+        config['workers'] = args.workers
+    if args.seed is not None:
+        config['seed'] = args.seed
+    if args.shard:
+        index, separator, count = args.shard.partition('/')
+        if not separator or not index.isdigit() or not count.isdigit() or not 1 <= int(index) <= int(count):
+            raise ValueError(f"صيغة --shard غير صحيحة (المطلوب INDEX/COUNT مثل 2/8): {args.shard}")
+        config['shard_index'] = int(index) - 1
+        config['shard_count'] = int(count)
+    
+    unknown = sorted(set(config) - set(SIMULATION_CONFIG))
+    if unknown:
+        raise ValueError(f"إعدادات غير معروفة: {', '.join(unknown)}")
+    unknown = sorted(set(file_config) - set(FILE_CONFIG))
+    if unknown:
+        raise ValueError(f"ملفات غير معروفة: {', '.join(unknown)}")
+    if config.get('workers', 1) < 1:
+        raise ValueError("عدد العمليات المتوازية يجب أن يكون 1 على الأقل")
+    
+    shard_count = config.get('shard_count', 1)
+    if shard_count > 1:
+        file_config = shard_file_config(file_config, config.get('shard_index', 0), shard_count)
+    
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        file_config = {key: os.path.join(args.output_dir, path) for key, path in file_config.items()}
+    
+    return config, file_config
+
+def parse_args(argv=None):
+    """خيارات سطر الأوامر"""
+    parser = argparse.ArgumentParser(description="محاكي Crazy Time الكامل (تشغيل بدون واجهة)")
+    parser.add_argument('--config', help="ملف إعدادات JSON")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="تعديل إعداد محاكاة (يمكن تكراره)، مثل --set trials_per_combination=500")
+    progress = parser.add_mutually_exclusive_group()
+    progress.add_argument('--resume', action='store_true', help="الاستئناف من نقطة التوقف بدون سؤال")
+    progress.add_argument('--restart', action='store_true', help="حذف التقدم السابق والبدء من جديد")
+    parser.add_argument('--shard', metavar='INDEX/COUNT', help="محاكاة جزء واحد من الفضاء (مثل 2/8) بملفات مستقلة")
+    parser.add_argument('--workers', type=int, help="عدد العمليات المتوازية")
+    parser.add_argument('--engine', choices=['python', 'numpy', 'tape'], help="محرك المحاكاة (tape = الشريط المشترك)")
+    parser.add_argument('--seed', type=int, help="البذرة الرئيسية")
+    parser.add_argument('--output-dir', help="مجلد جميع ملفات الإخراج ونقاط التوقف")
+    parser.add_argument('--yes', '-y', action='store_true', help="بدء المحاكاة بدون طلب تأكيد")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """الدالة الرئيسية (ترجع رمز الخروج)"""
+    args = parse_args(argv)
+    try:
+        config, file_config = build_run_config(args)
+    except (OSError, ValueError) as e:
+        print(f"❌ خطأ في الإعدادات: {e}")
+        return EXIT_USAGE
+    
+    # الأسئلة فقط عند التشغيل التفاعلي بدون خيارات صريحة
+    interactive = sys.stdin.isatty()
+    
     print("🎰 محاكي Crazy Time الكامل والقابل للتخصيص")
     print("=" * 60)
     
     # إنشاء المحاكي
-    simulator = FullCrazyTimeSimulator()
+    try:
+        simulator = FullCrazyTimeSimulator(config, file_config=file_config, restart=args.restart)
+    except ValueError as e:
+        # مثل شريط نتائج لا يطابق نقطة التوقف (--restart يبدأ من جديد)
+        print(f"❌ تعذر الاستئناف: {e}")
+        return EXIT_CODES[RUN_FAILED]
     
     # عرض الحالة الحالية
     simulator.print_current_status()
     
-    # سؤال المستخدم عن الاستئناف
-    if simulator.current_combination_index > 0:
+    if args.restart:
+        print("🆕 بدء محاكاة جديدة")
+    elif not args.resume and interactive and simulator.current_combination_index > 0:
+        # سؤال المستخدم عن الاستئناف
         response = input(f"\n❓ هل تريد الاستئناف من التركيبة {simulator.current_combination_index:,}؟ (y/n): ")
         if response.lower() != 'y':
-            simulator.current_combination_index = 0
-            simulator.tested_combinations = 0
-            simulator.all_results = []
-            simulator.start_time = None
+            simulator.reset_progress()
             print("🆕 بدء محاكاة جديدة")
     
     # تأكيد بدء المحاكاة الكاملة
-    print(f"\n⚠️ تحذير: هذه المحاكاة ستختبر {simulator.total_combinations or '3+ مليون'} تركيبة!")
-    print(f"⏱️ الوقت المتوقع: 80+ ساعة")
-    confirm = input("❓ هل أنت متأكد من بدء المحاكاة الكاملة؟ (yes/no): ")
+    if not args.yes and interactive:
+        print(f"\n⚠️ تحذير: هذه المحاكاة ستختبر {simulator.total_combinations or '3+ مليون'} تركيبة!")
+        confirm = input("❓ هل أنت متأكد من بدء المحاكاة الكاملة؟ (yes/no): ")
+        if confirm.lower() != 'yes':
+            print("❌ تم إلغاء المحاكاة")
+            return EXIT_CANCELLED
     
-    if confirm.lower() == 'yes':
-        try:
-            simulator.run_full_simulation()
-        except KeyboardInterrupt:
-            print("\n👋 تم إنهاء البرنامج")
-    else:
-        print("❌ تم إلغاء المحاكاة")
+    try:
+        status = simulator.run_full_simulation()
+    except KeyboardInterrupt:
+        print("\n👋 تم إنهاء البرنامج")
+        status = RUN_INTERRUPTED
+    
+    return EXIT_CODES[status]
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
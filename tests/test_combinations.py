@@ -0,0 +1,63 @@
+"""فهرسة التركيبات: الترتيب يطابق المولد الأصلي و rank/unrank متعاكستان"""
+
+import numpy as np
+import pytest
+
+from crazy_time_combinations import (CombinationSpace, count_combinations, pack_combination,
+                                     unpack_combination, pack_combinations, unpack_combinations)
+
+
+def baseline_combinations(min_bet, max_bet, parts=8):
+    """المولد الأصلي (قائمة كاملة حسب إجمالي الرهان ثم ترتيب معجمي)"""
+    def with_sum(num_variables, target_sum):
+        if num_variables == 1:
+            yield [target_sum]
+        else:
+            for i in range(target_sum + 1):
+                for combo in with_sum(num_variables - 1, target_sum - i):
+                    yield [i] + combo
+
+    return [combo for total in range(min_bet, max_bet + 1) for combo in with_sum(parts, total)]
+
+
+@pytest.mark.parametrize('min_bet, max_bet', [(0, 4), (1, 5), (3, 4)])
+def test_order_matches_baseline_generator(min_bet, max_bet):
+    space = CombinationSpace(min_bet, max_bet)
+    expected = baseline_combinations(min_bet, max_bet)
+    assert len(space) == len(expected) == count_combinations(min_bet, max_bet)
+    assert list(space) == expected
+    assert [space[index] for index in range(len(space))] == expected
+    np.testing.assert_array_equal(space.to_array(0, len(space)), np.array(expected))
+
+
+def test_rank_inverts_unrank():
+    space = CombinationSpace(1, 6)
+    for index in range(len(space)):
+        combination = space.unrank(index)
+        assert space.rank(combination) == index
+        assert space.unrank(space.rank(combination)) == combination
+
+
+@pytest.mark.parametrize('start', [0, 1, 7, 8, 100, 999])
+def test_iter_from_matches_full_order(start):
+    space = CombinationSpace(1, 5)
+    expected = baseline_combinations(1, 5)
+    assert list(space.iter_from(start)) == expected[start:]
+    np.testing.assert_array_equal(space.to_array(start, 50), np.array(expected[start:start + 50]))
+
+
+def test_out_of_range_index_and_foreign_combination():
+    space = CombinationSpace(1, 3)
+    with pytest.raises(IndexError):
+        space.unrank(len(space))
+    with pytest.raises(ValueError):
+        space.locate([0, 0, 0, 0, 0, 0, 0, 4])
+
+
+def test_pack_round_trip():
+    combinations = CombinationSpace(0, 5).to_array(0, 2000)
+    keys = pack_combinations(combinations)
+    np.testing.assert_array_equal(unpack_combinations(keys), combinations)
+    for combination, key in zip(combinations[:50].tolist(), keys[:50]):
+        assert pack_combination(combination) == int(key)
+        assert unpack_combination(key) == combination
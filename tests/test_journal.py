@@ -0,0 +1,104 @@
+"""سجل نقاط التوقف يستعيد آخر تأكيد سليم عند سطر ناقص أو تالف"""
+
+import os
+
+import numpy as np
+import pytest
+
+from crazy_time_journal import CheckpointJournal
+from full_crazy_time_simulator import FullCrazyTimeSimulator, FILE_CONFIG
+
+# ذيول تالفة: انقطاع أثناء الكتابة، سطر كامل غير صالح، بايتات غير UTF-8
+BROKEN_TAILS = [
+    b'{"current_combination_index": 40, "seq',
+    b'{"current_combination_index": 40, "sequence": \n',
+    b'\xff\xfe garbage\n'
+]
+
+
+def make_journal(directory):
+    return CheckpointJournal(os.path.join(directory, 'checkpoint.json'),
+                             os.path.join(directory, 'checkpoint.journal'))
+
+
+def commit_states(journal, indexes):
+    for index in indexes:
+        journal.commit({'current_combination_index': index, 'stored_results': index})
+
+
+def append_bytes(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+@pytest.mark.parametrize('tail', BROKEN_TAILS)
+def test_broken_tail_recovers_last_good_commit(tmp_path, tail):
+    journal = make_journal(str(tmp_path))
+    commit_states(journal, [10, 20, 30])
+    good_size = os.path.getsize(journal.journal_path)
+    append_bytes(journal.journal_path, tail)
+
+    recovered = make_journal(str(tmp_path))
+    snapshot, state = recovered.recover()
+    assert snapshot is None
+    assert state['current_combination_index'] == 30
+    assert recovered.sequence == 3
+
+    # الإصلاح يقص الذيل فقط، والتأكيدات الجديدة تُقرأ بعده
+    assert recovered.discard_invalid_tail()
+    assert os.path.getsize(recovered.journal_path) == good_size
+    assert not recovered.discard_invalid_tail()
+    recovered.commit({'current_combination_index': 50, 'stored_results': 50})
+
+    _, state = make_journal(str(tmp_path)).recover()
+    assert state['current_combination_index'] == 50
+    assert state['sequence'] == 4
+
+
+def test_corrupt_line_hides_later_commits(tmp_path):
+    journal = make_journal(str(tmp_path))
+    commit_states(journal, [10, 20])
+    append_bytes(journal.journal_path, BROKEN_TAILS[1])
+    commit_states(journal, [30])
+
+    _, state = make_journal(str(tmp_path)).recover()
+    assert state['current_combination_index'] == 20
+
+
+def test_broken_tail_after_snapshot_recovers_snapshot(tmp_path):
+    journal = make_journal(str(tmp_path))
+    commit_states(journal, [10, 20])
+    journal.write_snapshot({'current_combination_index': 20, 'stored_results': 20})
+    append_bytes(journal.journal_path, BROKEN_TAILS[0])
+
+    recovered = make_journal(str(tmp_path))
+    snapshot, state = recovered.recover()
+    assert state == snapshot
+    assert state['current_combination_index'] == 20
+    assert recovered.sequence == 2
+
+
+def test_simulator_resumes_from_last_good_commit(tmp_path):
+    config = {
+        'min_bet_amount': 1,
+        'max_bet_amount': 2,
+        'trials_per_combination': 40,
+        'seed': 7,
+        'save_interval': 5,
+        'checkpoint_compact_interval': 1000,
+        'metrics_interval': 0,
+        'export_on_finish': False
+    }
+    file_config = {key: str(tmp_path / path) for key, path in FILE_CONFIG.items()}
+    simulator = FullCrazyTimeSimulator(config, verbose=False, file_config=file_config)
+    simulator.run_full_simulation()
+    expected = np.array(simulator.results_store.open_memmap())
+
+    # تأكيد ناقص بعد آخر تأكيد سليم (انقطاع أثناء الحفظ)
+    append_bytes(file_config['checkpoint_journal'], b'{"current_combination_index": 0, "stored_results": 0')
+
+    resumed = FullCrazyTimeSimulator(config, verbose=False, file_config=file_config)
+    assert resumed.current_combination_index == simulator.current_combination_index == len(expected)
+    np.testing.assert_array_equal(np.array(resumed.results_store.open_memmap()), expected)
+    with open(file_config['checkpoint_journal'], 'rb') as f:
+        assert f.read().endswith(b'\n')
@@ -0,0 +1,57 @@
+"""التنفيذ المتوازي يطابق التنفيذ المتتالي بتاً ببت (نتائج وأفضل النتائج)"""
+
+import os
+
+import numpy as np
+import pytest
+
+from full_crazy_time_simulator import FullCrazyTimeSimulator, FILE_CONFIG
+
+
+def run_sweep(directory, engine, workers):
+    config = {
+        'min_bet_amount': 1,
+        'max_bet_amount': 3,
+        'trials_per_combination': 80,
+        'seed': 2024,
+        'workers': workers,
+        'chunk_size': 17,
+        'save_interval': 50,
+        'metrics_interval': 0,
+        'export_on_finish': False
+    }
+    if engine == 'tape':
+        config['use_shared_tape'] = True
+    elif engine == 'numpy':
+        config['engine'] = 'numpy'
+
+    os.makedirs(directory)
+    file_config = {key: os.path.join(directory, path) for key, path in FILE_CONFIG.items()}
+    simulator = FullCrazyTimeSimulator(config, verbose=False, file_config=file_config)
+    simulator.run_full_simulation()
+    return simulator
+
+
+def sorted_records(simulator):
+    """سجلات المخزن مرتبة حسب التركيبة (الدفعات المتوازية تكتمل بأي ترتيب)"""
+    records = np.array(simulator.results_store.open_memmap())
+    return records[np.argsort(records['combination_key'], kind='stable')]
+
+
+@pytest.mark.parametrize('engine', ['python', 'numpy', 'tape'])
+def test_parallel_matches_sequential(tmp_path, engine):
+    sequential = run_sweep(str(tmp_path / 'sequential'), engine, workers=1)
+    parallel = run_sweep(str(tmp_path / 'parallel'), engine, workers=3)
+
+    expected = sorted_records(sequential)
+    actual = sorted_records(parallel)
+    assert len(expected) == len(actual) == sequential.tested_combinations > 0
+    np.testing.assert_array_equal(actual['combination_key'], expected['combination_key'])
+    np.testing.assert_array_equal(actual['final_balance'], expected['final_balance'])
+    np.testing.assert_array_equal(actual['win_rate'], expected['win_rate'])
+    np.testing.assert_array_equal(actual['trials_completed'], expected['trials_completed'])
+
+    # أفضل النتائج المدمجة من العمليات العاملة تطابق التتبع المتتالي
+    for key in sequential.top_rankings():
+        assert [(item['combination_key'], item[key]) for item in parallel.top_tracker.top(key)] == \
+               [(item['combination_key'], item[key]) for item in sequential.top_tracker.top(key)]
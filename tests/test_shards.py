@@ -0,0 +1,188 @@
+"""المسح الموزع: دمج الأجزاء يطابق تشغيلاً واحداً بنفس البذرة"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from crazy_time_combinations import pack_combinations, shard_bounds
+from crazy_time_results import ResultStore, RESULT_DTYPE
+from crazy_time_shards import init_sweep, merge_sweep, ShardDirectory
+from full_crazy_time_simulator import FullCrazyTimeSimulator, FILE_CONFIG
+
+SHARDS_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'crazy_time_shards.py')
+
+SHARD_COUNT = 4
+WORKER_COUNT = 3
+
+# الحقول المقارنة (وقت التسجيل يختلف بين التشغيلين)
+COMPARED_FIELDS = [name for name in RESULT_DTYPE.names if name != 'timestamp']
+
+
+def sweep_config(engine):
+    config = {
+        'min_bet_amount': 0,
+        'max_bet_amount': 2,
+        'trials_per_combination': 60,
+        'seed': 12345,
+        'save_interval': 7,
+        'metrics_interval': 0,
+        'export_on_finish': False
+    }
+    if engine == 'tape':
+        config['use_shared_tape'] = True
+    elif engine == 'numpy':
+        config['engine'] = 'numpy'
+    return config
+
+
+def run_workers(directory, count=WORKER_COUNT):
+    """تشغيل عدة عمليات عاملة مستقلة على نفس المجلد وانتظارها"""
+    processes = [
+        subprocess.Popen([sys.executable, SHARDS_SCRIPT, 'worker', str(directory)],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        for _ in range(count)
+    ]
+    for process in processes:
+        _, stderr = process.communicate(timeout=300)
+        assert process.returncode == 0, stderr.decode('utf-8', 'replace')
+
+
+def single_run(directory, config):
+    """نفس المسح في عملية واحدة بدون أجزاء"""
+    os.makedirs(directory)
+    file_config = {key: os.path.join(directory, path) for key, path in FILE_CONFIG.items()}
+    simulator = FullCrazyTimeSimulator(config, verbose=False, file_config=file_config)
+    simulator.run_full_simulation()
+    return simulator
+
+
+def top_items(simulator):
+    return {key: [(item['combination_key'], item['final_balance']) for item in simulator.top_tracker.top(key)]
+            for key in simulator.top_rankings()}
+
+
+@pytest.mark.parametrize('engine', ['python', 'numpy', 'tape'])
+def test_merged_sweep_matches_single_process(tmp_path, engine):
+    config = sweep_config(engine)
+    sweep_directory = tmp_path / 'sweep'
+    init_sweep(str(sweep_directory), config, SHARD_COUNT)
+    run_workers(sweep_directory)
+
+    merged = merge_sweep(str(sweep_directory), export_excel=False)
+    single = single_run(str(tmp_path / 'single'), config)
+
+    merged_records = merged.results_store.open_memmap()
+    single_records = single.results_store.open_memmap()
+    assert len(merged_records) == len(single_records) > 0
+    for field in COMPARED_FIELDS:
+        np.testing.assert_array_equal(merged_records[field], single_records[field], err_msg=field)
+
+    assert merged.tested_combinations == single.tested_combinations
+    assert merged.completed_count() == merged.total_combinations == single.total_combinations
+
+    merged_stats = merged.stats.to_dict()
+    single_stats = single.stats.to_dict()
+    assert merged_stats.keys() == single_stats.keys()
+    for key, value in single_stats.items():
+        # دمج المتوسط والتباين يختلف عن التحديث المتتالي في آخر الخانات العشرية فقط (None = لا قيمة)
+        np.testing.assert_allclose(np.array(merged_stats[key], dtype=float), np.array(value, dtype=float),
+                                   rtol=1e-9, err_msg=key)
+
+    assert top_items(merged) == top_items(single)
+
+
+def test_partial_merge_reads_committed_rows_only(tmp_path):
+    config = sweep_config('python')
+    sweep_directory = tmp_path / 'sweep'
+    init_sweep(str(sweep_directory), config, SHARD_COUNT)
+    run_workers(sweep_directory)
+    shards = ShardDirectory(str(sweep_directory))
+    shards.load()
+    complete = merge_sweep(str(sweep_directory), export_excel=False)
+
+    # جزء متوقف بعد كتابة سجلات لم تُؤكد في نقطة توقفه
+    files = shards.file_config(1)
+    os.remove(shards.done_path(1))
+    with open(files['results_store'], 'ab') as f:
+        f.write(np.zeros(5, dtype=RESULT_DTYPE).tobytes())
+    size_before = os.path.getsize(files['results_store'])
+
+    partial = merge_sweep(str(sweep_directory), allow_partial=True, export_excel=False)
+
+    # الدمج لا يقطع مخزن الجزء ولا يدمج إلا السجلات المؤكدة
+    assert os.path.getsize(files['results_store']) == size_before
+    assert len(ResultStore(files['results_store'], readonly=True)) == shards.shard_state(1)['stored_results'] + 5
+    assert len(partial.results_store) == len(complete.results_store)
+    np.testing.assert_array_equal(partial.results_store.open_memmap()['combination_key'],
+                                  complete.results_store.open_memmap()['combination_key'])
+
+
+def test_partial_merge_keeps_gaps_in_shard_ranges(tmp_path):
+    config = sweep_config('python')
+    sweep_directory = tmp_path / 'sweep'
+    init_sweep(str(sweep_directory), config, SHARD_COUNT)
+    run_workers(sweep_directory)
+    shards = ShardDirectory(str(sweep_directory))
+    shards.load()
+    complete = merge_sweep(str(sweep_directory), export_excel=False)
+
+    # إعادة الجزء الثاني بنطاق مكتمل بعد فجوة (كما تتركه العمليات المتوازية عند الإيقاف)
+    os.remove(shards.done_path(1))
+    simulator = FullCrazyTimeSimulator(shards.shard_config(1), verbose=False,
+                                       file_config=shards.file_config(1), restart=True)
+    space = simulator.generate_all_combinations()
+    simulator.total_combinations = len(space)
+    for start, end in [(0, 3), (6, len(space))]:
+        simulator.simulate_block(space, start, end)
+        simulator.mark_range_completed(start, end)
+    simulator.save_progress()
+    assert simulator.completed_ranges == [[6, len(space)]]
+
+    partial = merge_sweep(str(sweep_directory), allow_partial=True, export_excel=False)
+
+    # الفجوة وحدها تبقى للمحاكاة عند الاستئناف
+    shard_start = shard_bounds(complete.total_combinations, 1, SHARD_COUNT)[0]
+    assert partial.pending_ranges() == [(shard_start + 3, shard_start + 6)]
+    assert partial.completed_count() == complete.total_combinations - 3
+    gap_keys = pack_combinations(space.to_array(3, 3))
+    expected = complete.results_store.open_memmap()['combination_key']
+    np.testing.assert_array_equal(np.sort(partial.results_store.open_memmap()['combination_key']),
+                                  np.sort(expected[~np.isin(expected, gap_keys)]))
+
+
+def lock_directory(tmp_path):
+    shards = ShardDirectory(str(tmp_path))
+    shards.create(sweep_config('python'), SHARD_COUNT)
+    return shards
+
+
+def test_stale_lock_is_broken_and_fresh_lock_is_kept(tmp_path):
+    shards = lock_directory(tmp_path)
+    assert shards.try_claim(0)
+    assert not shards.try_claim(0, stale_seconds=60)
+
+    # قفل لم يُحدَّث منذ ساعة بساعة المجلد المشترك
+    old = shards.shared_now() - 3600
+    os.utime(shards.lock_path(0), (old, old))
+    assert shards.try_claim(0, stale_seconds=60)
+    assert shards.read_lock(0)['age'] < 60
+
+
+def test_lock_refreshed_during_break_is_restored(tmp_path):
+    shards = lock_directory(tmp_path)
+    assert shards.try_claim(0)
+    with open(shards.lock_path(0), 'rb') as f:
+        owner = f.read()
+
+    # الفحص الأول يرى القفل متروكاً، ثم يُحدَّث قبل إعادة التسمية (نبض من المالك)
+    real_lock_age = shards.lock_age
+    ages = iter([3600])
+    shards.lock_age = lambda path: next(ages, None) or real_lock_age(path)
+
+    assert not shards.break_stale_lock(0, stale_seconds=60)
+    with open(shards.lock_path(0), 'rb') as f:
+        assert f.read() == owner
+    assert [name for name in os.listdir(str(tmp_path)) if '.stale.' in name or name.startswith('.clock.')] == []
@@ -0,0 +1,27 @@
+"""نواة الدفعات على الشريط المشترك تطابق المسار الفردي لكل تركيبة"""
+
+import numpy as np
+import pytest
+
+from crazy_time_combinations import CombinationSpace
+from full_crazy_time_simulator import FullCrazyTimeSimulator
+
+
+@pytest.mark.parametrize('initial_balance', [20, 100])
+def test_batch_kernel_matches_single_combination_path(initial_balance):
+    config = {'use_shared_tape': True, 'seed': 99, 'trials_per_combination': 150,
+              'initial_balance': initial_balance, 'metrics_interval': 0}
+    simulator = FullCrazyTimeSimulator(config, resume=False, verbose=False)
+    tape = simulator.open_tape(in_memory=True)
+
+    combinations = CombinationSpace(1, 3).to_array(0, 10 ** 6)
+    batch = tape.simulate_batch(simulator, combinations)
+    singles = [tape.simulate_combination(simulator, combination.tolist()) for combination in combinations]
+
+    np.testing.assert_array_equal(batch['combination'], combinations)
+    for field in ('final_balance', 'win_rate', 'trials_completed', 'wins', 'losses', 'max_single_win'):
+        np.testing.assert_array_equal(batch[field], np.array([result[field] for result in singles]), err_msg=field)
+
+    # الرصيد الصغير يوقف بعض الجلسات مبكراً (الإيقاف لكل صف مختبر أيضاً)
+    if initial_balance == 20:
+        assert batch['trials_completed'].min() < config['trials_per_combination']